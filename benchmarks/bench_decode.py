@@ -0,0 +1,112 @@
+"""Packet decode throughput: current _refresh_data vs the original string based one.
+
+Run from the repository root:
+
+    python benchmarks/bench_decode.py [--number N]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import timeit
+
+# Import the protocol layer directly so Home Assistant is not required
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom_components", "glowdreaming"))
+
+from glowdreaming_api.const import GDEffect, GDHumidifier, GDSound  # noqa: E402
+from glowdreaming_api.device import GlowdreamingDevice, _LOGGER  # noqa: E402
+
+PACKETS = [
+    bytearray.fromhex(value)
+    for value in (
+        "000000000000ffff0000",
+        "0a0000010001000000040044",
+        "640000030001000000040044",
+        "002800000001000000040044",
+        "00000000010000780001",
+        "00000000010000f00002",
+    )
+]
+
+
+class LegacyDevice(GlowdreamingDevice):
+    """The hex-string round-trip decoder this benchmark compares against."""
+
+    def _refresh_data(self, response_data) -> None:
+        _LOGGER.debug(f"Glowdreaming Hex {response_data}")
+        if not response_data or len(response_data) == 0:
+            return
+        hex_str = response_data.hex()
+        self._mode_hex = hex_str
+        response = [hex(x) for x in response_data]
+        if len(response) < 10:
+            return
+        power = bool(4 & int(response[9], 16))
+        self._power = power
+        _LOGGER.debug(f"Power state is {self._power}")
+        volume = int(response[3], 16)
+        self._volume = volume
+        _LOGGER.debug(f"Volume state is {self._volume}")
+        self._sound = GDSound.WHITE_NOISE
+        _LOGGER.debug(f"Sound state is {self._sound}")
+        red, green, blue = [int(x, 16) for x in response[0:3]]
+        brightness = max(red, green, blue)
+        self._brightness = brightness
+        if brightness > 0:
+            self._last_brightness = self.brightness_level
+        _LOGGER.debug(f"Brightness state is {self._brightness}")
+        if red > 0:
+            effect = GDEffect.SLEEP
+        elif green > 0:
+            effect = GDEffect.AWAKE
+        else:
+            effect = GDEffect.NONE
+        self._effect = effect
+        if effect != GDEffect.NONE:
+            self._last_effect = effect
+        _LOGGER.debug(f"Effect state is {self._effect}")
+        humidifier_on = int(response[4], 16)
+        humidifier_option = int(response[9], 16)
+        humidifier_timer = int(response[7], 16)
+        if humidifier_on == 1:
+            if humidifier_option == 1:
+                humidifier = GDHumidifier.TWO
+            elif humidifier_option == 2:
+                humidifier = GDHumidifier.FOUR
+            else:
+                humidifier = GDHumidifier.CONTINUOUS
+        else:
+            humidifier = GDHumidifier.NONE
+        self._humidifier = humidifier
+        self._humidifier_timer = humidifier_timer
+        _LOGGER.debug(f"Humidifier state is {self._humidifier}")
+        _LOGGER.debug(f"Humidifier timer state is {self._humidifier_timer}")
+        self._device_lock = None
+        self._mode = f"Power: {power}, Volume: {volume}, Brightness: {brightness}, Effect: {effect}, Humidifier: {humidifier}, Timer: {humidifier_timer}"
+
+
+def packets_per_second(device: GlowdreamingDevice, number: int) -> float:
+    decode = device._refresh_data
+
+    def run() -> None:
+        for packet in PACKETS:
+            decode(packet)
+
+    best = min(timeit.repeat(run, number=number, repeat=5))
+    return number * len(PACKETS) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000, help="decode rounds per repeat")
+    args = parser.parse_args()
+
+    legacy = packets_per_second(LegacyDevice(None), args.number)
+    current = packets_per_second(GlowdreamingDevice(None), args.number)
+    print(f"legacy  {legacy:>12,.0f} packets/s")
+    print(f"current {current:>12,.0f} packets/s  ({current / legacy:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
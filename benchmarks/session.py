@@ -0,0 +1,101 @@
+"""Record a real device session to a file, or replay one offline.
+
+Recording needs a Bluetooth adapter and bleak / bleak_retry_connector;
+replaying needs neither. Run from the repository root:
+
+    python benchmarks/session.py record AA:BB:CC:DD:EE:FF session.json [--seconds 60]
+    python benchmarks/session.py replay session.json [--speed 1]
+    python benchmarks/session.py from-capture dump_packets.json session.json
+
+from-capture converts a dump_packets service response (as Home Assistant
+returns it, keyed by entity_id) or a diagnostics download into a session
+file.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Import the protocol layer directly so Home Assistant is not required
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom_components", "glowdreaming"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from glowdreaming_api.device import GlowdreamingDevice  # noqa: E402
+from glowdreaming_tools.recording import (  # noqa: E402
+    SessionRecorder,
+    SessionRecording,
+    SessionReplay,
+    capture_packets,
+)
+
+
+async def record(args: argparse.Namespace) -> None:
+    from bleak import BleakScanner
+
+    ble_device = await BleakScanner.find_device_by_address(args.address, timeout=args.scan_timeout)
+    if ble_device is None:
+        sys.exit(f"{args.address} was not found")
+    recorder = SessionRecorder(name=ble_device.name or args.address)
+    device = GlowdreamingDevice(ble_device, connector=recorder.connect)
+    await device.update()
+    print(f"Recording {ble_device.name or args.address} for {args.seconds}s: {device.mode}")
+    await asyncio.sleep(args.seconds)
+    await device.stop()
+    recorder.recording.save(args.output)
+    print(f"Saved {len(recorder.recording)} events to {args.output}")
+
+
+async def replay(args: argparse.Namespace) -> None:
+    recording = SessionRecording.load(args.recording)
+    session = SessionReplay(recording, speed=args.speed)
+    device = GlowdreamingDevice(session.ble_device, connector=session.connect)
+    device.register_callback(lambda: print(f"  notify  {device.mode_hex}"))
+
+    started = time.perf_counter()
+    await device.update()
+    print(f"update    {(time.perf_counter() - started) * 1000:8.1f} ms  {device.mode}")
+    duration = recording.events[-1].t if recording.events else 0.0
+    await asyncio.sleep(session.delay(duration))
+    await device.stop()
+    print(f"connects {session.connects}  reads {session.reads}  notifications {session.notifications}")
+
+
+def from_capture(args: argparse.Namespace) -> None:
+    with open(args.capture) as file:
+        packets = capture_packets(json.load(file))
+    recording = SessionRecording.from_capture(packets)
+    recording.save(args.output)
+    print(f"Saved {len(recording)} events to {args.output}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="record a session with a real device")
+    record_parser.add_argument("address")
+    record_parser.add_argument("output")
+    record_parser.add_argument("--seconds", type=float, default=60.0, help="how long to stay connected")
+    record_parser.add_argument("--scan-timeout", type=float, default=20.0)
+
+    replay_parser = commands.add_parser("replay", help="replay a session file through GlowdreamingDevice")
+    replay_parser.add_argument("recording")
+    replay_parser.add_argument("--speed", type=float, default=1.0, help="replay this many times faster")
+
+    capture_parser = commands.add_parser("from-capture", help="convert a packet capture into a session file")
+    capture_parser.add_argument("capture")
+    capture_parser.add_argument("output")
+
+    args = parser.parse_args()
+    if args.command == "from-capture":
+        from_capture(args)
+    else:
+        asyncio.run(record(args) if args.command == "record" else replay(args))
+
+
+if __name__ == "__main__":
+    main()
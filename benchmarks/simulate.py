@@ -0,0 +1,96 @@
+"""Command latency and poll throughput against the simulated device.
+
+Drives GlowdreamingDevice through glowdreaming_tools.simulator, so no
+Bluetooth adapter is needed. Run from the repository root:
+
+    python benchmarks/simulate.py [--commands N] [--polls N] [--write-latency S] ...
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from itertools import cycle
+
+# Import the protocol layer directly so Home Assistant is not required
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom_components", "glowdreaming"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from glowdreaming_api.const import GDBrightness, GDEffect, GDHumidifier, GDVolume  # noqa: E402
+from glowdreaming_api.device import GlowdreamingDevice  # noqa: E402
+from glowdreaming_tools.simulator import LinkProfile, SimulatedDevice  # noqa: E402
+
+MODES = [
+    (GDEffect.SLEEP, GDBrightness.LOW, GDVolume.LOW, GDHumidifier.NONE),
+    (GDEffect.AWAKE, GDBrightness.HIGH, GDVolume.NONE, GDHumidifier.TWO),
+    (GDEffect.SLEEP, GDBrightness.MEDIUM, GDVolume.HIGH, GDHumidifier.CONTINUOUS),
+    (GDEffect.NONE, GDBrightness.NONE, GDVolume.NONE, GDHumidifier.NONE),
+]
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run(args: argparse.Namespace) -> None:
+    profile = LinkProfile(
+        connect_latency=args.connect_latency,
+        write_latency=args.write_latency,
+        read_latency=args.read_latency,
+        notify_latency=args.notify_latency,
+        apply_delay=args.apply_delay,
+        jitter=args.jitter,
+        packet_loss=args.loss,
+    )
+    sim = SimulatedDevice(profile, seed=args.seed)
+    device = GlowdreamingDevice(sim.ble_device, connector=sim.connect)
+
+    started = time.perf_counter()
+    await device.update()
+    print(f"connect + first update  {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    latencies = []
+    modes = cycle(MODES)
+    for _ in range(args.commands):
+        started = time.perf_counter()
+        await device.set_mode(*next(modes))
+        latencies.append(time.perf_counter() - started)
+    if latencies:
+        print(
+            f"commands {len(latencies):>6}  mean {statistics.mean(latencies) * 1000:7.1f} ms  "
+            f"p50 {percentile(latencies, 0.5) * 1000:7.1f} ms  p95 {percentile(latencies, 0.95) * 1000:7.1f} ms  "
+            f"ack misses {device.ack_misses}"
+        )
+
+    started = time.perf_counter()
+    for _ in range(args.polls):
+        await device.read_fresh()
+    elapsed = time.perf_counter() - started
+    if args.polls:
+        print(f"polls    {args.polls:>6}  {args.polls / elapsed:10,.0f} polls/s")
+
+    await device.stop()
+    print("simulator", sim.stats)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=100, help="set_mode calls to time")
+    parser.add_argument("--polls", type=int, default=1000, help="state reads to time")
+    parser.add_argument("--connect-latency", type=float, default=0.5, help="seconds")
+    parser.add_argument("--write-latency", type=float, default=0.03, help="seconds")
+    parser.add_argument("--read-latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--notify-latency", type=float, default=0.03, help="seconds")
+    parser.add_argument("--apply-delay", type=float, default=0.0, help="seconds before a write shows up in reads")
+    parser.add_argument("--jitter", type=float, default=0.2, help="fraction every latency varies by")
+    parser.add_argument("--loss", type=float, default=0.0, help="probability a notification is lost")
+    parser.add_argument("--seed", type=int, default=None)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,43 @@
 """Support for generic bluetooth devices."""
 
+import asyncio
 import logging
+from datetime import time
 
 from homeassistant.components import bluetooth
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_ADDRESS, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
-
-from .const import DOMAIN
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_CONNECTION_POLICY,
+    CONF_IDLE_TIMEOUT,
+    CONF_POOL_SLOTS,
+    CONF_QUIET_END,
+    CONF_QUIET_START,
+    CONF_RECONCILE_TIMEOUT,
+    CONF_WINDOW_END,
+    CONF_WINDOW_START,
+    DEFAULT_CONNECTION_POLICY,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_POOL_SLOTS,
+    DEFAULT_QUIET_END,
+    DEFAULT_QUIET_START,
+    DEFAULT_RECONCILE_TIMEOUT,
+    DEFAULT_WINDOW_END,
+    DEFAULT_WINDOW_START,
+    DATA_POOLS,
+    DATA_SCHEDULER,
+    DOMAIN,
+)
 from .coordinator import BTCoordinator
+from .glowdreaming_api.connection import ConnectionPolicy, make_policy
 from .glowdreaming_api.device import GlowdreamingDevice
+from .glowdreaming_api.pool import ConnectionPool
+from .glowdreaming_api.polling import AdaptivePollInterval, PollScheduler
+from .store import StateStore
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,31 +55,129 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if not ble_device:
         raise ConfigEntryNotReady(f"Could not find Generic BT Device with address {address}")
 
-    device = GlowdreamingDevice(ble_device)
-    await device.get_client()
+    device = GlowdreamingDevice(
+        ble_device,
+        reconcile_timeout=entry.options.get(CONF_RECONCILE_TIMEOUT, DEFAULT_RECONCILE_TIMEOUT),
+        policy=_policy_from_options(entry),
+        pool=_pool_for_device(hass, address, entry.options.get(CONF_POOL_SLOTS, DEFAULT_POOL_SLOTS)),
+    )
 
-    if not device.connected:
-        raise ConfigEntryNotReady(f"Failed to connect to: {ble_device.address}")
+    # Entities start from the state persisted before the restart, marked
+    # stale until the device confirms it
+    store = StateStore(hass, entry.entry_id)
+    if await store.async_restore(device):
+        _LOGGER.debug("Restored last-known state for %s: %s", address, device.mode_hex)
 
     try:
-        coordinator = BTCoordinator(hass, _LOGGER, device, ble_device, entry.title, entry.unique_id)
-
-        await coordinator.async_config_entry_first_refresh()
+        scheduler: PollScheduler = hass.data[DOMAIN].setdefault(DATA_SCHEDULER, PollScheduler())
+        coordinator = BTCoordinator(
+            hass, _LOGGER, device, ble_device, entry.title, entry.unique_id,
+            interval=_interval_from_options(entry), scheduler=scheduler,
+        )
+        entry.async_on_unload(scheduler.add(coordinator))
+
+        # Notifications and optimistic writes publish a new snapshot if anything changed
+        entry.async_on_unload(device.register_callback(coordinator.async_handle_push))
+
+        @callback
+        def _async_save_state() -> None:
+            store.async_save(coordinator.data)
+
+        entry.async_on_unload(coordinator.async_add_listener(_async_save_state))
+
+        @callback
+        def _async_advertisement(
+            service_info: bluetooth.BluetoothServiceInfoBleak, change: bluetooth.BluetoothChange
+        ) -> None:
+            was_reachable = device.reachable
+            device.update_from_advertisement(service_info.device, service_info.advertisement)
+            if not was_reachable:
+                _LOGGER.debug("%s is advertising again", address)
+                hass.async_create_task(coordinator.async_request_refresh())
+
+        @callback
+        def _async_unavailable(service_info: bluetooth.BluetoothServiceInfoBleak) -> None:
+            _LOGGER.debug("%s stopped advertising", address)
+            device.mark_unreachable()
+            coordinator.async_update_listeners()
+
+        # Passive scanning keeps presence and the best BLEDevice current without
+        # connecting, and gates polling while the device is out of range
+        entry.async_on_unload(
+            bluetooth.async_register_callback(
+                hass,
+                _async_advertisement,
+                bluetooth.BluetoothCallbackMatcher(address=address.upper()),
+                bluetooth.BluetoothScanningMode.PASSIVE,
+            )
+        )
+        entry.async_on_unload(
+            bluetooth.async_track_unavailable(hass, _async_unavailable, address.upper(), connectable=True)
+        )
+        entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
         hass.data[DOMAIN][entry.entry_id] = coordinator
+        # Entities are added with the snapshot the coordinator starts from and
+        # update when the first refresh lands; a sleeping or out of range
+        # device no longer holds up Home Assistant's startup
         await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        coordinator.first_refresh = entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {address}"
+        )
 
         return True
     except:
         _LOGGER.exception("Exception occured during setup; closing connection")
-        await device.disconnect()
+        await device.stop()
         raise
 
+def _policy_from_options(entry: ConfigEntry) -> ConnectionPolicy:
+    """Build the connection policy selected in the entry options."""
+    options = entry.options
+    return make_policy(
+        options.get(CONF_CONNECTION_POLICY, DEFAULT_CONNECTION_POLICY),
+        idle_timeout=options.get(CONF_IDLE_TIMEOUT, DEFAULT_IDLE_TIMEOUT),
+        window_start=time.fromisoformat(options.get(CONF_WINDOW_START, DEFAULT_WINDOW_START)),
+        window_end=time.fromisoformat(options.get(CONF_WINDOW_END, DEFAULT_WINDOW_END)),
+        clock=dt_util.now,
+    )
+
+def _pool_for_device(hass: HomeAssistant, address: str, slots: int) -> ConnectionPool:
+    """Return the connection pool shared by devices on the same adapter or proxy.
+
+    The pool takes the slot count of the device set up last.
+    """
+    service_info = bluetooth.async_last_service_info(hass, address.upper(), connectable=True)
+    source = service_info.source if service_info else "default"
+    pools: dict[str, ConnectionPool] = hass.data[DOMAIN].setdefault(DATA_POOLS, {})
+    if source not in pools:
+        pools[source] = ConnectionPool(slots)
+    elif pools[source].slots != slots:
+        pools[source].resize(slots)
+    return pools[source]
+
+def _interval_from_options(entry: ConfigEntry) -> AdaptivePollInterval:
+    """Build the adaptive poll interval with the quiet window from the entry options."""
+    options = entry.options
+    return AdaptivePollInterval(
+        quiet_start=time.fromisoformat(options.get(CONF_QUIET_START, DEFAULT_QUIET_START)),
+        quiet_end=time.fromisoformat(options.get(CONF_QUIET_END, DEFAULT_QUIET_END)),
+        clock=dt_util.now,
+    )
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
 
     coordinator: BTCoordinator = hass.data[DOMAIN][entry.entry_id]
-    await coordinator._device.disconnect()
+    # A refresh still connecting would otherwise reconnect after stop()
+    if coordinator.first_refresh is not None and not coordinator.first_refresh.done():
+        coordinator.first_refresh.cancel()
+        await asyncio.wait([coordinator.first_refresh])
+    await coordinator._device.stop()
 
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
@@ -62,3 +187,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             hass.data.pop(DOMAIN)
 
     return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the persisted state of a removed config entry."""
+    await StateStore(hass, entry.entry_id).async_remove()
@@ -10,9 +10,30 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.components.bluetooth import BluetoothServiceInfoBleak, async_discovered_service_info
 from homeassistant.const import CONF_ADDRESS
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import selector
 
-from .const import DOMAIN
+from .const import (
+    CONF_CONNECTION_POLICY,
+    CONF_IDLE_TIMEOUT,
+    CONF_POOL_SLOTS,
+    CONF_QUIET_END,
+    CONF_QUIET_START,
+    CONF_RECONCILE_TIMEOUT,
+    CONF_WINDOW_END,
+    CONF_WINDOW_START,
+    DEFAULT_CONNECTION_POLICY,
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_POOL_SLOTS,
+    DEFAULT_QUIET_END,
+    DEFAULT_QUIET_START,
+    DEFAULT_RECONCILE_TIMEOUT,
+    DEFAULT_WINDOW_END,
+    DEFAULT_WINDOW_START,
+    DOMAIN,
+)
+from .glowdreaming_api.connection import POLICIES
 from .glowdreaming_api.device import GlowdreamingDevice
 
 _LOGGER = logging.getLogger(__name__)
@@ -22,6 +43,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler()
+
     def __init__(self) -> None:
         """Initialize the config flow."""
         self._discovery_info: BluetoothServiceInfoBleak | None = None
@@ -84,3 +111,51 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             }
         )
         return self.async_show_form(step_id="user", data_schema=data_schema, errors=errors)
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle Glow Dreaming options."""
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        data_schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_RECONCILE_TIMEOUT,
+                    default=options.get(CONF_RECONCILE_TIMEOUT, DEFAULT_RECONCILE_TIMEOUT),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.5, max=30)),
+                vol.Optional(
+                    CONF_CONNECTION_POLICY,
+                    default=options.get(CONF_CONNECTION_POLICY, DEFAULT_CONNECTION_POLICY),
+                ): vol.In(POLICIES),
+                vol.Optional(
+                    CONF_IDLE_TIMEOUT,
+                    default=options.get(CONF_IDLE_TIMEOUT, DEFAULT_IDLE_TIMEOUT),
+                ): vol.All(vol.Coerce(float), vol.Range(min=5, max=3600)),
+                vol.Optional(
+                    CONF_WINDOW_START,
+                    default=options.get(CONF_WINDOW_START, DEFAULT_WINDOW_START),
+                ): selector.TimeSelector(),
+                vol.Optional(
+                    CONF_WINDOW_END,
+                    default=options.get(CONF_WINDOW_END, DEFAULT_WINDOW_END),
+                ): selector.TimeSelector(),
+                vol.Optional(
+                    CONF_QUIET_START,
+                    default=options.get(CONF_QUIET_START, DEFAULT_QUIET_START),
+                ): selector.TimeSelector(),
+                vol.Optional(
+                    CONF_QUIET_END,
+                    default=options.get(CONF_QUIET_END, DEFAULT_QUIET_END),
+                ): selector.TimeSelector(),
+                vol.Optional(
+                    CONF_POOL_SLOTS,
+                    default=options.get(CONF_POOL_SLOTS, DEFAULT_POOL_SLOTS),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=data_schema)
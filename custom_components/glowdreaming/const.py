@@ -1,53 +1,34 @@
 """Constants"""
-import voluptuous as vol
-from enum import Enum
-
-from homeassistant.helpers.config_validation import make_entity_service_schema
-import homeassistant.helpers.config_validation as cv
+from .glowdreaming_api.connection import DEFAULT_IDLE_TIMEOUT_SECONDS, POLICY_ALWAYS
+from .glowdreaming_api.const import RECONCILE_TIMEOUT_SECONDS
+from .glowdreaming_api.pool import DEFAULT_POOL_SLOTS
 
 DOMAIN = "glowdreaming"
+# hass.data[DOMAIN] key holding one ConnectionPool per adapter/proxy source
+DATA_POOLS = "pools"
+# hass.data[DOMAIN] key holding the PollScheduler staggering every device's polls
+DATA_SCHEDULER = "scheduler"
 DEVICE_STARTUP_TIMEOUT_SECONDS = 30
+# Covers establish_connection's retries as well as the state read
+UPDATE_TIMEOUT_SECONDS = 60
+# Last-known state kept across restarts; written at most once per delay
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY_SECONDS = 30
 
-class Schema(Enum):
-    """General used service schema definition"""
-
-    SET_MODE = make_entity_service_schema(
-        {
-            vol.Required("light_effect"): cv.string,
-            vol.Required("brightness"): cv.string,
-            vol.Required("volume"): cv.string,
-            vol.Required("humidifier"): cv.string
-        }
-    )
-    SET_SLEEP_BRIGHTNESS = make_entity_service_schema(
-        {
-            vol.Required("brightness"): cv.string
-        }
-    )
-    SET_AWAKE_BRIGHTNESS = make_entity_service_schema(
-        {
-            vol.Required("brightness"): cv.string
-        }
-    )
-    SET_HUMIDIFIER = make_entity_service_schema(
-        {
-            vol.Required("humidifier"): cv.string
-        }
-    )
-    SET_VOLUME = make_entity_service_schema(
-        {
-            vol.Required("volume"): cv.string
-        }
-    )
-    WRITE_GATT = make_entity_service_schema(
-        {
-            vol.Required("target_uuid"): cv.string,
-            vol.Required("data"): cv.string
-        }
-    )
-    READ_GATT = make_entity_service_schema(
-        {
-            vol.Required("target_uuid"): cv.string
-        }
-    )
-    REFRESH_STATE = make_entity_service_schema({})
+# Options
+CONF_RECONCILE_TIMEOUT = "reconcile_timeout"
+DEFAULT_RECONCILE_TIMEOUT = RECONCILE_TIMEOUT_SECONDS
+CONF_CONNECTION_POLICY = "connection_policy"
+DEFAULT_CONNECTION_POLICY = POLICY_ALWAYS
+CONF_IDLE_TIMEOUT = "idle_timeout"
+DEFAULT_IDLE_TIMEOUT = DEFAULT_IDLE_TIMEOUT_SECONDS
+CONF_WINDOW_START = "window_start"
+DEFAULT_WINDOW_START = "19:00:00"
+CONF_WINDOW_END = "window_end"
+DEFAULT_WINDOW_END = "07:00:00"
+CONF_QUIET_START = "quiet_start"
+DEFAULT_QUIET_START = "00:00:00"
+CONF_QUIET_END = "quiet_end"
+DEFAULT_QUIET_END = "00:00:00"
+# Shared by every device on the same adapter; the last device set up decides
+CONF_POOL_SLOTS = "pool_slots"
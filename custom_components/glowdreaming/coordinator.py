@@ -1,6 +1,7 @@
 """Provides the DataUpdateCoordinator."""
 from __future__ import annotations
 
+import asyncio
 import logging
 import async_timeout
 from datetime import timedelta
@@ -8,44 +9,130 @@ from datetime import timedelta
 from bleak import BleakError
 from bleak.backends.device import BLEDevice
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
 
-from .glowdreaming_api.device import GlowdreamingDevice
-from .const import DOMAIN, DEVICE_STARTUP_TIMEOUT_SECONDS
+from .glowdreaming_api.device import CircuitOpenError, DeviceStoppedError, GlowdreamingDevice
+from .glowdreaming_api.polling import AdaptivePollInterval, PollScheduler
+from .glowdreaming_api.state import GlowdreamingState
+from .const import DOMAIN, DEVICE_STARTUP_TIMEOUT_SECONDS, UPDATE_TIMEOUT_SECONDS
 
 _LOGGER = logging.getLogger(__name__)
 
-class BTCoordinator(DataUpdateCoordinator):
+# Shortest poll interval while notifications push every change; the watchdog
+# only has to catch missed pushes
+WATCHDOG_INTERVAL = timedelta(minutes=5)
+
+class BTCoordinator(DataUpdateCoordinator[GlowdreamingState]):
     """Class to manage fetching generic bt data."""
 
     def __init__(
         self, hass: HomeAssistant, logger: logging.Logger, device: GlowdreamingDevice, ble_device: BLEDevice,
-            device_name: str, base_unique_id: str | None
+            device_name: str, base_unique_id: str | None, interval: AdaptivePollInterval | None = None,
+            scheduler: PollScheduler | None = None,
     ) -> None:
+        interval = interval or AdaptivePollInterval()
         super().__init__(
             hass,
             _LOGGER,
             name="Glowdreaming",
-            update_interval=timedelta(seconds=30),
+            update_interval=timedelta(seconds=interval.seconds),
+            # Snapshots compare by value; unchanged polls don't wake entities
+            always_update=False,
         )
         self._device = device
         self.ble_device = ble_device
         self.device_name = device_name
         self.base_unique_id = base_unique_id
+        self._notifications_seen = 0
+        # Trusted once the first notification arrived, until a poll finds a missed one
+        self._push_healthy = False
+        self.push_misses = 0
+        self._interval = interval
+        self._scheduler = scheduler
+        self.polls = 0
+        # The refresh setup starts in the background; unload cancels it
+        self.first_refresh: asyncio.Task | None = None
+        # Entities start from the device's current snapshot rather than
+        # waiting for a first refresh
+        self.data = device.state
+
+    @property
+    def device(self) -> GlowdreamingDevice:
+        return self._device
+
+    @property
+    def poll_interval(self) -> float:
+        """Adaptive poll interval in seconds, before the scheduler's offset."""
+        return self._interval.seconds
+
+    @property
+    def push_mode(self) -> bool:
+        """True while notifications are trusted to deliver every change."""
+        return self._device.notifying and self._push_healthy
+
+    @callback
+    def async_handle_push(self) -> None:
+        """Publish the device state after a notification, write or on-demand read, if it changed."""
+        if self._device.notifications != self._notifications_seen:
+            self._notifications_seen = self._device.notifications
+            self._push_healthy = True
+        state = self._device.state
+        if state == self.data:
+            self._async_adjust_interval()
+            return
+        self._interval.activity()
+        self._async_adjust_interval()
+        self.async_set_updated_data(state)
+
+    @callback
+    def _async_adjust_interval(self) -> None:
+        """Follow device activity, stretched to the watchdog period while pushes arrive.
+
+        With a scheduler the next poll is moved onto this device's phase so
+        several devices don't poll (and connect) at the same moment.
+        """
+        interval = timedelta(seconds=self._interval.seconds)
+        if self.push_mode:
+            interval = max(interval, WATCHDOG_INTERVAL)
+        if self._scheduler is not None:
+            interval = timedelta(seconds=self._scheduler.delay(self, interval.total_seconds()))
+        if interval != self.update_interval:
+            _LOGGER.debug("Poll interval now %s", interval)
+            self.update_interval = interval
+
+    def needs_poll(self) -> bool:
+        """Only connect for a poll while connected or while the device still advertises."""
+        return self._device.connected or self._device.reachable
 
     async def _async_update_data(self):
+        if not self.needs_poll():
+            # Out of range; async_track_unavailable already marked it unavailable
+            _LOGGER.debug("Device is not advertising; skipping poll")
+            return self.data
+        self.polls += 1
         try:
-            async with async_timeout.timeout(10):
+            async with async_timeout.timeout(UPDATE_TIMEOUT_SECONDS):
                 await self._device.update()
         except TimeoutError as exc:
             raise UpdateFailed(
                 "Connection timed out while fetching data from device"
             ) from exc
-        except BleakError as exc:
-            raise UpdateFailed("Failed getting data from device") from exc
+        except (BleakError, CircuitOpenError, DeviceStoppedError) as exc:
+            raise UpdateFailed(f"Failed getting data from device: {exc}") from exc
 
-        return self._device
+        state = self._device.state
+        if self.push_mode and self.data is not None and state != self.data:
+            # The watchdog read something no notification told us about
+            _LOGGER.debug("Poll found a change that was not pushed; polling more often")
+            self.push_misses += 1
+            self._push_healthy = False
+        if self.data is not None and state != self.data:
+            self._interval.activity()
+        else:
+            self._interval.idle()
+        self._async_adjust_interval()
+        return state
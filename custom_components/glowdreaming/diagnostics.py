@@ -0,0 +1,52 @@
+"""Diagnostics support for Glowdreaming."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_ADDRESS
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import BTCoordinator
+
+TO_REDACT = {CONF_ADDRESS}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: BTCoordinator = hass.data[DOMAIN][entry.entry_id]
+    device = coordinator.device
+    state = coordinator.data
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "state": {
+            "mode": state.mode if state else None,
+            "mode_hex": state.mode_hex if state else None,
+            "stale": state.stale if state else None,
+        },
+        "connection": {
+            "state": device.connection_state,
+            "notifying": device.notifying,
+            "ack_latency": device.ack_latency,
+            "ack_latency_avg": device.ack_latency_avg,
+            "ack_misses": device.ack_misses,
+            "rssi": device.rssi,
+            "advertisements": device.advertisements,
+            **device.policy.stats,
+            **device.breaker.stats,
+            **device.pool.stats,
+        },
+        "coordinator": {
+            "update_interval": coordinator.update_interval.total_seconds(),
+            "poll_interval": coordinator.poll_interval,
+            "polls": coordinator.polls,
+            "push_mode": coordinator.push_mode,
+            "push_misses": coordinator.push_misses,
+        },
+        "packets": device.capture.dump(),
+    }
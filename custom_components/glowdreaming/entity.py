@@ -5,10 +5,10 @@ import logging
 
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers import device_registry as dr
-from homeassistant.core import callback
 
 from .coordinator import BTCoordinator
 from .glowdreaming_api.device import GlowdreamingDevice
+from .glowdreaming_api.state import GlowdreamingState
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,7 +21,7 @@ class BTEntity(CoordinatorEntity[BTCoordinator]):
     def __init__(self, coordinator: BTCoordinator) -> None:
         """Initialize the entity."""
         super().__init__(coordinator)
-        self._device = coordinator.data
+        self._device = coordinator.device
         self._address = coordinator.ble_device.address
         self._attr_unique_id = coordinator.base_unique_id
         self._attr_device_info = {
@@ -29,13 +29,12 @@ class BTEntity(CoordinatorEntity[BTCoordinator]):
             "name": coordinator.device_name
         }
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._device = self.coordinator.data
-        self.async_write_ha_state()
+    @property
+    def _state(self) -> GlowdreamingState:
+        """The latest snapshot; read this rather than the live device."""
+        return self.coordinator.data
 
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
-        return self._device.connected
+        return self._device.available
@@ -0,0 +1,83 @@
+"""Bounded capture of the last raw packets exchanged with a device"""
+
+import time
+from typing import Any
+
+DIRECTION_IN = "in"
+DIRECTION_OUT = "out"
+
+SOURCE_NOTIFY = "notify"
+SOURCE_READ = "read"
+SOURCE_WRITE = "write"
+
+PACKET_CAPTURE_SIZE = 64
+
+
+class PacketCapture:
+    """Fixed-size ring buffer of the last packets and commands.
+
+    Every slot is allocated up front and recording only overwrites the
+    oldest one, so keeping the capture running costs a few stores per
+    packet. Nothing is formatted until dump() is called.
+    """
+
+    __slots__ = ("size", "_timestamps", "_directions", "_sources", "_payloads", "_latencies", "_next", "_count")
+
+    def __init__(self, size: int = PACKET_CAPTURE_SIZE) -> None:
+        self.size = size
+        self._timestamps = [0.0] * size
+        self._directions = [""] * size
+        self._sources = [""] * size
+        self._payloads = [b""] * size
+        self._latencies = [0.0] * size
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def record(self, timestamp: float, direction: str, source: str, payload: bytes, latency: float = 0.0) -> None:
+        """Store one packet, replacing the oldest once the buffer is full."""
+        index = self._next
+        self._timestamps[index] = timestamp
+        self._directions[index] = direction
+        self._sources[index] = source
+        self._payloads[index] = payload
+        self._latencies[index] = latency
+        self._next = (index + 1) % self.size
+        if self._count < self.size:
+            self._count += 1
+
+    def entries(self) -> list[tuple[float, str, str, bytes, float]]:
+        """Return (timestamp, direction, source, payload, latency) tuples, oldest first."""
+        start = (self._next - self._count) % self.size
+        return [
+            (
+                self._timestamps[index],
+                self._directions[index],
+                self._sources[index],
+                self._payloads[index],
+                self._latencies[index],
+            )
+            for index in ((start + offset) % self.size for offset in range(self._count))
+        ]
+
+    def dump(self, now: float | None = None) -> list[dict[str, Any]]:
+        """Return the captured packets as JSON-friendly dicts, oldest first."""
+        if now is None:
+            now = time.monotonic()
+        return [
+            {
+                "timestamp": timestamp,
+                "age": round(now - timestamp, 3),
+                "direction": direction,
+                "source": source,
+                "data": payload.hex(),
+                "decode_latency_us": round(latency * 1_000_000, 1),
+            }
+            for timestamp, direction, source, payload, latency in self.entries()
+        ]
+
+    def clear(self) -> None:
+        self._next = 0
+        self._count = 0
@@ -0,0 +1,136 @@
+"""Lookup tables for decoding Glow Dreaming state packets and encoding commands"""
+from types import MappingProxyType
+
+from .const import GDBrightness, GDEffect, GDHumidifier, GDVolume
+
+# Packets shorter than this cannot be decoded
+STATE_PACKET_MIN_LENGTH = 10
+
+
+def _byte_table(mapping: dict, default) -> tuple:
+    """Expand a sparse byte -> value mapping into a 256 entry tuple."""
+    return tuple(mapping.get(value, default) for value in range(256))
+
+
+# byte[0] (red) / byte[1] (green) raw brightness -> level
+BRIGHTNESS_LEVELS: tuple[GDBrightness, ...] = _byte_table(
+    {10: GDBrightness.LOW, 40: GDBrightness.MEDIUM, 100: GDBrightness.HIGH},
+    GDBrightness.NONE,
+)
+
+# byte[3] raw volume -> level
+VOLUME_LEVELS: tuple[GDVolume, ...] = _byte_table(
+    {1: GDVolume.LOW, 2: GDVolume.MEDIUM, 3: GDVolume.HIGH},
+    GDVolume.NONE,
+)
+
+# byte[9] humidifier option, only meaningful while byte[4] == 1
+HUMIDIFIER_MODES: tuple[GDHumidifier, ...] = _byte_table(
+    {1: GDHumidifier.TWO, 2: GDHumidifier.FOUR},
+    GDHumidifier.CONTINUOUS,
+)
+
+# Indexed by [red > 0][green > 0]; red wins when both channels are lit
+EFFECTS: tuple[tuple[GDEffect, GDEffect], tuple[GDEffect, GDEffect]] = (
+    (GDEffect.NONE, GDEffect.AWAKE),
+    (GDEffect.SLEEP, GDEffect.SLEEP),
+)
+
+
+# Command packet layout:
+# [red, green, 0, volume, humidifier x4, device_lock, 0]
+_BRIGHTNESS_BYTES = {
+    GDBrightness.NONE: 0x00,
+    GDBrightness.LOW: 0x0a,
+    GDBrightness.MEDIUM: 0x28,
+    GDBrightness.HIGH: 0x64,
+}
+_VOLUME_BYTES = {
+    GDVolume.NONE: 0x00,
+    GDVolume.LOW: 0x01,
+    GDVolume.MEDIUM: 0x02,
+    GDVolume.HIGH: 0x03,
+}
+_HUMIDIFIER_BYTES = {
+    GDHumidifier.NONE: bytes.fromhex("0000ffff"),
+    GDHumidifier.TWO: bytes.fromhex("01000078"),
+    GDHumidifier.FOUR: bytes.fromhex("010000f0"),
+    GDHumidifier.CONTINUOUS: bytes.fromhex("1010ffff"),
+}
+_DEVICE_LOCK = 0x00 # or 01 if locked
+_EFFECT_KEYS = frozenset(GDEffect)
+
+
+def _encode(effect: GDEffect, brightness: GDBrightness, volume: GDVolume, humidifier: GDHumidifier) -> bytes:
+    level = _BRIGHTNESS_BYTES[brightness]
+    red = level if effect is GDEffect.SLEEP else 0
+    green = level if effect is GDEffect.AWAKE else 0
+    return (
+        bytes((red, green, 0x00, _VOLUME_BYTES[volume]))
+        + _HUMIDIFIER_BYTES[humidifier]
+        + bytes((_DEVICE_LOCK, 0x00))
+    )
+
+
+# Every valid (effect, brightness, volume, humidifier) command, encoded once
+COMMANDS: MappingProxyType[tuple[GDEffect, GDBrightness, GDVolume, GDHumidifier], bytes] = MappingProxyType({
+    (effect, brightness, volume, humidifier): _encode(effect, brightness, volume, humidifier)
+    for effect in GDEffect
+    for brightness in GDBrightness
+    for volume in GDVolume
+    for humidifier in GDHumidifier
+})
+
+
+def encode_command(effect, brightness, volume, humidifier) -> bytes:
+    """Return the command packet for a full device state.
+
+    Unknown values (e.g. None before the first packet was decoded) encode as
+    their NONE member, matching the original command string builder.
+    """
+    try:
+        return COMMANDS[effect, brightness, volume, humidifier]
+    except KeyError:
+        return COMMANDS[
+            effect if effect in _EFFECT_KEYS else GDEffect.NONE,
+            brightness if brightness in _BRIGHTNESS_BYTES else GDBrightness.NONE,
+            volume if volume in _VOLUME_BYTES else GDVolume.NONE,
+            humidifier if humidifier in _HUMIDIFIER_BYTES else GDHumidifier.NONE,
+        ]
+
+
+_HUMIDIFIER_FROM_BYTES = {value: key for key, value in _HUMIDIFIER_BYTES.items()}
+
+
+def decode_command(command: bytes) -> tuple[GDEffect, GDBrightness, GDVolume, GDHumidifier]:
+    """Return the (effect, brightness, volume, humidifier) a command asks for.
+
+    The result is normalised the same way state packets decode, e.g. an
+    effect with no brightness reads back as GDEffect.NONE.
+    """
+    red = command[0]
+    green = command[1]
+    return (
+        EFFECTS[red > 0][green > 0],
+        BRIGHTNESS_LEVELS[max(red, green)],
+        VOLUME_LEVELS[command[3]],
+        _HUMIDIFIER_FROM_BYTES.get(bytes(command[4:8]), GDHumidifier.NONE),
+    )
+
+
+def decode_summary(packet) -> tuple[GDEffect, GDBrightness, GDVolume, GDHumidifier] | None:
+    """Return the (effect, brightness, volume, humidifier) a state packet reports.
+
+    This is the form decode_command returns, so a packet can be checked
+    against a command. Returns None for packets too short to decode.
+    """
+    if not packet or len(packet) < STATE_PACKET_MIN_LENGTH:
+        return None
+    red = packet[0]
+    green = packet[1]
+    return (
+        EFFECTS[red > 0][green > 0],
+        BRIGHTNESS_LEVELS[max(red, green, packet[2])],
+        VOLUME_LEVELS[packet[3]],
+        HUMIDIFIER_MODES[packet[9]] if packet[4] == 1 else GDHumidifier.NONE,
+    )
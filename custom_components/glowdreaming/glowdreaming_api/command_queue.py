@@ -0,0 +1,89 @@
+"""Latest-wins coalescing of state changes into device writes"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CommandQueue:
+    """Merge bursts of partial state changes into as few writes as possible.
+
+    Changes submitted while a write is in flight are merged into one pending
+    desired state (later values win), and only that newest state is sent once
+    the link is free again. Every caller whose change went into a write awaits
+    the same completion future.
+    """
+
+    def __init__(self, send: Callable[[dict[str, Any]], Awaitable[None]]) -> None:
+        self._send = send
+        self._pending: dict[str, Any] = {}
+        self._future: asyncio.Future[None] | None = None
+        # The future of the write being sent, while _drain sends it
+        self._inflight: asyncio.Future[None] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._submitted = 0
+        self._sent = 0
+
+    @property
+    def busy(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending(self) -> dict[str, Any]:
+        return dict(self._pending)
+
+    @property
+    def submitted(self) -> int:
+        """Number of change requests received."""
+        return self._submitted
+
+    @property
+    def sent(self) -> int:
+        """Number of writes actually made."""
+        return self._sent
+
+    async def submit(self, **changes: Any) -> None:
+        """Queue changes and wait until a write containing them completed."""
+        self._submitted += 1
+        self._pending.update(changes)
+        if self._future is None:
+            self._future = asyncio.get_running_loop().create_future()
+        future = self._future
+        if not self.busy:
+            self._task = asyncio.create_task(self._drain())
+        # Shield so one cancelled caller does not cancel the write for everyone
+        await asyncio.shield(future)
+
+    async def cancel(self) -> None:
+        """Drop the pending changes and stop the write in flight.
+
+        Callers still waiting on either are cancelled.
+        """
+        task, self._task = self._task, None
+        for future in (self._inflight, self._future):
+            if future is not None and not future.done():
+                future.cancel()
+        self._inflight = self._future = None
+        self._pending = {}
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.wait([task])
+
+    async def _drain(self) -> None:
+        while self._future is not None:
+            changes, self._pending = self._pending, {}
+            future = self._inflight = self._future
+            self._future = None
+            self._sent += 1
+            _LOGGER.debug("Writing coalesced changes %s", changes)
+            try:
+                await self._send(changes)
+            except Exception as exc:  # pylint: disable=broad-except
+                future.set_exception(exc)
+            else:
+                future.set_result(None)
+            finally:
+                self._inflight = None
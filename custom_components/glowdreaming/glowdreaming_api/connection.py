@@ -0,0 +1,196 @@
+"""Connection policies deciding how long a device stays connected"""
+
+import random
+import time as monotonic_time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from datetime import datetime, time, timedelta
+from enum import StrEnum
+
+POLICY_ALWAYS = "always"
+POLICY_IDLE = "idle"
+POLICY_WINDOW = "window"
+
+POLICIES = [POLICY_ALWAYS, POLICY_IDLE, POLICY_WINDOW]
+
+DEFAULT_IDLE_TIMEOUT_SECONDS = 60.0
+
+
+class ConnectionState(StrEnum):
+    """Lifecycle of the single client a device owns."""
+
+    DISCONNECTED = "disconnected"
+    CONNECTING = "connecting"
+    CONNECTED = "connected"
+    DISCONNECTING = "disconnecting"
+
+
+def in_time_window(start: time, end: time, current: time) -> bool:
+    """Whether `current` falls in the daily window [start, end), which may wrap midnight."""
+    if start <= end:
+        return start <= current < end
+    return current >= start or current < end
+
+
+class ConnectionPolicy(ABC):
+    """Decide when an idle connection should be released.
+
+    The device asks the policy after every bit of link activity; connects
+    and disconnects made while the policy is in charge are counted here.
+    """
+
+    name = ""
+
+    def __init__(self) -> None:
+        self.connects = 0
+        self.disconnects = 0
+        self.idle_disconnects = 0
+
+    @abstractmethod
+    def disconnect_after(self) -> float | None:
+        """Seconds of inactivity after which to disconnect, or None to stay connected."""
+
+    @property
+    def stats(self) -> dict[str, int | str]:
+        return {
+            "policy": self.name,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "idle_disconnects": self.idle_disconnects,
+        }
+
+
+class AlwaysConnectedPolicy(ConnectionPolicy):
+    """Connect once and stay connected, for the lowest latency."""
+
+    name = POLICY_ALWAYS
+
+    def disconnect_after(self) -> float | None:
+        return None
+
+
+class IdleLeasePolicy(ConnectionPolicy):
+    """Release the connection slot after a period without activity."""
+
+    name = POLICY_IDLE
+
+    def __init__(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS) -> None:
+        super().__init__()
+        self.idle_timeout = idle_timeout
+
+    def disconnect_after(self) -> float | None:
+        return self.idle_timeout
+
+
+class ScheduledWindowPolicy(IdleLeasePolicy):
+    """Stay connected inside a daily time window, lease the link outside it.
+
+    Windows may wrap midnight (e.g. 19:00 - 07:00 for overnight use).
+    """
+
+    name = POLICY_WINDOW
+
+    def __init__(
+        self,
+        start: time,
+        end: time,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS,
+        clock: Callable[[], datetime] = datetime.now,
+    ) -> None:
+        super().__init__(idle_timeout)
+        self.start = start
+        self.end = end
+        self._clock = clock
+
+    def in_window(self, now: datetime | None = None) -> bool:
+        return in_time_window(self.start, self.end, (now or self._clock()).time())
+
+    def disconnect_after(self) -> float | None:
+        now = self._clock()
+        if not self.in_window(now):
+            return self.idle_timeout
+        # Keep the link up until the window closes, then lease as usual
+        end = datetime.combine(now.date(), self.end, now.tzinfo)
+        if end <= now:
+            end += timedelta(days=1)
+        return (end - now).total_seconds() + self.idle_timeout
+
+
+def make_policy(
+    name: str,
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS,
+    window_start: time | None = None,
+    window_end: time | None = None,
+    clock: Callable[[], datetime] = datetime.now,
+) -> ConnectionPolicy:
+    """Build the policy selected by name."""
+    if name == POLICY_IDLE:
+        return IdleLeasePolicy(idle_timeout)
+    if name == POLICY_WINDOW and window_start is not None and window_end is not None:
+        return ScheduledWindowPolicy(window_start, window_end, idle_timeout, clock)
+    return AlwaysConnectedPolicy()
+
+
+class CircuitBreaker:
+    """Back off from a device that keeps failing to connect.
+
+    After failure_threshold consecutive failures the breaker opens and
+    connect attempts are skipped until an exponentially growing, jittered
+    delay has passed. The next attempt is a trial: success closes the
+    breaker, failure re-opens it for longer.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 2,
+        base_delay: float = 15.0,
+        max_delay: float = 600.0,
+        jitter: float = 0.2,
+        clock: Callable[[], float] = monotonic_time.monotonic,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self._clock = clock
+        self._rng = rng
+        self.failures = 0
+        self.skipped = 0
+        self._retry_at = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self.failures >= self.failure_threshold and self._clock() < self._retry_at
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the next attempt is allowed."""
+        return max(0.0, self._retry_at - self._clock()) if self.failures >= self.failure_threshold else 0.0
+
+    def allow(self) -> bool:
+        """Return whether a connect attempt may be made now."""
+        if self.is_open:
+            self.skipped += 1
+            return False
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._retry_at = 0.0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures < self.failure_threshold:
+            return
+        delay = min(self.max_delay, self.base_delay * 2 ** (self.failures - self.failure_threshold))
+        delay *= 1 + self.jitter * (2 * self._rng() - 1)
+        self._retry_at = self._clock() + delay
+
+    @property
+    def stats(self) -> dict[str, int | float | bool]:
+        return {
+            "breaker_open": self.is_open,
+            "connect_failures": self.failures,
+            "connects_skipped": self.skipped,
+        }
@@ -3,6 +3,9 @@ from enum import StrEnum, IntEnum
 
 CHAR_CHARACTERISTIC = "c28909e04d8632a9914333c7c5e6ec29"
 
+# How long optimistic state waits for the device to confirm a write
+RECONCILE_TIMEOUT_SECONDS = 3.0
+
 class GDSound(IntEnum):
     WHITE_NOISE = 0
 
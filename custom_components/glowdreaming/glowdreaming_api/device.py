@@ -2,15 +2,80 @@
 
 import asyncio
 import logging
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
 from uuid import UUID
-from contextlib import AsyncExitStack
 
-from bleak import BleakClient
-from bleak.exc import BleakError
+from .codec import (
+    BRIGHTNESS_LEVELS,
+    EFFECTS,
+    HUMIDIFIER_MODES,
+    STATE_PACKET_MIN_LENGTH,
+    VOLUME_LEVELS,
+    decode_command,
+    decode_summary,
+    encode_command,
+)
+from .capture import (
+    DIRECTION_IN,
+    DIRECTION_OUT,
+    SOURCE_NOTIFY,
+    SOURCE_READ,
+    SOURCE_WRITE,
+    PacketCapture,
+)
+from .command_queue import CommandQueue
+from .connection import AlwaysConnectedPolicy, CircuitBreaker, ConnectionPolicy, ConnectionState
 from .const import *
+from .pool import PRIORITY_COMMAND, PRIORITY_POLL, ConnectionPool
+from .state import GlowdreamingState
+
+if TYPE_CHECKING:
+    from bleak import BleakClient
 
 _LOGGER = logging.getLogger(__name__)
 
+# How long a fresh subscription waits for the device to push its state
+NOTIFY_TIMEOUT_SECONDS = 1.0
+
+# How long a write waits for a notification acknowledging it before reading
+ACK_TIMEOUT_SECONDS = 2.0
+
+# read_fresh: maximum reads, and the delay before the first re-read (doubles)
+FRESH_READ_ATTEMPTS = 4
+FRESH_READ_BACKOFF_SECONDS = 0.1
+
+# Connect attempts establish_connection makes before giving up on a poll
+CONNECT_ATTEMPTS = 3
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of connecting while the circuit breaker is open."""
+
+
+class DeviceStoppedError(Exception):
+    """Raised instead of connecting after stop(), until start() is called."""
+
+
+# (ble_device, disconnected_callback, ble_device_callback) -> connected client
+Connector = Callable[[Any, Callable[[Any], None], Callable[[], Any]], Awaitable[Any]]
+
+
+async def _establish_connection(ble_device, disconnected_callback, ble_device_callback):
+    """Connect through bleak_retry_connector, imported on first use."""
+    from bleak_retry_connector import BleakClientWithServiceCache, establish_connection
+
+    return await establish_connection(
+        BleakClientWithServiceCache,
+        ble_device,
+        ble_device.name or ble_device.address,
+        disconnected_callback=disconnected_callback,
+        max_attempts=CONNECT_ATTEMPTS,
+        ble_device_callback=ble_device_callback,
+    )
+
 # def get_mode_from_string(value: str):
 #     if value == "000000000001000000000044":
 #         return "Off - All"
@@ -43,14 +108,81 @@ _LOGGER = logging.getLogger(__name__)
 
 class GlowdreamingDevice:
     """Generic BT Device Class"""
-    def __init__(self, ble_device):
+    def __init__(
+        self,
+        ble_device,
+        reconcile_timeout: float = RECONCILE_TIMEOUT_SECONDS,
+        policy: ConnectionPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        pool: ConnectionPool | None = None,
+        connector: Connector | None = None,
+    ):
         self._ble_device = ble_device
-        self._client: BleakClient | None = None
-        self._client_stack = AsyncExitStack()
+        # Opens the link; a simulator can stand in for bleak_retry_connector
+        self._connector = connector or _establish_connection
+        # The one client owned at a time; only set while CONNECTED or DISCONNECTING
+        self._client: "BleakClient | None" = None
+        self._state = ConnectionState.DISCONNECTED
         self._lock = asyncio.Lock()
-
-        self._mode_hex: str = "" # Temporary
-        self._mode: str = "unknown" # Temporary
+        self._char_uuid = UUID(CHAR_CHARACTERISTIC)
+        self._callbacks: list[Callable[[], None]] = []
+        self._commands = CommandQueue(self._write_state)
+        self._capture = PacketCapture()
+        # Set by stop(); nothing connects again until start()
+        self._stopped = False
+        # Tasks running update(), cancelled by stop()
+        self._update_tasks: set[asyncio.Task] = set()
+
+        # Connection policy and idle disconnect bookkeeping
+        self._policy = policy or AlwaysConnectedPolicy()
+        self._idle_handle: asyncio.TimerHandle | None = None
+        self._idle_task: asyncio.Task | None = None
+        self._idle_disconnected = False
+        self._breaker = breaker or CircuitBreaker()
+        # Polls, reads and writes in progress; the link is not evicted from under them
+        self._io_running = 0
+        # Slots shared with other devices on the same adapter; a private
+        # single-slot pool when the device is used on its own
+        self._pool = pool or ConnectionPool(slots=1)
+
+        # Presence as seen by passive advertisement scanning
+        self._rssi: int | None = None
+        self._last_seen: float | None = None
+        self._advertisements = 0
+        self._unreachable = False
+
+        # Persistent notification subscription state
+        self._notify_requested = False
+        self._notifying = False
+        self._notify_received = asyncio.Event()
+        # True until the first poll on a new subscription took its pushed state
+        self._notify_fresh = False
+        self._notifications = 0
+
+        # Optimistic state waiting to be confirmed by the device
+        self._reconcile_timeout = reconcile_timeout
+        self._expected: tuple | None = None
+        self._expected_deadline = 0.0
+        self._rollback: tuple | None = None
+        self._stale_packet: bytes | None = None
+        self._reconcile_handle: asyncio.TimerHandle | None = None
+        self._reconcile_task: asyncio.Task | None = None
+
+        # Write acknowledgement tracking
+        self._ack_expected: tuple | None = None
+        self._ack_event = asyncio.Event()
+        self._ack_started = 0.0
+        self._ack_latency: float | None = None
+        self._ack_count = 0
+        self._ack_total = 0.0
+        self._ack_misses = 0
+
+        # Raw last packet; mode/mode_hex strings are only built when read
+        self._raw: bytes = b""
+        self._mode_hex: str | None = None
+        self._mode: str | None = None
+        # True while showing a restored packet the device has not confirmed
+        self._stale = False
 
         self._power = None
         self._sound = None
@@ -61,31 +193,201 @@ class GlowdreamingDevice:
         self._last_brightness = None
         self._humidifier = None
         self._humidifier_timer = None
+        self._humidifier_timer_anchor: float | None = None
         self._device_lock = None
 
     async def update(self):
         _LOGGER.debug("Update called")
+        task = asyncio.current_task()
+        self._update_tasks.add(task)
         # Prefer notifications for freshest data; fall back to fresh read
-        try:
-            await self.subscribe_and_refresh()
-            return
-        except Exception:
-            _LOGGER.debug("Notify-based refresh failed or unsupported; falling back to read_fresh()", exc_info=True)
-            await self.read_fresh()
+        with self._using_link():
+            try:
+                await self.subscribe_and_refresh()
+            except Exception:
+                if not self.connected:
+                    # The connect failed or the link dropped; reading would only
+                    # connect again and count the same failure twice on the breaker
+                    raise
+                _LOGGER.debug("Notify-based refresh failed or unsupported; falling back to read_fresh()", exc_info=True)
+                await self.read_fresh()
+            finally:
+                self._update_tasks.discard(task)
+
+    def start(self) -> None:
+        """Allow connecting again after stop()."""
+        self._stopped = False
 
     async def stop(self):
-        pass
+        """Stop polls, queued writes, reconciliation and the notification
+        subscription, then close the connection.
+
+        Nothing started before stop() may reconnect afterwards; get_client()
+        raises DeviceStoppedError until start() is called.
+        """
+        self._stopped = True
+        self._cancel_idle()
+        self._notify_requested = False
+        await self._commands.cancel()
+        self._clear_expected()
+        for task in (self._reconcile_task, self._idle_task):
+            if task is not None and not task.done():
+                task.cancel()
+                await asyncio.wait([task])
+        self._reconcile_task = self._idle_task = None
+        updates = [task for task in self._update_tasks if task is not asyncio.current_task()]
+        for task in updates:
+            task.cancel()
+        if updates:
+            await asyncio.wait(updates)
+        if self._notifying and self._client:
+            try:
+                await self._client.stop_notify(self._char_uuid)
+            except Exception:
+                _LOGGER.debug("stop_notify failed", exc_info=True)
+        self._notifying = False
+        await self.disconnect()
+
+    def register_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Register a callback fired whenever a notification updates the state.
+
+        Returns a function that removes the callback again.
+        """
+        self._callbacks.append(callback)
+
+        def _unregister() -> None:
+            self._callbacks.remove(callback)
+
+        return _unregister
+
+    def _fire_callbacks(self) -> None:
+        for callback in list(self._callbacks):
+            callback()
 
     @property
     def connected(self):
-        return not self._client is None
+        return self._state is ConnectionState.CONNECTED
+
+    @property
+    def connection_state(self) -> ConnectionState:
+        return self._state
+
+    @property
+    def available(self) -> bool:
+        """Connected, or released on purpose by the policy and still advertising."""
+        return self.connected or (self._idle_disconnected and not self._unreachable)
+
+    @property
+    def stale(self) -> bool:
+        """True while the state is a restored one the device has not confirmed yet."""
+        return self._stale
+
+    @property
+    def reachable(self) -> bool:
+        """False once HA's Bluetooth stack stopped seeing the device advertise."""
+        return not self._unreachable
+
+    def mark_unreachable(self) -> None:
+        """Note that the device has stopped advertising."""
+        self._unreachable = True
+
+    @property
+    def notifying(self) -> bool:
+        return self._notifying
+
+    @property
+    def notifications(self) -> int:
+        """Number of notification packets received so far."""
+        return self._notifications
+
+    @property
+    def rssi(self) -> int | None:
+        """Signal strength of the last advertisement seen."""
+        return self._rssi
+
+    @property
+    def last_seen(self) -> float | None:
+        """time.monotonic() of the last advertisement seen, if any."""
+        return self._last_seen
+
+    @property
+    def advertisements(self) -> int:
+        return self._advertisements
+
+    def seen_within(self, seconds: float) -> bool:
+        """Whether the device advertised in the last `seconds`."""
+        return self._last_seen is not None and time.monotonic() - self._last_seen <= seconds
+
+    @property
+    def capture(self) -> PacketCapture:
+        """The last raw packets received and commands sent."""
+        return self._capture
+
+    @property
+    def policy(self) -> ConnectionPolicy:
+        return self._policy
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return self._pool
+
+    @property
+    def busy(self) -> bool:
+        """True while the link is being used or a write awaits its acknowledgement."""
+        return (
+            self._lock.locked() or self._io_running > 0 or self._commands.busy
+            or self._ack_expected is not None
+        )
+
+    @property
+    def ack_latency(self) -> float | None:
+        """Seconds between the last acknowledged write and its confirmation."""
+        return self._ack_latency
+
+    @property
+    def ack_latency_avg(self) -> float | None:
+        if not self._ack_count:
+            return None
+        return self._ack_total / self._ack_count
+
+    @property
+    def ack_misses(self) -> int:
+        """Writes the device never confirmed, not even on the fallback read."""
+        return self._ack_misses
+
+    @property
+    def reconciling(self) -> bool:
+        """True while optimistic state is waiting for the device to confirm it."""
+        return self._expected is not None
+
+    @property
+    def state(self) -> GlowdreamingState:
+        """Snapshot of the current state that later packets will not change."""
+        return GlowdreamingState(
+            self.connected, self._raw, self._power, self._sound, self._volume, self._brightness,
+            self._effect, self._last_effect, self._last_brightness, self._humidifier,
+            self._humidifier_timer, self._device_lock, self._humidifier_timer_anchor, self._stale,
+        )
 
     @property
     def mode(self):
+        if self._mode is None:
+            if self._power is None:
+                return "unknown"
+            self._mode = (
+                f"Power: {self._power}, Volume: {self._volume}, Brightness: {self._brightness}, "
+                f"Effect: {self._effect}, Humidifier: {self._humidifier}, Timer: {self._humidifier_timer}"
+            )
         return self._mode
 
     @property
     def mode_hex(self):
+        if self._mode_hex is None:
+            self._mode_hex = self._raw.hex()
         return self._mode_hex
 
     @property
@@ -116,14 +418,7 @@ class GlowdreamingDevice:
     def volume_level(self) -> GDVolume:
         if self._volume is None:
             return GDVolume.NONE
-        elif self._volume == 1:
-            return GDVolume.LOW
-        elif self._volume == 2:
-            return GDVolume.MEDIUM
-        elif self._volume == 3:
-            return GDVolume.HIGH
-        else:
-            return GDVolume.NONE
+        return VOLUME_LEVELS[self._volume]
 
     @property
     def brightness(self):
@@ -133,14 +428,7 @@ class GlowdreamingDevice:
     def brightness_level(self) -> GDBrightness:
         if self._brightness is None:
             return GDBrightness.NONE
-        elif self._brightness == 10:
-            return GDBrightness.LOW
-        elif self._brightness == 40:
-            return GDBrightness.MEDIUM
-        elif self._brightness == 100:
-            return GDBrightness.HIGH
-        else:
-            return GDBrightness.NONE
+        return BRIGHTNESS_LEVELS[self._brightness]
 
     @property
     def effect(self):
@@ -154,31 +442,156 @@ class GlowdreamingDevice:
     def last_brightness(self):
         return self._last_brightness
 
-    async def get_client(self):
-        def disconnected_callback(client):
-            _LOGGER.info("Disconnected callback called!")
-            self._client = None
+    async def get_client(self, priority: int = PRIORITY_POLL):
+        """Make sure the device is connected, waiting for a pool slot if needed.
+
+        Commands pass PRIORITY_COMMAND so they are served before background
+        polls when every slot is busy. The slot is acquired before taking
+        the device lock, so a command is never stuck behind a poll of the
+        same device that is itself waiting for a slot.
+        """
+        new_connection = False
+        while True:
+            if self._stopped:
+                raise DeviceStoppedError("Device has been stopped")
+            if self._state is not ConnectionState.CONNECTED:
+                if not self._breaker.allow():
+                    raise CircuitOpenError(
+                        f"Device unreachable, next connect attempt in {self._breaker.retry_in:.0f}s")
+                await self._pool.acquire(self, priority)
+            try:
+                await self._lock.acquire()
+            except asyncio.CancelledError:
+                if self._state is ConnectionState.DISCONNECTED:
+                    # Cancelled before anyone connected; don't sit on the slot
+                    self._pool.release(self)
+                raise
+            try:
+                if self._stopped:
+                    # stop() ran while we waited for the slot or the lock
+                    if self._state is ConnectionState.DISCONNECTED:
+                        self._pool.release(self)
+                    raise DeviceStoppedError("Device has been stopped")
+                if self._state is ConnectionState.CONNECTED:
+                    _LOGGER.debug("Connection reused")
+                    self._pool.touch(self)
+                    break
+                if not self._pool.holds(self):
+                    # A failed connect gave the slot back while we waited for the lock
+                    continue
+                # bleak is only needed once something connects, so the protocol
+                # layer stays cheap to import for tools and tests
+                from bleak.exc import BleakError
 
-        async with self._lock:
-            if not self._client:
                 _LOGGER.debug("Connecting")
+                self._state = ConnectionState.CONNECTING
                 try:
-                    self._client = await self._client_stack.enter_async_context(
-                        BleakClient(self._ble_device, timeout=60, disconnected_callback=disconnected_callback))
+                    client = await self._connector(self._ble_device, self._on_disconnected, self._get_ble_device)
+                    self._client = client
+                    self._state = ConnectionState.CONNECTED
                     _LOGGER.debug("Made new connection")
-                except asyncio.TimeoutError as exc:
-                    _LOGGER.debug("Timeout on connect", exc_info=True)
-                    raise
-                except BleakError as exc:
+                    new_connection = True
+                    self._idle_disconnected = False
+                    self._breaker.record_success()
+                    self._policy.connects += 1
+                except (asyncio.TimeoutError, asyncio.CancelledError, BleakError):
+                    # A connect cancelled by the caller's timeout failed just the same
                     _LOGGER.debug("Error on connect", exc_info=True)
+                    self._state = ConnectionState.DISCONNECTED
+                    self._idle_disconnected = False
+                    self._breaker.record_failure()
+                    self._pool.release(self)
                     raise
-            else:
-                _LOGGER.debug("Connection reused")
+                break
+            finally:
+                self._lock.release()
+        self._touch()
+
+        # Notifications do not survive a reconnect, so restore the subscription
+        if new_connection and self._notify_requested:
+            try:
+                await self._start_notify()
+            except Exception:
+                _LOGGER.debug("Failed to restore notification subscription", exc_info=True)
+
+    def _on_disconnected(self, client) -> None:
+        """Bleak callback for a dropped link."""
+        if client is not self._client:
+            # A client already released (e.g. after disconnect()) reporting late
+            return
+        _LOGGER.info("Disconnected callback called!")
+        self._release_client()
+
+    def _release_client(self) -> None:
+        """Drop every reference to the current client and go back to DISCONNECTED."""
+        if self._client is None:
+            return
+        self._client = None
+        self._notifying = False
+        self._state = ConnectionState.DISCONNECTED
+        self._policy.disconnects += 1
+        self._pool.release(self)
+
+    @contextmanager
+    def _using_link(self) -> Iterator[None]:
+        """Count the block as busy so the pool does not evict the link during it."""
+        self._io_running += 1
+        try:
+            yield
+        finally:
+            self._io_running -= 1
+            self._touch()
+
+    def _touch(self) -> None:
+        """Note link activity and (re)arm the policy's idle disconnect."""
+        self._cancel_idle()
+        loop = asyncio.get_running_loop()
+        delay = self._policy.disconnect_after()
+        if delay is not None and self.connected:
+            self._idle_handle = loop.call_later(delay, self._idle_expired)
+        if self._pool.waiting:
+            # Once this bit of activity has unwound, a device waiting for a
+            # slot may take ours
+            loop.call_soon(self._pool.notify_idle)
+
+    def _cancel_idle(self) -> None:
+        if self._idle_handle:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+
+    def _idle_expired(self) -> None:
+        self._idle_handle = None
+        if not self.connected:
+            return
+        if self.busy:
+            # Still in use; try again after another idle period
+            self._touch()
+            return
+        self._idle_task = asyncio.create_task(self._idle_disconnect())
+
+    async def _idle_disconnect(self) -> None:
+        _LOGGER.debug("Releasing idle connection (%s policy)", self._policy.name)
+        self._policy.idle_disconnects += 1
+        self._idle_disconnected = True
+        try:
+            await self.disconnect()
+        except Exception:
+            _LOGGER.debug("Idle disconnect failed", exc_info=True)
+
+    async def evict(self) -> None:
+        """Give up the connection so another device on the adapter can have the slot."""
+        _LOGGER.debug("Connection slot needed by another device; disconnecting")
+        # Released on purpose, like an idle disconnect, so stay available
+        self._idle_disconnected = True
+        await self.disconnect()
 
     async def disconnect(self):
         async with self._lock:
-            if self._client:
+            if self._state is ConnectionState.CONNECTED:
+                from bleak.exc import BleakError
+
                 _LOGGER.debug("Disconnecting")
+                self._state = ConnectionState.DISCONNECTING
                 try:
                     await self._client.disconnect()
                 except asyncio.TimeoutError as exc:
@@ -187,205 +600,393 @@ class GlowdreamingDevice:
                 except BleakError as exc:
                     _LOGGER.debug("Error on connect", exc_info=True)
                     raise
+                finally:
+                    # Released whether or not the disconnect went through cleanly
+                    self._release_client()
             else:
                 _LOGGER.debug("Not connected, so nothing to disconnect")
 
     async def write_gatt(self, target_uuid, data):
-        await self.get_client()
-        uuid_str = "{" + target_uuid + "}"
-        uuid = UUID(uuid_str)
-        data_as_bytes = bytearray.fromhex(data)
-        await self._client.write_gatt_char(uuid, data_as_bytes, True)
+        with self._using_link():
+            await self.get_client(PRIORITY_COMMAND)
+            uuid_str = "{" + target_uuid + "}"
+            uuid = UUID(uuid_str)
+            data_as_bytes = bytearray.fromhex(data)
+            self._capture.record(time.monotonic(), DIRECTION_OUT, SOURCE_WRITE, bytes(data_as_bytes))
+            await self._client.write_gatt_char(uuid, data_as_bytes, True)
 
     async def read_gatt(self, target_uuid):
-        await self.get_client()
-        uuid_str = "{" + target_uuid + "}"
-        uuid = UUID(uuid_str)
-        data = await self._client.read_gatt_char(uuid)
-        _LOGGER.debug(f"Reading Gatt {data}")
-        self._refresh_data(data)
+        with self._using_link():
+            await self.get_client()
+            uuid_str = "{" + target_uuid + "}"
+            uuid = UUID(uuid_str)
+            data = await self._client.read_gatt_char(uuid)
+        _LOGGER.debug("Reading Gatt %s", data)
+        self._ingest(data, SOURCE_READ)
         return data
 
     async def subscribe_and_refresh(self):
-        """Start notify on the characteristic and wait briefly for an update.
-
-        Some devices only push current state via notifications. We subscribe,
-        wait up to a short timeout for a packet, then stop notifications.
+        """Ensure the persistent notification subscription is running, then refresh.
+
+        The subscription is made once per connection and every packet is fed
+        through _refresh_data as it arrives. A freshly made subscription
+        waits (briefly) for the device to push its current state, falling
+        back to reading the characteristic if nothing arrives. Once it is
+        running, the pushes keep the state current between polls, and a poll
+        reads the characteristic, which catches a change the device never
+        pushed.
         """
+        self._notify_requested = True
         await self.get_client()
-        uuid = UUID("{" + CHAR_CHARACTERISTIC + "}")
+        if not self._notifying:
+            await self._start_notify()
 
-        update_event = asyncio.Event()
-
-        def _handler(_sender, data: bytearray):
-            self._refresh_data(data)
-            # Signal that we got at least one notification
-            if not update_event.is_set():
-                update_event.set()
-
-        try:
-            await self._client.start_notify(uuid, _handler)
+        if self._notify_fresh:
+            self._notify_fresh = False
             try:
-                await asyncio.wait_for(update_event.wait(), timeout=1.0)
+                await asyncio.wait_for(self._notify_received.wait(), timeout=NOTIFY_TIMEOUT_SECONDS)
+                return
             except asyncio.TimeoutError:
                 _LOGGER.debug("No notification received within timeout; notify may be idle")
-            finally:
-                # Stop notify if we only wanted a one-shot refresh
-                try:
-                    await self._client.stop_notify(uuid)
-                except Exception:
-                    _LOGGER.debug("stop_notify failed", exc_info=True)
+        await self.read_fresh()
+
+    async def _start_notify(self):
+        if self._notifying or not self._client:
+            return
+        self._notify_received.clear()
+        await self._client.start_notify(self._char_uuid, self._handle_notification)
+        self._notifying = True
+        self._notify_fresh = True
+        _LOGGER.debug("Subscribed to notifications")
+
+    def _handle_notification(self, _sender, data: bytearray) -> None:
+        self._notifications += 1
+        self._ingest(data, SOURCE_NOTIFY)
+        self._notify_received.set()
+        self._fire_callbacks()
+
+    async def read_fresh(self):
+        """Read the state, re-reading only while the value is still converging.
+
+        The first read is used straight away when it matches the command
+        waiting for acknowledgement or, with nothing pending, the last known
+        packet. Otherwise the device may still be applying a change, so it
+        is read again with exponentially growing spacing until the value
+        matches the pending command (or, with none, two reads agree), up to
+        FRESH_READ_ATTEMPTS reads.
+        """
+        with self._using_link():
+            await self.get_client()
+            data = await self._client.read_gatt_char(self._char_uuid)
+            delay = FRESH_READ_BACKOFF_SECONDS
+            for _ in range(FRESH_READ_ATTEMPTS - 1):
+                if self._read_is_current(data):
+                    break
+                await asyncio.sleep(delay)
+                delay *= 2
+                previous = data
+                data = await self._client.read_gatt_char(self._char_uuid)
+                if self._ack_expected is None and data == previous:
+                    break
+
+        _LOGGER.debug("Fresh read Gatt %s", data)
+        self._ingest(data, SOURCE_READ)
+        return data
+
+    def _read_is_current(self, data) -> bool:
+        if self._ack_expected is not None:
+            return decode_summary(data) == self._ack_expected
+        return len(data) >= STATE_PACKET_MIN_LENGTH and data == self._raw
+
+    async def set_mode(self, effect: GDEffect, brightness: GDBrightness, volume: GDVolume, humidifier: GDHumidifier):
+        """Set the full device state."""
+        await self._commands.submit(effect=effect, brightness=brightness, volume=volume, humidifier=humidifier)
+
+    async def update_mode(
+        self,
+        *,
+        effect: GDEffect | None = None,
+        brightness: GDBrightness | None = None,
+        volume: GDVolume | None = None,
+        humidifier: GDHumidifier | None = None,
+    ):
+        """Change part of the device state, keeping the other fields as they are.
+
+        Changes made while another write is in flight are merged and sent
+        together, so e.g. a light and a volume change cannot overwrite each other.
+        """
+        changes = {
+            name: value
+            for name, value in (
+                ("effect", effect),
+                ("brightness", brightness),
+                ("volume", volume),
+                ("humidifier", humidifier),
+            )
+            if value is not None
+        }
+        await self._commands.submit(**changes)
+
+    async def _write_state(self, changes) -> None:
+        command = encode_command(
+            changes.get("effect", self._effect),
+            changes.get("brightness", self.brightness_level),
+            changes.get("volume", self.volume_level),
+            changes.get("humidifier", self._humidifier),
+        )
+        _LOGGER.debug("Setting mode %s", command)
+        self._apply_optimistic(command)
+        try:
+            await self.send_command(command)
         except Exception:
-            # Propagate to let caller fall back
+            self._restore_rollback()
             raise
 
+    def _snapshot(self) -> tuple:
+        return (
+            self._raw, self._power, self._sound, self._volume, self._brightness, self._effect,
+            self._last_effect, self._last_brightness, self._humidifier, self._humidifier_timer,
+            self._humidifier_timer_anchor,
+        )
 
-    async def read_fresh(self):
-        """Force a fresh read, retrying once after a short delay if needed."""
-        await self.get_client()
-        uuid = UUID("{" + CHAR_CHARACTERISTIC + "}")
+    def _apply_optimistic(self, command: bytes) -> None:
+        """Show the state a command asks for straight away.
 
-        data = await self._client.read_gatt_char(uuid)
-        # If the device sometimes lags, try a second read shortly after
-        await asyncio.sleep(0.5)
-        data = await self._client.read_gatt_char(uuid)
+        The next packet from the device confirms it; packets that disagree
+        are held back until the reconciliation deadline, after which the
+        device's report (or the previous state) wins.
+        """
+        effect, brightness, volume, humidifier = expected = decode_command(command)
+        if self._expected is None:
+            self._rollback = self._snapshot()
+            self._stale_packet = None
+        self._expected = expected
+        self._expected_deadline = time.monotonic() + self._reconcile_timeout
+        if self._reconcile_handle:
+            self._reconcile_handle.cancel()
+        self._reconcile_handle = asyncio.get_running_loop().call_later(
+            self._reconcile_timeout, self._reconcile_expired
+        )
+
+        self._brightness = max(command[0], command[1])
+        self._effect = effect
+        if brightness is not GDBrightness.NONE:
+            self._last_brightness = brightness
+        if effect is not GDEffect.NONE:
+            self._last_effect = effect
+        self._volume = command[3]
+        if humidifier is not self._humidifier:
+            # The command starts the new timer (byte 7, like a state packet);
+            # count it down from now rather than from the old mode's anchor
+            self._humidifier_timer = command[7]
+            self._humidifier_timer_anchor = time.monotonic()
+        self._humidifier = humidifier
+        self._mode = None
+        self._fire_callbacks()
+
+    def _clear_expected(self) -> None:
+        self._expected = None
+        self._rollback = None
+        self._stale_packet = None
+        if self._reconcile_handle:
+            self._reconcile_handle.cancel()
+            self._reconcile_handle = None
+
+    def _restore_rollback(self) -> None:
+        rollback = self._rollback
+        self._clear_expected()
+        if rollback is None:
+            return
+        _LOGGER.debug("Rolling back optimistic state")
+        (
+            self._raw, self._power, self._sound, self._volume, self._brightness, self._effect,
+            self._last_effect, self._last_brightness, self._humidifier, self._humidifier_timer,
+            self._humidifier_timer_anchor,
+        ) = rollback
+        self._mode = None
+        self._mode_hex = None
+        self._fire_callbacks()
+
+    def _reconcile_expired(self) -> None:
+        self._reconcile_handle = None
+        if self._expected is None:
+            return
+        stale = self._stale_packet
+        if stale is not None:
+            # The device kept reporting something else; believe it
+            _LOGGER.debug("Write was not confirmed; applying last reported state")
+            self._clear_expected()
+            self._refresh_data(stale)
+            self._fire_callbacks()
+        else:
+            # Nothing heard since the write; ask the device directly
+            self._reconcile_task = asyncio.create_task(self._reconcile_by_read())
 
-        _LOGGER.debug(f"Fresh read Gatt {data}")
-        self._refresh_data(data)
-        return data
+    async def _reconcile_by_read(self) -> None:
+        rollback = self._rollback
+        self._clear_expected()
+        try:
+            await self.read_fresh()
+        except Exception:
+            _LOGGER.debug("Reconciliation read failed", exc_info=True)
+            self._rollback = rollback
+            self._restore_rollback()
+        else:
+            self._fire_callbacks()
 
-    async def set_mode(self, effect: GDEffect, brightness: GDBrightness, volume: GDVolume, humidifier: GDHumidifier):
-        await self.get_client()
-        command = self.get_command_string(effect, brightness, volume, humidifier)
-        _LOGGER.debug(f"Setting mode {command}")
-        await self.send_command(command)
+    def update_from_advertisement(self, ble_device, advertisement) -> None:
+        """Note an advertisement seen by passive scanning, without connecting.
 
-    def update_from_advertisement(self, advertisement):
-        pass
+        The device's advertisements carry no state we know how to decode, so
+        this tracks presence: RSSI, when it was last seen, and the newest
+        BLEDevice, which may route through a different adapter or proxy and
+        is what the next connect attempt uses.
+        """
+        self._ble_device = ble_device
+        self._rssi = advertisement.rssi
+        self._last_seen = time.monotonic()
+        self._advertisements += 1
+        self._unreachable = False
 
-    async def send_command(self, data) -> None:
-        await self.write_gatt(CHAR_CHARACTERISTIC, data)
-        await asyncio.sleep(0.75)
-        await self.update()
+    def _get_ble_device(self):
+        return self._ble_device
 
-    def _refresh_data(self, response_data) -> None:
-        _LOGGER.debug(f"Glowdreaming Hex {response_data}")
+    async def send_command(self, command: bytes) -> None:
+        """Write a pre-encoded command packet and wait for the device to acknowledge it.
 
+        The acknowledgement is the first notification or read whose decoded
+        state matches the command. Without a live subscription, or when no
+        notification arrives in time, the characteristic is read instead.
+        """
+        await self.get_client(PRIORITY_COMMAND)
+        self._ack_expected = decode_command(command)
+        self._ack_event.clear()
+        self._ack_started = time.monotonic()
+        try:
+            self._capture.record(self._ack_started, DIRECTION_OUT, SOURCE_WRITE, command)
+            await self._client.write_gatt_char(self._char_uuid, command, True)
+            if self._notifying:
+                try:
+                    await asyncio.wait_for(self._ack_event.wait(), timeout=ACK_TIMEOUT_SECONDS)
+                    return
+                except asyncio.TimeoutError:
+                    _LOGGER.debug("No acknowledgement within %ss; reading state", ACK_TIMEOUT_SECONDS)
+            await self.read_fresh()
+            if not self._ack_event.is_set():
+                self._ack_misses += 1
+        finally:
+            self._ack_expected = None
+            self._touch()
+
+    def _acknowledge(self) -> None:
+        latency = time.monotonic() - self._ack_started
+        self._ack_latency = latency
+        self._ack_count += 1
+        self._ack_total += latency
+        self._ack_expected = None
+        self._ack_event.set()
+        _LOGGER.debug("Write acknowledged after %.3fs", latency)
+
+    def restore(
+        self, raw: bytes, last_effect: GDEffect | None = None, last_brightness: GDBrightness | None = None
+    ) -> None:
+        """Show a packet persisted before a restart until the device reports its state.
+
+        The restored state is stale: the entities show it like an idle
+        disconnect, and the first packet from the device replaces it. A
+        failed connect makes the device unavailable as usual.
+        """
+        self._refresh_data(raw)
+        if last_effect is not None:
+            self._last_effect = last_effect
+        if last_brightness is not None:
+            self._last_brightness = last_brightness
+        # It is unknown how long the timer has been counting down since
+        self._humidifier_timer_anchor = None
+        self._stale = True
+        self._idle_disconnected = True
+
+    def _ingest(self, data, source: str) -> None:
+        """Decode a packet from the device and keep it in the capture."""
+        started = time.monotonic()
+        self._stale = False
+        self._refresh_data(data)
+        self._capture.record(started, DIRECTION_IN, source, bytes(data or b""), time.monotonic() - started)
+
+    def _refresh_data(self, response_data) -> None:
+        """Decode a state packet (bytes, bytearray or memoryview) in place."""
         # Handle empty or None response data
-        if not response_data or len(response_data) == 0:
+        if not response_data:
             _LOGGER.warning("Received empty response data from device")
             return
 
-        hex_str = response_data.hex()
-        self._mode_hex = hex_str
-
-        response = [hex(x) for x in response_data]
+        raw = bytes(response_data)
 
         # Check if response has enough data to prevent IndexError
-        if len(response) < 10:
-            _LOGGER.warning(f"Received incomplete response data: {len(response)} bytes, expected at least 10. Raw data: {hex_str}")
+        if len(raw) < STATE_PACKET_MIN_LENGTH:
+            self._raw = raw
+            self._mode_hex = None
+            _LOGGER.warning(
+                "Received incomplete response data: %d bytes, expected at least %d. Raw data: %s",
+                len(raw), STATE_PACKET_MIN_LENGTH, self.mode_hex,
+            )
             return
 
-        power = bool(4 & int(response[9], 16)) # 4 is on
-        self._power = power
-        _LOGGER.debug(f"Power state is {self._power}")
+        red = raw[0]
+        green = raw[1]
+        blue = raw[2]
+        volume = raw[3]
+        humidifier_on = raw[4]
+        humidifier_timer = raw[7]
+        flags = raw[9]
 
-        volume = int(response[3], 16)
-        self._volume = volume
-        _LOGGER.debug(f"Volume state is {self._volume}")
+        brightness = max(red, green, blue)
+        effect = EFFECTS[red > 0][green > 0]
+        humidifier = HUMIDIFIER_MODES[flags] if humidifier_on == 1 else GDHumidifier.NONE
+
+        reported = (effect, BRIGHTNESS_LEVELS[brightness], VOLUME_LEVELS[volume], humidifier)
+        if reported == self._ack_expected:
+            self._acknowledge()
+
+        if self._expected is not None:
+            if reported == self._expected:
+                _LOGGER.debug("Device confirmed optimistic state")
+                self._clear_expected()
+            elif time.monotonic() < self._expected_deadline:
+                # Most likely the state from before the write; hold it back
+                self._stale_packet = raw
+                return
+            else:
+                self._clear_expected()
+
+        self._raw = raw
+        self._mode_hex = None
 
+        self._power = bool(flags & 4) # 4 is on
+        self._volume = volume
         self._sound = GDSound.WHITE_NOISE
-        _LOGGER.debug(f"Sound state is {self._sound}")
 
-        red, green, blue = [int(x, 16) for x in response[0:3]]
-        brightness = max(red, green, blue)
         self._brightness = brightness
-        if brightness > 0:
-            self._last_brightness = self.brightness_level
-        _LOGGER.debug(f"Brightness state is {self._brightness}")
-
-        if red > 0:
-            effect = GDEffect.SLEEP
-        elif green > 0:
-            effect = GDEffect.AWAKE
-        else:
-            effect = GDEffect.NONE
+        if brightness:
+            self._last_brightness = BRIGHTNESS_LEVELS[brightness]
+
         self._effect = effect
-        if effect != GDEffect.NONE:
+        if effect is not GDEffect.NONE:
             self._last_effect = effect
-        _LOGGER.debug(f"Effect state is {self._effect}")
-
-        # Determine humidifier state based on the hex string
-        humidifier_on = int(response[4], 16)
-        humidifier_option = int(response[9], 16)
-        humidifier_timer = int(response[7], 16)
-
-        if humidifier_on == 1:
-            if humidifier_option == 1:
-                humidifier = GDHumidifier.TWO
-            elif humidifier_option == 2:
-                humidifier = GDHumidifier.FOUR
-            else:
-                humidifier = GDHumidifier.CONTINUOUS
-        else:
-            humidifier = GDHumidifier.NONE
 
         self._humidifier = humidifier
+        if humidifier_timer != self._humidifier_timer or self._humidifier_timer_anchor is None:
+            # Count down from when this value was first seen
+            self._humidifier_timer_anchor = time.monotonic()
         self._humidifier_timer = humidifier_timer
-        _LOGGER.debug(f"Humidifier state is {self._humidifier}")
-        _LOGGER.debug(f"Humidifier timer state is {self._humidifier_timer}")
         self._device_lock = None
+        self._mode = None
 
-        self._mode = f"Power: {power}, Volume: {volume}, Brightness: {brightness}, Effect: {effect}, Humidifier: {humidifier}, Timer: {humidifier_timer}"
-
-    def get_command_string(self, effect, brightness, volume, humidifier):
-        _LOGGER.debug(f"Command string for: {effect}, {brightness}, {volume}, {humidifier}")
-
-        # 000000000000ffff0000 off
-        # 0a0000000000ffff0000 red light 1
-        # 280000000000ffff0000 red light 2
-        # 640000000000ffff0000 red light 3
-        # 000000030000ffff0000 white noise 3
-        # 000000020000ffff0000 white noise 2
-        # 000000010000ffff0000 white noise 1
-
-        if volume is GDVolume.HIGH:
-            volume_level = "03"
-        elif volume is GDVolume.MEDIUM:
-            volume_level = "02"
-        elif volume is GDVolume.LOW:
-            volume_level = "01"
-        else:
-            volume_level = "00"
-
-        if brightness is GDBrightness.LOW:
-            brightness_hex = "0a"
-        elif brightness is GDBrightness.MEDIUM:
-            brightness_hex = "28"
-        elif brightness is GDBrightness.HIGH:
-            brightness_hex = "64"
-        else:
-            brightness_hex = "00"
-
-        if effect is GDEffect.AWAKE:
-            red_value = "00"
-            green_value = brightness_hex # change
-        elif effect is GDEffect.SLEEP:
-            red_value = brightness_hex # change
-            green_value = "00"
-        else:
-            red_value = "00"
-            green_value = "00"
-
-        if humidifier is GDHumidifier.TWO:
-            humidifier_value = "01000078"
-        elif humidifier is GDHumidifier.FOUR:
-            humidifier_value = "010000f0"
-        elif humidifier is GDHumidifier.CONTINUOUS:
-            humidifier_value = "1010ffff"
-        else:
-            humidifier_value = "0000ffff"
+        _LOGGER.debug("Decoded packet %s: %s", self._raw, self)
 
-        device_lock = "00" # or 01 if locked
+    def __repr__(self) -> str:
+        return f"<GlowdreamingDevice {self.mode}>"
 
-        return "{red_value}{green_value}00{volume_level}{humidifier_value}{device_lock}00".format(volume_level=volume_level, red_value=red_value, green_value=green_value, humidifier_value=humidifier_value, device_lock=device_lock)
+    def get_command_string(self, effect, brightness, volume, humidifier):
+        """Return the command for a state as a hex string (see write_gatt)."""
+        return encode_command(effect, brightness, volume, humidifier).hex()
@@ -0,0 +1,102 @@
+"""Poll interval that follows device activity, and staggering between devices"""
+
+import time as monotonic_time
+from collections.abc import Callable, Hashable
+from datetime import datetime, time
+
+from .connection import in_time_window
+
+DEFAULT_FAST_INTERVAL_SECONDS = 5.0
+DEFAULT_SLOW_INTERVAL_SECONDS = 300.0
+DEFAULT_QUIET_INTERVAL_SECONDS = 1800.0
+DEFAULT_BACKOFF_FACTOR = 2.0
+
+
+class AdaptivePollInterval:
+    """Poll often right after activity and back off while nothing happens.
+
+    A command or an observed state change drops the interval to `fast`;
+    every poll that finds nothing new multiplies it by `factor`, up to
+    `slow`. Inside the daily quiet window (e.g. daytime, when the nursery
+    is empty) it is at least `quiet`. A window whose start equals its end
+    is disabled.
+    """
+
+    def __init__(
+        self,
+        fast: float = DEFAULT_FAST_INTERVAL_SECONDS,
+        slow: float = DEFAULT_SLOW_INTERVAL_SECONDS,
+        factor: float = DEFAULT_BACKOFF_FACTOR,
+        quiet: float = DEFAULT_QUIET_INTERVAL_SECONDS,
+        quiet_start: time | None = None,
+        quiet_end: time | None = None,
+        clock: Callable[[], datetime] = datetime.now,
+    ) -> None:
+        self.fast = fast
+        self.slow = slow
+        self.factor = factor
+        self.quiet = quiet
+        self.quiet_start = quiet_start
+        self.quiet_end = quiet_end
+        self._clock = clock
+        self._current = fast
+
+    def in_quiet_window(self, now: datetime | None = None) -> bool:
+        if self.quiet_start is None or self.quiet_end is None:
+            return False
+        return in_time_window(self.quiet_start, self.quiet_end, (now or self._clock()).time())
+
+    def activity(self) -> None:
+        """Something happened; poll again soon."""
+        self._current = self.fast
+
+    def idle(self) -> None:
+        """A poll found nothing new; back off."""
+        self._current = min(self.slow, self._current * self.factor)
+
+    @property
+    def seconds(self) -> float:
+        """The interval to use for the next poll."""
+        if self.in_quiet_window():
+            return max(self._current, self.quiet)
+        return self._current
+
+
+class PollScheduler:
+    """Give every device its own phase inside the poll period.
+
+    With n devices, member i polls at offset interval * i / n, so devices
+    that share an interval never poll in lockstep (e.g. after a restart).
+    Phases are derived from the current membership, so adding or removing
+    a device re-balances them on the next poll.
+    """
+
+    def __init__(self, clock: Callable[[], float] = monotonic_time.monotonic) -> None:
+        self._members: list[Hashable] = []
+        self._clock = clock
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def add(self, member: Hashable) -> Callable[[], None]:
+        """Give a member a slot; returns a function that removes it again."""
+        self._members.append(member)
+
+        def _remove() -> None:
+            if member in self._members:
+                self._members.remove(member)
+
+        return _remove
+
+    def phase(self, member: Hashable) -> float:
+        """The member's offset as a fraction of the poll period."""
+        return self._members.index(member) / len(self._members)
+
+    def delay(self, member: Hashable, interval: float) -> float:
+        """Seconds until the member's next slot, at least half an interval away."""
+        if member not in self._members:
+            return interval
+        delay = (interval * self.phase(member) - self._clock()) % interval
+        if delay < interval / 2:
+            delay += interval
+        return delay
@@ -0,0 +1,167 @@
+"""Connection slots shared by the devices on one Bluetooth adapter"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Protocol
+
+_LOGGER = logging.getLogger(__name__)
+
+# Lower values are served first
+PRIORITY_COMMAND = 0
+PRIORITY_POLL = 1
+
+# ESPHome proxies and most adapters manage about three connections at once
+DEFAULT_POOL_SLOTS = 3
+
+
+class PooledDevice(Protocol):
+    @property
+    def busy(self) -> bool: ...
+
+    async def evict(self) -> None: ...
+
+
+class ConnectionPool:
+    """Cap the number of devices connected through one adapter.
+
+    Devices acquire a slot before connecting and release it when the link
+    goes away. When every slot is taken the least recently used idle device
+    is evicted, so devices that never let go of their link on their own
+    (the always connected policy) still take turns. While every holder is
+    busy callers queue, commands ahead of background polls.
+    """
+
+    def __init__(self, slots: int = DEFAULT_POOL_SLOTS) -> None:
+        self.slots = slots
+        self._holders: OrderedDict[PooledDevice, None] = OrderedDict()
+        self._waiters: list[tuple[int, int, PooledDevice, asyncio.Future[bool]]] = []
+        self._sequence = itertools.count()
+        self.waits = 0
+        self.wait_total = 0.0
+        self.evictions = 0
+
+    @property
+    def in_use(self) -> int:
+        return len(self._holders)
+
+    @property
+    def waiting(self) -> int:
+        return sum(not future.done() for _priority, _sequence, _device, future in self._waiters)
+
+    def holds(self, device: PooledDevice) -> bool:
+        return device in self._holders
+
+    def touch(self, device: PooledDevice) -> None:
+        """Mark a slot holder as most recently used."""
+        if device in self._holders:
+            self._holders.move_to_end(device)
+
+    def resize(self, slots: int) -> None:
+        """Change the number of slots, waking waiters if that made room."""
+        self.slots = slots
+        self._wake_next()
+
+    async def acquire(self, device: PooledDevice, priority: int = PRIORITY_POLL) -> None:
+        """Wait until `device` holds a slot."""
+        started = time.monotonic()
+        waited = False
+        while device not in self._holders:
+            if len(self._holders) < self.slots:
+                self._grant(device)
+                break
+
+            victim = self._idle_holder()
+            if victim is not None:
+                _LOGGER.debug("Evicting idle connection to make room")
+                self.evictions += 1
+                # The slot changes hands first, so a failing disconnect cannot
+                # keep it and its release cannot hand it to a waiter instead
+                self._holders.pop(victim, None)
+                self._grant(device)
+                try:
+                    await victim.evict()
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.debug("Evicted device failed to disconnect cleanly", exc_info=True)
+                break
+
+            waited = True
+            future: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), device, future))
+            try:
+                freed = await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled() and future.result():
+                    # Woken just as we were cancelled; let the next waiter have the turn
+                    self._pass_on()
+                else:
+                    future.cancel()
+                raise
+            if freed and device in self._holders:
+                # Another caller got this device a slot meanwhile
+                self._pass_on()
+        else:
+            self._holders.move_to_end(device)
+
+        if waited:
+            self.waits += 1
+            self.wait_total += time.monotonic() - started
+
+    def release(self, device: PooledDevice) -> None:
+        """Give back the slot held by `device`, waking the most urgent waiter."""
+        self._holders.pop(device, None)
+        self._wake_next()
+
+    def notify_idle(self) -> None:
+        """Let the most urgent waiter evict a holder that just went idle."""
+        if not self.waiting or self._idle_holder() is None:
+            return
+        while self._waiters:
+            _priority, _sequence, _device, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(True)
+                break
+
+    def _pass_on(self) -> None:
+        """Hand a wakeup the woken waiter could not use to the next one."""
+        if len(self._holders) < self.slots:
+            self._wake_next()
+        else:
+            self.notify_idle()
+
+    def _grant(self, device: PooledDevice) -> None:
+        self._holders[device] = None
+        # Other callers waiting for this same device have their slot now
+        for _priority, _sequence, waiter, future in self._waiters:
+            if waiter is device and not future.done():
+                future.set_result(False)
+
+    def _wake_next(self) -> None:
+        while self._waiters and len(self._holders) < self.slots:
+            _priority, _sequence, _device, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(True)
+                break
+        # Drop the entries of waiters that were cancelled or already served
+        self._waiters = [waiter for waiter in self._waiters if not waiter[3].done()]
+        heapq.heapify(self._waiters)
+
+    def _idle_holder(self) -> PooledDevice | None:
+        for holder in self._holders:
+            if not holder.busy:
+                return holder
+        return None
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {
+            "pool_slots": self.slots,
+            "pool_in_use": self.in_use,
+            "pool_waiting": self.waiting,
+            "pool_waits": self.waits,
+            "pool_wait_avg": self.wait_total / self.waits if self.waits else None,
+            "pool_evictions": self.evictions,
+        }
@@ -0,0 +1,90 @@
+"""Immutable snapshots of the device state"""
+import time
+from dataclasses import dataclass, field
+
+from .codec import BRIGHTNESS_LEVELS, VOLUME_LEVELS
+from .const import GDBrightness, GDEffect, GDHumidifier, GDSound, GDVolume
+
+
+@dataclass(frozen=True, slots=True)
+class GlowdreamingState:
+    """Everything the entities show, frozen at one point in time.
+
+    Snapshots compare by value: the same packet decoded twice gives equal
+    snapshots, which lets the coordinator skip waking its listeners.
+    """
+
+    connected: bool = False
+    raw: bytes = b""
+    power: bool | None = None
+    sound: GDSound | None = None
+    volume: int | None = None
+    brightness: int | None = None
+    effect: GDEffect | None = None
+    last_effect: GDEffect | None = None
+    last_brightness: GDBrightness | None = None
+    humidifier: GDHumidifier | None = None
+    humidifier_timer: int | None = None
+    device_lock: bool | None = None
+    # time.monotonic() when humidifier_timer was read; not part of equality so
+    # re-reading the same timer value doesn't count as a change
+    humidifier_timer_anchor: float | None = field(default=None, compare=False)
+    # Restored from before a restart and not yet confirmed by the device
+    stale: bool = False
+
+    @property
+    def timer_running(self) -> bool:
+        """Whether the humidifier is counting down a 2 or 4 hour timer."""
+        return (
+            self.humidifier in (GDHumidifier.TWO, GDHumidifier.FOUR)
+            and bool(self.humidifier_timer)
+            and self.humidifier_timer_anchor is not None
+        )
+
+    def humidifier_remaining(self, now: float | None = None) -> int | None:
+        """Minutes left on the humidifier timer, counted down locally since the last packet."""
+        if not self.timer_running:
+            return self.humidifier_timer
+        elapsed = int(((now if now is not None else time.monotonic()) - self.humidifier_timer_anchor) // 60)
+        return max(0, self.humidifier_timer - elapsed)
+
+    def humidifier_ends_in(self, now: float | None = None) -> float | None:
+        """Seconds until the humidifier timer runs out, if it is counting down."""
+        if not self.timer_running:
+            return None
+        now = now if now is not None else time.monotonic()
+        return max(0.0, self.humidifier_timer_anchor + self.humidifier_timer * 60 - now)
+
+    def next_timer_boundary(self, now: float | None = None) -> float | None:
+        """Seconds until humidifier_remaining() next changes, or None once it can't."""
+        if not self.timer_running:
+            return None
+        now = now if now is not None else time.monotonic()
+        if not self.humidifier_remaining(now):
+            return None
+        return 60 - (now - self.humidifier_timer_anchor) % 60
+
+    @property
+    def mode(self) -> str:
+        if self.power is None:
+            return "unknown"
+        return (
+            f"Power: {self.power}, Volume: {self.volume}, Brightness: {self.brightness}, "
+            f"Effect: {self.effect}, Humidifier: {self.humidifier}, Timer: {self.humidifier_timer}"
+        )
+
+    @property
+    def mode_hex(self) -> str:
+        return self.raw.hex()
+
+    @property
+    def volume_level(self) -> GDVolume:
+        if self.volume is None:
+            return GDVolume.NONE
+        return VOLUME_LEVELS[self.volume]
+
+    @property
+    def brightness_level(self) -> GDBrightness:
+        if self.brightness is None:
+            return GDBrightness.NONE
+        return BRIGHTNESS_LEVELS[self.brightness]
@@ -47,14 +47,14 @@ class GlowdreamingLight(BTEntity, LightEntity):
     @property
     def is_on(self) -> bool | None:
         """Return true if the light is on (brightness > 0)."""
-        if self._device.brightness is None:
+        if self._state.brightness is None:
             return None
-        return self._device.brightness > 0
+        return self._state.brightness > 0
 
     @property
     def brightness(self) -> int | None:
         """Return brightness in 0-255 scale mapped from the 3 device levels."""
-        raw = self._device.brightness
+        raw = self._state.brightness
         if raw is None:
             return None
         return self._BRIGHTNESS_TO_HA.get(raw, 0)
@@ -62,7 +62,7 @@ class GlowdreamingLight(BTEntity, LightEntity):
     @property
     def effect(self) -> str | None:
         """Return the current light effect, or None when the light is off."""
-        e = self._device.effect
+        e = self._state.effect
         if e is None or e == GDEffect.NONE:
             return None
         return e
@@ -80,11 +80,11 @@ class GlowdreamingLight(BTEntity, LightEntity):
                 effect = GDEffect(effect_name)
             except ValueError:
                 _LOGGER.warning("Ignoring unknown effect %r; restoring last known effect", effect_name)
-                effect = self._device.last_effect or GDEffect.SLEEP
+                effect = self._state.last_effect or GDEffect.SLEEP
         else:
-            effect = self._device.effect
+            effect = self._state.effect
             if effect is None or effect == GDEffect.NONE:
-                effect = self._device.last_effect or GDEffect.SLEEP
+                effect = self._state.last_effect or GDEffect.SLEEP
 
         ha_brightness = kwargs.get(ATTR_BRIGHTNESS)
         if ha_brightness is not None:
@@ -95,17 +95,15 @@ class GlowdreamingLight(BTEntity, LightEntity):
             else:
                 brightness = GDBrightness.HIGH
         else:
-            brightness = self._device.brightness_level
+            brightness = self._state.brightness_level
             if brightness == GDBrightness.NONE:
-                brightness = self._device.last_brightness or GDBrightness.LOW
+                brightness = self._state.last_brightness or GDBrightness.LOW
 
-        await self._device.set_mode(effect, brightness, self._device.volume_level, self._device.humidifier)
+        await self._device.update_mode(effect=effect, brightness=brightness)
         self.async_write_ha_state()
-        await self.coordinator.async_request_refresh()
 
     async def async_turn_off(self, **kwargs) -> None:
         """Turn off the light (set brightness to None/off)."""
-        effect = self._device.effect or GDEffect.NONE
-        await self._device.set_mode(effect, GDBrightness.NONE, self._device.volume_level, self._device.humidifier)
+        effect = self._state.effect or GDEffect.NONE
+        await self._device.update_mode(effect=effect, brightness=GDBrightness.NONE)
         self.async_write_ha_state()
-        await self.coordinator.async_request_refresh()
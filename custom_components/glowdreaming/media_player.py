@@ -61,16 +61,16 @@ class GlowdreamingMediaPlayer(BTEntity, MediaPlayerEntity):
     @property
     def state(self) -> MediaPlayerState | None:
         """Return PLAYING when volume > 0, IDLE when silent, None if unknown."""
-        if self._device.volume is None:
+        if self._state.volume is None:
             return None
-        if self._device.volume > 0:
+        if self._state.volume > 0:
             return MediaPlayerState.PLAYING
         return MediaPlayerState.IDLE
 
     @property
     def source(self) -> str | None:
         """Return the current sound source."""
-        sound = getattr(self._device, '_sound', None)
+        sound = self._state.sound
         if sound is None:
             return None
         return sound.name.capitalize()
@@ -78,31 +78,21 @@ class GlowdreamingMediaPlayer(BTEntity, MediaPlayerEntity):
     @property
     def volume_level(self) -> float | None:
         """Return volume level as a float 0.0–1.0."""
-        if self._device.volume is None:
+        if self._state.volume is None:
             return None
-        return float(self._device.volume / 3)
+        return float(self._state.volume / 3)
 
     async def async_media_pause(self) -> None:
         """Turn sound off, saving the current volume for later resumption."""
-        if self._device.volume_level != GDVolume.NONE:
-            self._last_volume = self._device.volume_level
-        await self._device.set_mode(
-            self._device.effect,
-            self._device.brightness_level,
-            GDVolume.NONE,
-            self._device.humidifier,
-        )
+        if self._state.volume_level != GDVolume.NONE:
+            self._last_volume = self._state.volume_level
+        await self._device.update_mode(volume=GDVolume.NONE)
         self.async_write_ha_state()
 
     async def async_media_play(self) -> None:
         """Turn sound on at the last known volume level."""
         volume = self._last_volume if self._last_volume != GDVolume.NONE else GDVolume.LOW
-        await self._device.set_mode(
-            self._device.effect,
-            self._device.brightness_level,
-            volume,
-            self._device.humidifier,
-        )
+        await self._device.update_mode(volume=volume)
         self.async_write_ha_state()
 
     async def async_set_volume_level(self, volume: float) -> None:
@@ -117,10 +107,5 @@ class GlowdreamingMediaPlayer(BTEntity, MediaPlayerEntity):
             gd_volume = GDVolume.HIGH
         if gd_volume != GDVolume.NONE:
             self._last_volume = gd_volume
-        await self._device.set_mode(
-            self._device.effect,
-            self._device.brightness_level,
-            gd_volume,
-            self._device.humidifier,
-        )
+        await self._device.update_mode(volume=gd_volume)
         self.async_write_ha_state()
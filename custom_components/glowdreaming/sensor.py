@@ -2,16 +2,20 @@
 from __future__ import annotations
 
 import logging
+from datetime import timedelta
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, ServiceResponse, SupportsResponse, callback
 from homeassistant.helpers import entity_platform
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, Schema
+from .const import DOMAIN
 from .coordinator import BTCoordinator
 from .entity import BTEntity
+from .services import Schema
 from .glowdreaming_api.const import *
 
 _LOGGER = logging.getLogger(__name__)
@@ -31,19 +35,55 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
     platform.async_register_entity_service("set_volume", Schema.SET_VOLUME.value, "set_volume")
     platform.async_register_entity_service("set_humidifier", Schema.SET_HUMIDIFIER.value, "set_humidifier")
     platform.async_register_entity_service("refresh_state", Schema.REFRESH_STATE.value, "refresh_state")
+    platform.async_register_entity_service(
+        "dump_packets", Schema.DUMP_PACKETS.value, "dump_packets", supports_response=SupportsResponse.ONLY
+    )
 
 class GlowdreamingSensor(BTEntity, SensorEntity):
     """Representation of a Glowdreaming Sensor."""
 
     _attr_name = "Sensor"
+    _timer_unsub: CALLBACK_TYPE | None = None
 
     def __init__(self, coordinator: BTCoordinator) -> None:
         """Initialize the Device."""
         super().__init__(coordinator)
 
+    async def async_added_to_hass(self) -> None:
+        """Start counting down a running humidifier timer."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._async_cancel_timer_tick)
+        self._async_schedule_timer_tick()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the new state and re-anchor the humidifier countdown."""
+        super()._handle_coordinator_update()
+        self._async_schedule_timer_tick()
+
+    @callback
+    def _async_schedule_timer_tick(self) -> None:
+        """Write state once when the extrapolated timer reaches its next minute."""
+        self._async_cancel_timer_tick()
+        delay = self._state.next_timer_boundary()
+        if delay is not None:
+            self._timer_unsub = async_call_later(self.hass, delay, self._async_timer_tick)
+
+    @callback
+    def _async_timer_tick(self, _now) -> None:
+        self._timer_unsub = None
+        self.async_write_ha_state()
+        self._async_schedule_timer_tick()
+
+    @callback
+    def _async_cancel_timer_tick(self) -> None:
+        if self._timer_unsub:
+            self._timer_unsub()
+            self._timer_unsub = None
+
     def connection_state(self) -> str:
         """Return a human-readable connection state string."""
-        if self._device.connected:
+        if self._state.connected:
             return "Connected"
         else:
             return "Disconnected"
@@ -51,23 +91,34 @@ class GlowdreamingSensor(BTEntity, SensorEntity):
     @property
     def native_value(self) -> str | None:
         """Return the state of the sensor."""
-        return self._device.mode
+        return self._state.mode
 
     @property
     def extra_state_attributes(self):
         """Return the state attributes of the sensor."""
         return {
             "connected": self.connection_state(),
-            "volume": self._device.volume,
-            "effect": self._device.effect,
-            "brightness": self._device.brightness,
-            "humidifier": self._device.humidifier,
-            "humidifier_timer": self._device.humidifier_timer,
-            "device_lock": self._device.device_lock,
-            "mode": self._device.mode,
-            "mode_hex": self._device.mode_hex,
+            "volume": self._state.volume,
+            "effect": self._state.effect,
+            "brightness": self._state.brightness,
+            "humidifier": self._state.humidifier,
+            "humidifier_timer": self._state.humidifier_remaining(),
+            "humidifier_ends_at": self._humidifier_ends_at(),
+            "device_lock": self._state.device_lock,
+            "mode": self._state.mode,
+            "mode_hex": self._state.mode_hex,
+            "stale": self._state.stale,
+            "ack_latency": self._device.ack_latency,
+            "rssi": self._device.rssi,
         }
 
+    def _humidifier_ends_at(self) -> str | None:
+        """Wall-clock time the humidifier timer runs out, if it is counting down."""
+        ends_in = self._state.humidifier_ends_in()
+        if ends_in is None:
+            return None
+        return (dt_util.utcnow() + timedelta(seconds=round(ends_in))).replace(microsecond=0).isoformat()
+
     async def set_mode(self, light_effect, brightness, volume, humidifier):
         _LOGGER.debug("Setting effect to %s, brightness to %s, volume to %s, and humidifier to %s", light_effect, brightness, volume, humidifier)
 
@@ -83,54 +134,44 @@ class GlowdreamingSensor(BTEntity, SensorEntity):
     async def set_awake_brightness(self, brightness):
         _LOGGER.debug("Setting awake brightness to %s", brightness)
 
-        gd_effect = GDEffect.AWAKE
         gd_brightness = GDBrightness(brightness)
-        gd_volume = self._device.volume_level
-        gd_humidifier = self._device.humidifier
 
-        await self._device.set_mode(gd_effect, gd_brightness, gd_volume, gd_humidifier)
+        await self._device.update_mode(effect=GDEffect.AWAKE, brightness=gd_brightness)
 
         self.async_write_ha_state()
 
     async def set_sleep_brightness(self, brightness):
         _LOGGER.debug("Setting sleep brightness to %s", brightness)
 
-        gd_effect = GDEffect.SLEEP
         gd_brightness = GDBrightness(brightness)
-        gd_volume = self._device.volume_level
-        gd_humidifier = self._device.humidifier
 
-        await self._device.set_mode(gd_effect, gd_brightness, gd_volume, gd_humidifier)
+        await self._device.update_mode(effect=GDEffect.SLEEP, brightness=gd_brightness)
 
         self.async_write_ha_state()
 
     async def set_humidifier(self, humidifier):
         _LOGGER.debug("Setting humidifier to %s", humidifier)
 
-        gd_effect = self._device.effect
-        gd_brightness = self._device.brightness_level
-        gd_volume = self._device.volume_level
         gd_humidifier = GDHumidifier(humidifier)
 
-        await self._device.set_mode(gd_effect, gd_brightness, gd_volume, gd_humidifier)
+        await self._device.update_mode(humidifier=gd_humidifier)
 
         self.async_write_ha_state()
 
     async def set_volume(self, volume):
         _LOGGER.debug("Setting volume to %s", volume)
 
-        gd_effect = self._device.effect
-        gd_brightness = self._device.brightness_level
         gd_volume = GDVolume(volume)
-        gd_humidifier = self._device.humidifier
 
-        await self._device.set_mode(gd_effect, gd_brightness, gd_volume, gd_humidifier)
+        await self._device.update_mode(volume=gd_volume)
 
         self.async_write_ha_state()
 
     async def refresh_state(self):
         _LOGGER.debug("Refreshing state")
         await self._device.update()
+        # Reads don't notify the coordinator; publish what was read to every entity
+        self.coordinator.async_handle_push()
         self.async_write_ha_state()
 
     async def write_gatt(self, target_uuid, data):
@@ -139,4 +180,8 @@ class GlowdreamingSensor(BTEntity, SensorEntity):
 
     async def read_gatt(self, target_uuid):
         await self._device.read_gatt(target_uuid)
+        self.coordinator.async_handle_push()
         self.async_write_ha_state()
+
+    async def dump_packets(self) -> ServiceResponse:
+        return {"packets": self._device.capture.dump()}
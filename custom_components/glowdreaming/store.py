@@ -0,0 +1,73 @@
+"""Last-known device state persisted across Home Assistant restarts."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, STORAGE_SAVE_DELAY_SECONDS, STORAGE_VERSION
+from .glowdreaming_api.const import GDBrightness, GDEffect
+from .glowdreaming_api.device import GlowdreamingDevice
+from .glowdreaming_api.state import GlowdreamingState
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StateStore:
+    """Keep the last decoded packet and the effect/brightness memory on disk.
+
+    Saves are coalesced: the first change schedules a write
+    STORAGE_SAVE_DELAY_SECONDS later and changes until then only replace
+    what that write will contain.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self._data: dict[str, Any] | None = None
+        self._pending = False
+        self.saves = 0
+
+    async def async_restore(self, device: GlowdreamingDevice) -> bool:
+        """Load the persisted state into `device`; returns whether there was any."""
+        data = await self._store.async_load()
+        if not data or not data.get("raw"):
+            return False
+        try:
+            device.restore(
+                bytes.fromhex(data["raw"]),
+                GDEffect(data["last_effect"]) if data.get("last_effect") else None,
+                GDBrightness(data["last_brightness"]) if data.get("last_brightness") else None,
+            )
+        except (KeyError, ValueError):
+            _LOGGER.warning("Ignoring unreadable stored state: %s", data)
+            return False
+        self._data = data
+        return True
+
+    @callback
+    def async_save(self, state: GlowdreamingState | None) -> None:
+        """Schedule a write of `state` if it differs from what is stored."""
+        if state is None or state.stale or not state.raw:
+            return
+        data = {
+            "raw": state.raw.hex(),
+            "last_effect": state.last_effect,
+            "last_brightness": state.last_brightness,
+        }
+        if data == self._data:
+            return
+        self._data = data
+        if not self._pending:
+            self._pending = True
+            self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY_SECONDS)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        self._pending = False
+        self.saves += 1
+        return self._data
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
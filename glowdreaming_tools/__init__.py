@@ -0,0 +1,4 @@
+"""Development tools for the Glow Dreaming integration: a simulated device
+and session record/replay. Used by the tests and benchmarks; HACS only
+installs custom_components/glowdreaming, so none of this ships to users.
+"""
@@ -0,0 +1,309 @@
+"""Record device sessions to a compact file and replay them without Bluetooth"""
+
+import asyncio
+import json
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+RECORDING_VERSION = 1
+
+# Event kinds; latency is only measured for connect, read and write
+EVENT_CONNECT = "connect"
+EVENT_SUBSCRIBE = "subscribe"
+EVENT_NOTIFY = "notify"
+EVENT_READ = "read"
+EVENT_WRITE = "write"
+# Closed by us, and lost from the device's side
+EVENT_DISCONNECT = "disconnect"
+EVENT_DISCONNECTED = "disconnected"
+
+
+@dataclass(slots=True)
+class SessionEvent:
+    """One thing that happened on the link, `t` seconds into the session."""
+
+    t: float
+    kind: str
+    data: bytes = b""
+    latency: float = 0.0
+
+
+class SessionRecording:
+    """A recorded session: every connect, write, read and notification in order.
+
+    Saved as JSON with one [t, kind, hex payload, latency] row per event.
+    """
+
+    def __init__(self, events: list[SessionEvent] | None = None, name: str = "") -> None:
+        self.events = events or []
+        self.name = name
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "version": RECORDING_VERSION,
+            "name": self.name,
+            "events": [
+                [round(event.t, 4), event.kind, event.data.hex(), round(event.latency, 4)]
+                for event in self.events
+            ],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "SessionRecording":
+        if data.get("version") != RECORDING_VERSION:
+            raise ValueError(f"Unsupported recording version {data.get('version')}")
+        return cls(
+            [SessionEvent(t, kind, bytes.fromhex(payload), latency) for t, kind, payload, latency in data["events"]],
+            data.get("name", ""),
+        )
+
+    def save(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(self.to_json(), separators=(",", ":")))
+
+    @classmethod
+    def load(cls, path: str | Path) -> "SessionRecording":
+        return cls.from_json(json.loads(Path(path).read_text()))
+
+    @classmethod
+    def from_capture(cls, packets: list[dict[str, Any]], name: str = "") -> "SessionRecording":
+        """Build a recording from a PacketCapture.dump(); capture_packets()
+        finds it in a dump_packets response or a diagnostics download.
+
+        The capture holds no connects or latencies, so the session starts
+        with an instant connect and subscription.
+        """
+        if not packets:
+            return cls(name=name)
+        start = packets[0]["timestamp"]
+        events = [SessionEvent(0.0, EVENT_CONNECT)]
+        if any(packet["source"] == EVENT_NOTIFY for packet in packets):
+            events.append(SessionEvent(0.0, EVENT_SUBSCRIBE))
+        events.extend(
+            SessionEvent(packet["timestamp"] - start, packet["source"], bytes.fromhex(packet["data"]))
+            for packet in packets
+        )
+        return cls(events, name)
+
+
+def capture_packets(data: list | dict[str, Any]) -> list[dict[str, Any]]:
+    """Return the PacketCapture.dump() held by a saved capture.
+
+    Accepts the packet list itself, the dump_packets service response
+    (keyed by entity_id by Home Assistant, with or without that level) or a
+    diagnostics download, whose packets sit under "data".
+    """
+    if isinstance(data, list):
+        return data
+    if "data" in data:
+        data = data["data"]
+    if "packets" not in data and len(data) == 1:
+        # {"sensor.nursery_mode": {"packets": [...]}}
+        data = next(iter(data.values()))
+    if not isinstance(data, dict) or "packets" not in data:
+        raise ValueError("No packet capture found")
+    return data["packets"]
+
+
+class SessionRecorder:
+    """Wrap a connector so everything on the links it opens is recorded.
+
+        recorder = SessionRecorder()
+        device = GlowdreamingDevice(ble_device, connector=recorder.connect)
+        ...
+        recorder.recording.save("session.json")
+    """
+
+    def __init__(self, connector=None, clock: Callable[[], float] = time.monotonic, name: str = "") -> None:
+        if connector is None:
+            try:
+                from custom_components.glowdreaming.glowdreaming_api.device import _establish_connection
+            except ImportError:
+                # Run from benchmarks/ without Home Assistant, with the protocol layer on sys.path
+                from glowdreaming_api.device import _establish_connection
+            connector = _establish_connection
+        self._connector = connector
+        self._clock = clock
+        self._started: float | None = None
+        self.recording = SessionRecording(name=name)
+
+    def _now(self) -> float:
+        if self._started is None:
+            self._started = self._clock()
+        return self._clock() - self._started
+
+    def record(self, kind: str, data: bytes = b"", started: float | None = None) -> None:
+        now = self._now()
+        t = started if started is not None else now
+        self.recording.events.append(SessionEvent(t, kind, bytes(data), now - t if started is not None else 0.0))
+
+    async def connect(self, ble_device, disconnected_callback, ble_device_callback=None):
+        """Connector for GlowdreamingDevice that records the link it opens."""
+        started = self._now()
+        client = RecordingClient(self)
+
+        def _disconnected(_inner) -> None:
+            # Only a link lost from the device's side is replayed as such
+            if not client.closing:
+                self.record(EVENT_DISCONNECTED)
+            disconnected_callback(client)
+
+        client.client = await self._connector(ble_device, _disconnected, ble_device_callback)
+        self.record(EVENT_CONNECT, started=started)
+        return client
+
+
+class RecordingClient:
+    """Pass every call through to the real client, recording it on the way."""
+
+    def __init__(self, recorder: SessionRecorder, client=None) -> None:
+        self._recorder = recorder
+        self.client = client
+        self.closing = False
+
+    async def start_notify(self, uuid, callback) -> None:
+        def _notify(sender, data: bytearray) -> None:
+            self._recorder.record(EVENT_NOTIFY, data)
+            callback(sender, data)
+
+        await self.client.start_notify(uuid, _notify)
+        self._recorder.record(EVENT_SUBSCRIBE)
+
+    async def read_gatt_char(self, uuid) -> bytearray:
+        started = self._recorder._now()
+        data = await self.client.read_gatt_char(uuid)
+        self._recorder.record(EVENT_READ, data, started)
+        return data
+
+    async def write_gatt_char(self, uuid, data, response: bool = True) -> None:
+        started = self._recorder._now()
+        await self.client.write_gatt_char(uuid, data, response)
+        self._recorder.record(EVENT_WRITE, data, started)
+
+    async def disconnect(self) -> None:
+        self.closing = True
+        self._recorder.record(EVENT_DISCONNECT)
+        await self.client.disconnect()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+
+class SessionReplay:
+    """Play a recording back as the device, with the recorded timing.
+
+    Each connect takes the next recorded connect's latency and opens a
+    client for that part of the session. Its notifications and link losses
+    are scheduled at their recorded offsets from the connect, reads return
+    the recorded payloads in order and writes take their recorded latency.
+    `speed` scales every delay, so a long session can replay faster while
+    keeping its order of events.
+
+        replay = SessionReplay(SessionRecording.load("session.json"))
+        device = GlowdreamingDevice(replay.ble_device, connector=replay.connect)
+    """
+
+    def __init__(self, recording: SessionRecording, speed: float = 1.0) -> None:
+        self.recording = recording
+        self.speed = speed
+        self.ble_device = SimpleNamespace(name=recording.name or "Glow Dreaming Replay", address="00:00:00:00:00:00")
+        self._segments = _split_segments(recording.events)
+        self.connects = 0
+        self.reads = 0
+        self.writes: list[bytes] = []
+        self.notifications = 0
+        self.client: ReplayClient | None = None
+
+    def delay(self, seconds: float) -> float:
+        return seconds / self.speed
+
+    async def connect(self, _ble_device, disconnected_callback, _ble_device_callback=None):
+        """Connector for GlowdreamingDevice; fails once the recording has no connects left."""
+        if self.connects >= len(self._segments):
+            raise TimeoutError("No more connects in the recording")
+        connect, events = self._segments[self.connects]
+        self.connects += 1
+        await asyncio.sleep(self.delay(connect.latency))
+        self.client = ReplayClient(self, connect.t + connect.latency, events, disconnected_callback)
+        return self.client
+
+
+def _split_segments(events: list[SessionEvent]) -> list[tuple[SessionEvent, list[SessionEvent]]]:
+    """Group the events following each connect."""
+    segments: list[tuple[SessionEvent, list[SessionEvent]]] = []
+    for event in events:
+        if event.kind == EVENT_CONNECT:
+            segments.append((event, []))
+        elif segments:
+            segments[-1][1].append(event)
+    return segments
+
+
+class ReplayClient:
+    """One recorded connection, standing in for a BleakClient."""
+
+    def __init__(
+        self, replay: SessionReplay, connected_at: float, events: list[SessionEvent], disconnected_callback
+    ) -> None:
+        self._replay = replay
+        self._disconnected_callback = disconnected_callback
+        self._notify_callback = None
+        self._reads = [event for event in events if event.kind == EVENT_READ]
+        self._writes = [event for event in events if event.kind == EVENT_WRITE]
+        self._last = b""
+        self.is_connected = True
+        loop = asyncio.get_running_loop()
+        self._handles = [
+            loop.call_later(replay.delay(max(0.0, event.t - connected_at)), self._push, event.data)
+            for event in events
+            if event.kind == EVENT_NOTIFY
+        ]
+        for event in events:
+            if event.kind == EVENT_DISCONNECTED:
+                self._handles.append(
+                    loop.call_later(replay.delay(max(0.0, event.t - connected_at)), self.drop)
+                )
+                break
+
+    def _push(self, data: bytes) -> None:
+        self._last = data
+        if self.is_connected and self._notify_callback is not None:
+            self._replay.notifications += 1
+            self._notify_callback(None, bytearray(data))
+
+    async def start_notify(self, _uuid, callback) -> None:
+        self._notify_callback = callback
+
+    async def stop_notify(self, _uuid) -> None:
+        self._notify_callback = None
+
+    async def read_gatt_char(self, _uuid) -> bytearray:
+        if self._reads:
+            event = self._reads.pop(0)
+            await asyncio.sleep(self._replay.delay(event.latency))
+            self._last = event.data
+        self._replay.reads += 1
+        return bytearray(self._last)
+
+    async def write_gatt_char(self, _uuid, data, _response: bool = True) -> None:
+        if self._writes:
+            await asyncio.sleep(self._replay.delay(self._writes.pop(0).latency))
+        self._replay.writes.append(bytes(data))
+
+    async def disconnect(self) -> None:
+        self.drop()
+
+    def drop(self) -> None:
+        if not self.is_connected:
+            return
+        self.is_connected = False
+        self._notify_callback = None
+        for handle in self._handles:
+            handle.cancel()
+        self._disconnected_callback(self)
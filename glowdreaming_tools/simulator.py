@@ -0,0 +1,203 @@
+"""In-process stand-in for a Glow Dreaming device and its Bluetooth link"""
+
+import asyncio
+import random
+from collections.abc import Callable
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any
+
+try:
+    from custom_components.glowdreaming.glowdreaming_api.codec import decode_command
+    from custom_components.glowdreaming.glowdreaming_api.const import CHAR_CHARACTERISTIC, GDHumidifier
+except ImportError:
+    # Run from benchmarks/ without Home Assistant, with the protocol layer on sys.path
+    from glowdreaming_api.codec import decode_command
+    from glowdreaming_api.const import CHAR_CHARACTERISTIC, GDHumidifier
+
+# What the device reports after power-up: everything off
+INITIAL_STATE = bytes.fromhex("000000000000000000000044")
+
+# State packet byte 9 carries the 2/4 hour option while the humidifier is
+# on, and the power bit (4) otherwise
+_HUMIDIFIER_FLAGS = {GDHumidifier.TWO: 1, GDHumidifier.FOUR: 2}
+_POWER_FLAG = 4
+
+
+@dataclass(slots=True)
+class LinkProfile:
+    """Timing and reliability of a simulated device; latencies are in seconds."""
+
+    connect_latency: float = 0.0
+    write_latency: float = 0.0
+    read_latency: float = 0.0
+    notify_latency: float = 0.0
+    # Time the device takes to apply a write; reads return the old state until then
+    apply_delay: float = 0.0
+    # Every latency varies by up to +/- this fraction
+    jitter: float = 0.0
+    # Probability that a notification is never delivered
+    packet_loss: float = 0.0
+    # Push the current state as soon as a client subscribes
+    notify_on_subscribe: bool = True
+
+
+class SimulatedDevice:
+    """A Glow Dreaming device emulated in-process.
+
+    It owns the 12-byte state behind CHAR_CHARACTERISTIC, applies written
+    commands to it and notifies subscribers of every change, with the
+    latencies, jitter and notification loss of its LinkProfile. Pass
+    `connect` as the GlowdreamingDevice connector and `ble_device` as its
+    BLE device:
+
+        sim = SimulatedDevice(LinkProfile(write_latency=0.05))
+        device = GlowdreamingDevice(sim.ble_device, connector=sim.connect)
+    """
+
+    def __init__(
+        self,
+        profile: LinkProfile | None = None,
+        state: bytes = INITIAL_STATE,
+        seed: int | None = None,
+        name: str = "Glow Dreaming Simulator",
+        address: str = "00:00:00:00:00:00",
+    ) -> None:
+        self.profile = profile or LinkProfile()
+        self.state = bytearray(state)
+        self.ble_device = SimpleNamespace(name=name, address=address)
+        self.client: SimulatedClient | None = None
+        self._rng = random.Random(seed)
+        self.connects = 0
+        self.writes = 0
+        self.reads = 0
+        self.notifications = 0
+        self.notifications_lost = 0
+
+    def latency(self, base: float) -> float:
+        """`base` with the profile's jitter applied."""
+        if not base or not self.profile.jitter:
+            return base
+        return max(0.0, base * (1 + self.profile.jitter * (2 * self._rng.random() - 1)))
+
+    async def connect(self, _ble_device, disconnected_callback: Callable[[Any], None], _ble_device_callback=None):
+        """Connector for GlowdreamingDevice: open a link after the connect latency."""
+        await asyncio.sleep(self.latency(self.profile.connect_latency))
+        if self.client is not None:
+            self.client.drop()
+        self.connects += 1
+        self.client = SimulatedClient(self, disconnected_callback)
+        return self.client
+
+    def drop(self) -> None:
+        """Lose the link, e.g. when the device goes out of range."""
+        if self.client is not None:
+            self.client.drop()
+
+    def apply(self, command: bytes) -> None:
+        """Update the state the way the device does for a written command packet."""
+        _effect, _brightness, _volume, humidifier = decode_command(command)
+        state = self.state
+        state[0:4] = command[0:4]
+        state[4] = 0 if humidifier is GDHumidifier.NONE else 1
+        state[5] = state[6] = state[8] = 0
+        state[7] = command[7] if humidifier in _HUMIDIFIER_FLAGS else 0
+        powered = command[0] or command[1] or command[3]
+        state[9] = _HUMIDIFIER_FLAGS.get(humidifier, _POWER_FLAG if powered else 0)
+        self._changed()
+
+    def set_state(self, packet: bytes) -> None:
+        """Change the state from the device side, like a button press."""
+        self.state[:] = packet
+        self._changed()
+
+    def _changed(self) -> None:
+        if self.client is not None:
+            self.client.notify(bytes(self.state))
+
+    def lose_packet(self) -> bool:
+        if self.profile.packet_loss and self._rng.random() < self.profile.packet_loss:
+            self.notifications_lost += 1
+            return True
+        return False
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "connects": self.connects,
+            "writes": self.writes,
+            "reads": self.reads,
+            "notifications": self.notifications,
+            "notifications_lost": self.notifications_lost,
+        }
+
+
+class SimulatedClient:
+    """The BleakClient methods GlowdreamingDevice uses, backed by a SimulatedDevice."""
+
+    def __init__(self, device: SimulatedDevice, disconnected_callback: Callable[[Any], None]) -> None:
+        self._device = device
+        self._disconnected_callback = disconnected_callback
+        self._notify_callback: Callable[[Any, bytearray], None] | None = None
+        self.is_connected = True
+
+    def _check(self, uuid) -> None:
+        if not self.is_connected:
+            raise ConnectionError("Not connected")
+        if str(uuid).replace("-", "").lower() != CHAR_CHARACTERISTIC:
+            raise ValueError(f"Characteristic {uuid} was not found")
+
+    async def start_notify(self, uuid, callback: Callable[[Any, bytearray], None]) -> None:
+        self._check(uuid)
+        self._notify_callback = callback
+        if self._device.profile.notify_on_subscribe:
+            self.notify(bytes(self._device.state))
+
+    async def stop_notify(self, uuid) -> None:
+        self._check(uuid)
+        self._notify_callback = None
+
+    async def read_gatt_char(self, uuid) -> bytearray:
+        self._check(uuid)
+        await asyncio.sleep(self._device.latency(self._device.profile.read_latency))
+        self._device.reads += 1
+        return bytearray(self._device.state)
+
+    async def write_gatt_char(self, uuid, data, response: bool = True) -> None:
+        self._check(uuid)
+        await asyncio.sleep(self._device.latency(self._device.profile.write_latency))
+        self._device.writes += 1
+        command = bytes(data)
+        delay = self._device.latency(self._device.profile.apply_delay)
+        if delay:
+            asyncio.get_running_loop().call_later(delay, self._device.apply, command)
+        else:
+            self._device.apply(command)
+
+    def notify(self, packet: bytes) -> None:
+        """Send `packet` to the subscriber after the notify latency, unless it is lost."""
+        if self._notify_callback is None or self._device.lose_packet():
+            return
+        delay = self._device.latency(self._device.profile.notify_latency)
+        loop = asyncio.get_running_loop()
+        if delay:
+            loop.call_later(delay, self._deliver, packet)
+        else:
+            loop.call_soon(self._deliver, packet)
+
+    def _deliver(self, packet: bytes) -> None:
+        if self.is_connected and self._notify_callback is not None:
+            self._device.notifications += 1
+            self._notify_callback(None, bytearray(packet))
+
+    async def disconnect(self) -> None:
+        self.drop()
+
+    def drop(self) -> None:
+        if not self.is_connected:
+            return
+        self.is_connected = False
+        self._notify_callback = None
+        if self._device.client is self:
+            self._device.client = None
+        self._disconnected_callback(self)
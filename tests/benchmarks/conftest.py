@@ -0,0 +1,67 @@
+"""Benchmarks for the decode, encode, entity and coordinator hot paths.
+
+Requires pytest-benchmark; without it this directory is not collected.
+Run only the benchmarks and save the results as a JSON baseline:
+
+    python -m pytest tests/benchmarks --benchmark-only --benchmark-save=baseline
+
+After a change, compare against the newest saved run and fail on any
+benchmark whose mean got more than 10% slower:
+
+    python -m pytest tests/benchmarks --benchmark-only \\
+        --benchmark-compare --benchmark-compare-fail=mean:10%
+
+Baselines are stored under .benchmarks/ per machine and Python version,
+so compare runs made on the same machine.
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+try:
+    import pytest_benchmark  # noqa: F401
+except ImportError:
+    collect_ignore_glob = ["test_*.py"]
+
+# Decoded on every notification or read; covers each light, volume and humidifier byte
+PACKETS = [
+    bytes.fromhex(value)
+    for value in (
+        "000000000000ffff0000",
+        "0a0000010001000000040044",
+        "640000030001000000040044",
+        "002800000001000000040044",
+        "00000000010000780001",
+        "00000000010000f00002",
+    )
+]
+
+
+@pytest.fixture
+def simulator():
+    """A simulated device with an instant link, so the benchmarks time our code only."""
+    from glowdreaming_tools.simulator import SimulatedDevice
+
+    return SimulatedDevice(state=PACKETS[1], seed=0)
+
+
+@pytest.fixture
+def event_loop_runner():
+    """Run coroutines to completion from inside a synchronous benchmark."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+def make_coordinator(device):
+    from custom_components.glowdreaming.coordinator import BTCoordinator
+
+    coordinator = BTCoordinator(MagicMock(), MagicMock(), device, MagicMock(), "Glow Dreaming", "bench-unique-id")
+    # Set by the real DataUpdateCoordinator
+    coordinator.update_interval = timedelta(seconds=coordinator._interval.seconds)
+    coordinator.async_set_updated_data = lambda data: setattr(coordinator, "data", data)
+    return coordinator
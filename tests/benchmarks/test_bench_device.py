@@ -0,0 +1,49 @@
+"""Decode, encode and level lookups on GlowdreamingDevice."""
+from __future__ import annotations
+
+from itertools import product
+from unittest.mock import MagicMock
+
+from custom_components.glowdreaming.glowdreaming_api.const import (
+    GDBrightness,
+    GDEffect,
+    GDHumidifier,
+    GDVolume,
+)
+from custom_components.glowdreaming.glowdreaming_api.device import GlowdreamingDevice
+
+from .conftest import PACKETS
+
+COMMANDS = list(product(GDEffect, GDBrightness, GDVolume, GDHumidifier))
+
+
+def test_refresh_data_throughput(benchmark):
+    device = GlowdreamingDevice(MagicMock())
+
+    def decode():
+        for packet in PACKETS:
+            device._refresh_data(packet)
+
+    benchmark(decode)
+    assert device.mode_hex == PACKETS[-1].hex()
+
+
+def test_get_command_string_throughput(benchmark):
+    device = GlowdreamingDevice(MagicMock())
+
+    def encode():
+        for command in COMMANDS:
+            device.get_command_string(*command)
+
+    benchmark(encode)
+
+
+def test_level_properties(benchmark):
+    device = GlowdreamingDevice(MagicMock())
+    device._refresh_data(PACKETS[2])
+    state = device.state
+
+    def levels():
+        return device.volume_level, device.brightness_level, state.volume_level, state.brightness_level
+
+    assert benchmark(levels) == (GDVolume.HIGH, GDBrightness.HIGH, GDVolume.HIGH, GDBrightness.HIGH)
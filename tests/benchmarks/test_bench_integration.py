@@ -0,0 +1,66 @@
+"""Entity state writes and full coordinator update cycles."""
+from __future__ import annotations
+
+from itertools import cycle
+from unittest.mock import MagicMock
+
+from custom_components.glowdreaming.glowdreaming_api.device import GlowdreamingDevice
+from custom_components.glowdreaming.light import GlowdreamingLight
+from custom_components.glowdreaming.media_player import GlowdreamingMediaPlayer
+from custom_components.glowdreaming.sensor import GlowdreamingSensor
+
+from .conftest import PACKETS, make_coordinator
+
+
+def test_entity_state_write(benchmark):
+    """Every property Home Assistant reads when the three entities write their state."""
+    device = GlowdreamingDevice(MagicMock())
+    device._refresh_data(PACKETS[1])
+    coordinator = make_coordinator(device)
+    light = GlowdreamingLight(coordinator)
+    media_player = GlowdreamingMediaPlayer(coordinator)
+    sensor = GlowdreamingSensor(coordinator)
+
+    def write_state():
+        return (
+            light.available, light.is_on, light.brightness, light.effect, light.effect_list,
+            media_player.available, media_player.state, media_player.source, media_player.source_list,
+            media_player.volume_level,
+            sensor.available, sensor.native_value, sensor.extra_state_attributes,
+        )
+
+    benchmark(write_state)
+
+
+def test_coordinator_update_cycle(benchmark, simulator, event_loop_runner):
+    """Connect, subscribe, decode the pushed packet and publish it, as after a dropped link."""
+    device = GlowdreamingDevice(simulator.ble_device, connector=simulator.connect)
+    coordinator = make_coordinator(device)
+    packets = cycle(PACKETS)
+
+    def drop_link():
+        simulator.drop()
+        # Changed while disconnected, so every cycle publishes a new state
+        simulator.state[:] = next(packets)
+
+    def update():
+        coordinator.data = event_loop_runner(coordinator._async_update_data())
+
+    benchmark.pedantic(update, setup=drop_link, rounds=200, warmup_rounds=10)
+    assert device.connected
+    assert coordinator.data.raw in PACKETS
+
+
+def test_coordinator_watchdog_poll(benchmark, simulator, event_loop_runner):
+    """A poll while connected and subscribed: one read checked against the pushed state."""
+    device = GlowdreamingDevice(simulator.ble_device, connector=simulator.connect)
+    coordinator = make_coordinator(device)
+    event_loop_runner(coordinator._async_update_data())
+
+    def update():
+        coordinator.data = event_loop_runner(coordinator._async_update_data())
+
+    benchmark(update)
+    assert coordinator.polls > 1
+    assert simulator.reads == coordinator.polls - 1
+    assert coordinator.push_misses == 0
@@ -16,6 +16,12 @@ class _Entity:
     def async_write_ha_state(self) -> None:  # noqa: D102
         pass
 
+    def async_on_remove(self, func) -> None:  # noqa: D102
+        pass
+
+    async def async_added_to_hass(self) -> None:  # noqa: D102
+        pass
+
 
 class _CoordinatorEntity(_Entity):
     def __init__(self, *args, **kwargs) -> None:
@@ -24,6 +30,9 @@ class _CoordinatorEntity(_Entity):
         if args:
             self.coordinator = args[0]
 
+    def _handle_coordinator_update(self) -> None:
+        self.async_write_ha_state()
+
     @classmethod
     def __class_getitem__(cls, item):  # support CoordinatorEntity[T] syntax
         return cls
@@ -111,6 +120,18 @@ _coord_mod.CoordinatorEntity = _CoordinatorEntity
 _coord_mod.DataUpdateCoordinator = _CoordinatorEntity
 _coord_mod.UpdateFailed = _UpdateFailed
 
+_diagnostics_mod = MagicMock()
+_diagnostics_mod.async_redact_data = lambda data, to_redact: {
+    key: "**REDACTED**" if key in to_redact else value for key, value in data.items()
+}
+
+_const_mod = MagicMock()
+_const_mod.CONF_ADDRESS = "address"
+
+_storage_mod = MagicMock()
+_storage_mod.Store.return_value.async_load = AsyncMock(return_value=None)
+_storage_mod.Store.return_value.async_remove = AsyncMock()
+
 _core_mod = MagicMock()
 _core_mod.callback = lambda f: f  # pass-through decorator
 
@@ -120,6 +141,9 @@ _bleak_exc_mod.BleakError = IOError  # real Exception subclass for raise/except
 _bleak_mod = MagicMock()
 _bleak_mod.BleakError = IOError  # coordinator imports BleakError from bleak directly
 
+_retry_connector_mod = MagicMock()
+_retry_connector_mod.establish_connection = AsyncMock()
+
 # async_timeout needs to work as an async context manager
 _mock_cm = MagicMock()
 _mock_cm.__aenter__ = AsyncMock(return_value=None)
@@ -129,11 +153,12 @@ _async_timeout_mod.timeout = MagicMock(return_value=_mock_cm)
 
 sys.modules.update({
     "homeassistant": MagicMock(),
-    "homeassistant.const": MagicMock(),
+    "homeassistant.const": _const_mod,
     "homeassistant.core": _core_mod,
     "homeassistant.exceptions": MagicMock(),
     "homeassistant.components": MagicMock(),
     "homeassistant.components.bluetooth": MagicMock(),
+    "homeassistant.components.diagnostics": _diagnostics_mod,
     "homeassistant.components.light": _light_mod,
     "homeassistant.components.sensor": _sensor_mod,
     "homeassistant.components.media_player": _mp_mod,
@@ -142,12 +167,17 @@ sys.modules.update({
     "homeassistant.helpers.config_validation": MagicMock(),
     "homeassistant.helpers.update_coordinator": _coord_mod,
     "homeassistant.helpers.entity_platform": MagicMock(),
+    "homeassistant.helpers.event": MagicMock(),
     "homeassistant.helpers.device_registry": MagicMock(),
+    "homeassistant.helpers.storage": _storage_mod,
+    "homeassistant.util": MagicMock(),
+    "homeassistant.util.dt": MagicMock(),
     "voluptuous": MagicMock(),
     "bleak": _bleak_mod,
     "bleak.exc": _bleak_exc_mod,
     "bleak.backends": MagicMock(),
     "bleak.backends.device": MagicMock(),
+    "bleak_retry_connector": _retry_connector_mod,
     "async_timeout": _async_timeout_mod,
 })
 
@@ -170,6 +200,9 @@ def mock_device():
     """MagicMock that mimics GlowdreamingDevice's public interface."""
     device = MagicMock()
     device.connected = True
+    device.available = True
+    device.notifying = False
+    device.notifications = 0
     device.brightness = 10
     device.brightness_level = GDBrightness.LOW
     device.last_brightness = GDBrightness.LOW
@@ -179,11 +212,21 @@ def mock_device():
     device.volume_level = GDVolume.LOW
     device.humidifier = GDHumidifier.NONE
     device.humidifier_timer = 0
+    device.humidifier_remaining.return_value = 0
+    device.humidifier_ends_in.return_value = None
+    device.next_timer_boundary.return_value = None
     device.device_lock = None
     device.mode = "test mode string"
     device.mode_hex = "0a0000010000ffff0000"
-    device._sound = None
+    device.sound = None
+    device.ack_latency = None
+    device.rssi = -60
+    device.policy.stats = {"policy": "always", "connects": 1, "disconnects": 0, "idle_disconnects": 0}
+    device.breaker.stats = {"breaker_open": False, "connect_failures": 0, "connects_skipped": 0}
+    device.pool.stats = {"pool_slots": 3, "pool_in_use": 1, "pool_waiting": 0}
+    device.capture.dump.return_value = [{"direction": "in", "source": "notify", "data": "0a0000010000ffff0000"}]
     device.set_mode = AsyncMock()
+    device.update_mode = AsyncMock()
     device.update = AsyncMock()
     device.write_gatt = AsyncMock()
     device.read_gatt = AsyncMock()
@@ -195,6 +238,7 @@ def mock_coordinator(mock_device):
     """MagicMock coordinator backed by mock_device."""
     coord = MagicMock()
     coord.data = mock_device
+    coord.device = mock_device
     coord.ble_device.address = "AA:BB:CC:DD:EE:FF"
     coord.base_unique_id = "test-unique-id"
     coord.device_name = "Glow Dreaming Test"
@@ -0,0 +1,56 @@
+"""Tests for the PacketCapture ring buffer."""
+from __future__ import annotations
+
+from custom_components.glowdreaming.glowdreaming_api.capture import (
+    DIRECTION_IN,
+    DIRECTION_OUT,
+    SOURCE_NOTIFY,
+    SOURCE_WRITE,
+    PacketCapture,
+)
+
+
+class TestPacketCapture:
+    def test_empty(self):
+        capture = PacketCapture(4)
+        assert len(capture) == 0
+        assert capture.dump() == []
+
+    def test_keeps_order_until_full(self):
+        capture = PacketCapture(4)
+        for i in range(3):
+            capture.record(float(i), DIRECTION_IN, SOURCE_NOTIFY, bytes([i]))
+        assert [entry[3] for entry in capture.entries()] == [b"\x00", b"\x01", b"\x02"]
+
+    def test_overwrites_oldest(self):
+        capture = PacketCapture(4)
+        for i in range(10):
+            capture.record(float(i), DIRECTION_IN, SOURCE_NOTIFY, bytes([i]))
+        assert len(capture) == 4
+        assert [entry[0] for entry in capture.entries()] == [6.0, 7.0, 8.0, 9.0]
+
+    def test_slots_are_preallocated(self):
+        capture = PacketCapture(4)
+        payloads = capture._payloads
+        for i in range(10):
+            capture.record(float(i), DIRECTION_IN, SOURCE_NOTIFY, bytes([i]))
+        assert capture._payloads is payloads
+        assert len(payloads) == 4
+
+    def test_dump(self):
+        capture = PacketCapture(4)
+        capture.record(10.0, DIRECTION_OUT, SOURCE_WRITE, bytes.fromhex("0a00"), 0.000002)
+        assert capture.dump(now=12.5) == [{
+            "timestamp": 10.0,
+            "age": 2.5,
+            "direction": "out",
+            "source": "write",
+            "data": "0a00",
+            "decode_latency_us": 2.0,
+        }]
+
+    def test_clear(self):
+        capture = PacketCapture(4)
+        capture.record(1.0, DIRECTION_IN, SOURCE_NOTIFY, b"\x01")
+        capture.clear()
+        assert capture.entries() == []
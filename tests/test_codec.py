@@ -0,0 +1,70 @@
+"""Tests for the packet decode tables and the precomputed command table."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.glowdreaming.glowdreaming_api.codec import (
+    BRIGHTNESS_LEVELS,
+    COMMANDS,
+    EFFECTS,
+    HUMIDIFIER_MODES,
+    VOLUME_LEVELS,
+    decode_command,
+    encode_command,
+)
+from custom_components.glowdreaming.glowdreaming_api.const import (
+    GDBrightness,
+    GDEffect,
+    GDHumidifier,
+    GDVolume,
+)
+
+
+class TestDecodeTables:
+    def test_tables_cover_every_byte(self):
+        for table in (BRIGHTNESS_LEVELS, VOLUME_LEVELS, HUMIDIFIER_MODES):
+            assert len(table) == 256
+
+    def test_brightness_levels(self):
+        assert BRIGHTNESS_LEVELS[0] == GDBrightness.NONE
+        assert BRIGHTNESS_LEVELS[10] == GDBrightness.LOW
+        assert BRIGHTNESS_LEVELS[40] == GDBrightness.MEDIUM
+        assert BRIGHTNESS_LEVELS[100] == GDBrightness.HIGH
+        assert BRIGHTNESS_LEVELS[99] == GDBrightness.NONE
+
+    def test_humidifier_modes(self):
+        assert HUMIDIFIER_MODES[1] == GDHumidifier.TWO
+        assert HUMIDIFIER_MODES[2] == GDHumidifier.FOUR
+        assert HUMIDIFIER_MODES[0] == GDHumidifier.CONTINUOUS
+
+    def test_effects(self):
+        assert EFFECTS[False][False] == GDEffect.NONE
+        assert EFFECTS[False][True] == GDEffect.AWAKE
+        assert EFFECTS[True][False] == GDEffect.SLEEP
+        assert EFFECTS[True][True] == GDEffect.SLEEP
+
+
+class TestCommandTable:
+    def test_every_combination_is_encoded(self):
+        assert len(COMMANDS) == len(GDEffect) * len(GDBrightness) * len(GDVolume) * len(GDHumidifier)
+        assert all(isinstance(value, bytes) and len(value) == 10 for value in COMMANDS.values())
+
+    def test_table_is_read_only(self):
+        with pytest.raises(TypeError):
+            COMMANDS[GDEffect.NONE, GDBrightness.NONE, GDVolume.NONE, GDHumidifier.NONE] = b""
+
+    def test_encode_returns_table_entry(self):
+        key = (GDEffect.SLEEP, GDBrightness.HIGH, GDVolume.MEDIUM, GDHumidifier.TWO)
+        assert encode_command(*key) is COMMANDS[key]
+        assert COMMANDS[key].hex() == "640000020100007800" + "00"
+
+    def test_unknown_values_encode_as_none(self):
+        assert encode_command(None, GDBrightness.LOW, None, None) == bytes.fromhex("000000000000ffff0000")
+
+
+class TestDecodeCommand:
+    def test_round_trips_every_command(self):
+        for (effect, brightness, volume, humidifier), command in COMMANDS.items():
+            if brightness is GDBrightness.NONE or effect is GDEffect.NONE:
+                effect, brightness = GDEffect.NONE, GDBrightness.NONE
+            assert decode_command(command) == (effect, brightness, volume, humidifier)
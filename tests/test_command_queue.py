@@ -0,0 +1,96 @@
+"""Tests for CommandQueue latest-wins coalescing."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.glowdreaming.glowdreaming_api.command_queue import CommandQueue
+
+
+class SlowSender:
+    """Records every write and blocks until released."""
+
+    def __init__(self) -> None:
+        self.writes: list[dict] = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, changes: dict) -> None:
+        self.writes.append(changes)
+        await self.release.wait()
+
+
+class TestCommandQueue:
+    @pytest.mark.asyncio
+    async def test_single_submit_writes_once(self):
+        sender = SlowSender()
+        sender.release.set()
+        queue = CommandQueue(sender)
+        await queue.submit(volume="Low")
+        assert sender.writes == [{"volume": "Low"}]
+        assert queue.busy is False
+
+    @pytest.mark.asyncio
+    async def test_burst_coalesces_to_latest_state(self):
+        sender = SlowSender()
+        queue = CommandQueue(sender)
+        first = asyncio.create_task(queue.submit(volume="Low"))
+        await asyncio.sleep(0)
+        # While the first write is in flight, a burst arrives
+        burst = [
+            asyncio.create_task(queue.submit(volume="Medium")),
+            asyncio.create_task(queue.submit(volume="High")),
+            asyncio.create_task(queue.submit(effect="Sleep", brightness="Low")),
+        ]
+        await asyncio.sleep(0)
+        assert queue.pending == {"volume": "High", "effect": "Sleep", "brightness": "Low"}
+        sender.release.set()
+        await asyncio.gather(first, *burst)
+        assert sender.writes == [
+            {"volume": "Low"},
+            {"volume": "High", "effect": "Sleep", "brightness": "Low"},
+        ]
+        assert queue.submitted == 4
+        assert queue.sent == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_propagates_to_all_waiters(self):
+        async def failing(_changes):
+            await asyncio.sleep(0)
+            raise IOError("write failed")
+
+        queue = CommandQueue(failing)
+        results = await asyncio.gather(
+            queue.submit(volume="Low"), queue.submit(volume="High"), return_exceptions=True
+        )
+        assert all(isinstance(result, IOError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_write(self):
+        sender = SlowSender()
+        queue = CommandQueue(sender)
+        caller = asyncio.create_task(queue.submit(volume="Low"))
+        other = asyncio.create_task(queue.submit(volume="Low"))
+        await asyncio.sleep(0)
+        caller.cancel()
+        sender.release.set()
+        await other
+        assert sender.writes == [{"volume": "Low"}]
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_write_and_pending_changes(self):
+        sender = SlowSender()
+        queue = CommandQueue(sender)
+        inflight = asyncio.create_task(queue.submit(volume="Low"))
+        await asyncio.sleep(0)
+        pending = asyncio.create_task(queue.submit(volume="High"))
+        await asyncio.sleep(0)
+        await queue.cancel()
+        results = await asyncio.gather(inflight, pending, return_exceptions=True)
+        assert all(isinstance(result, asyncio.CancelledError) for result in results)
+        assert queue.busy is False
+        assert queue.pending == {}
+        sender.release.set()
+        await asyncio.sleep(0)
+        # The pending change was never sent
+        assert sender.writes == [{"volume": "Low"}]
@@ -0,0 +1,121 @@
+"""Tests for connection policies."""
+from __future__ import annotations
+
+from datetime import datetime, time
+
+import pytest
+
+from custom_components.glowdreaming.glowdreaming_api.connection import (
+    AlwaysConnectedPolicy,
+    CircuitBreaker,
+    ConnectionPolicy,
+    IdleLeasePolicy,
+    ScheduledWindowPolicy,
+    make_policy,
+)
+
+
+def clock_at(hour: int, minute: int = 0):
+    return lambda: datetime(2025, 1, 1, hour, minute)
+
+
+class TestPolicies:
+    def test_base_policy_is_abstract(self):
+        with pytest.raises(TypeError):
+            ConnectionPolicy()
+
+    def test_always_connected_never_disconnects(self):
+        assert AlwaysConnectedPolicy().disconnect_after() is None
+
+    def test_idle_lease_uses_timeout(self):
+        assert IdleLeasePolicy(30).disconnect_after() == 30
+
+    @pytest.mark.parametrize("hour,inside", [(18, False), (19, True), (23, True), (3, True), (7, False), (12, False)])
+    def test_overnight_window(self, hour, inside):
+        policy = ScheduledWindowPolicy(time(19), time(7), 60, clock_at(hour))
+        assert policy.in_window() is inside
+
+    def test_daytime_window(self):
+        policy = ScheduledWindowPolicy(time(9), time(17), 60, clock_at(12))
+        assert policy.in_window() is True
+        assert policy.in_window(datetime(2025, 1, 1, 18)) is False
+
+    def test_window_stays_connected_until_it_closes(self):
+        policy = ScheduledWindowPolicy(time(19), time(7), 60, clock_at(6, 30))
+        assert policy.disconnect_after() == 30 * 60 + 60
+
+    def test_window_wraps_to_next_morning(self):
+        policy = ScheduledWindowPolicy(time(19), time(7), 60, clock_at(20))
+        assert policy.disconnect_after() == 11 * 3600 + 60
+
+    def test_outside_window_leases(self):
+        policy = ScheduledWindowPolicy(time(19), time(7), 60, clock_at(12))
+        assert policy.disconnect_after() == 60
+
+    def test_stats(self):
+        policy = IdleLeasePolicy()
+        policy.connects = 2
+        assert policy.stats == {"policy": "idle", "connects": 2, "disconnects": 0, "idle_disconnects": 0}
+
+
+class TestMakePolicy:
+    def test_by_name(self):
+        assert isinstance(make_policy("always"), AlwaysConnectedPolicy)
+        assert isinstance(make_policy("idle", idle_timeout=5), IdleLeasePolicy)
+        assert isinstance(make_policy("window", window_start=time(19), window_end=time(7)), ScheduledWindowPolicy)
+
+    def test_unknown_falls_back_to_always(self):
+        assert isinstance(make_policy("bogus"), AlwaysConnectedPolicy)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_breaker(rng: float = 0.5) -> tuple[CircuitBreaker, FakeClock]:
+    clock = FakeClock()
+    return CircuitBreaker(failure_threshold=2, base_delay=10, max_delay=100, jitter=0.2, clock=clock, rng=lambda: rng), clock
+
+
+class TestCircuitBreaker:
+    def test_stays_closed_below_threshold(self):
+        breaker, _clock = make_breaker()
+        breaker.record_failure()
+        assert breaker.allow() is True
+
+    def test_opens_at_threshold_and_skips(self):
+        breaker, clock = make_breaker()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.allow() is False
+        assert breaker.retry_in == 10
+        clock.now = 10
+        assert breaker.allow() is True
+        assert breaker.skipped == 1
+
+    def test_backoff_doubles_up_to_max(self):
+        breaker, clock = make_breaker()
+        delays = []
+        for _ in range(7):
+            breaker.record_failure()
+            delays.append(breaker.retry_in)
+        assert delays == [0.0, 10, 20, 40, 80, 100, 100]
+
+    @pytest.mark.parametrize("rng,delay", [(0.0, 8.0), (1.0, 12.0)])
+    def test_jitter_spreads_delay(self, rng, delay):
+        breaker, _clock = make_breaker(rng)
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.retry_in == pytest.approx(delay)
+
+    def test_success_closes(self):
+        breaker, _clock = make_breaker()
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        assert breaker.is_open is False
+        assert breaker.stats == {"breaker_open": False, "connect_failures": 0, "connects_skipped": 0}
@@ -1,16 +1,23 @@
 """Tests for BTCoordinator._async_update_data."""
 from __future__ import annotations
 
+from datetime import datetime, time, timedelta
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from custom_components.glowdreaming.coordinator import BTCoordinator
+from custom_components.glowdreaming.coordinator import WATCHDOG_INTERVAL, BTCoordinator
+from custom_components.glowdreaming.glowdreaming_api.polling import AdaptivePollInterval, PollScheduler
 from homeassistant.helpers.update_coordinator import UpdateFailed  # _UpdateFailed stub
 
 
-def make_coordinator(mock_device) -> BTCoordinator:
-    coord = object.__new__(BTCoordinator)
-    coord._device = mock_device
+def make_coordinator(mock_device, interval: AdaptivePollInterval | None = None) -> BTCoordinator:
+    coord = BTCoordinator(
+        MagicMock(), MagicMock(), mock_device, MagicMock(), "Glow Dreaming", "test-unique-id", interval=interval
+    )
+    # Set by the real DataUpdateCoordinator.__init__
+    coord.data = None
+    coord.update_interval = timedelta(seconds=coord._interval.seconds)
     return coord
 
 
@@ -20,7 +27,7 @@ class TestAsyncUpdateData:
         coord = make_coordinator(mock_device)
         result = await coord._async_update_data()
         mock_device.update.assert_called_once()
-        assert result is mock_device
+        assert result is mock_device.state
 
     @pytest.mark.asyncio
     async def test_timeout_raises_update_failed(self, mock_device):
@@ -36,3 +43,150 @@ class TestAsyncUpdateData:
         coord = make_coordinator(mock_device)
         with pytest.raises(UpdateFailed, match="Failed getting data"):
             await coord._async_update_data()
+
+
+class TestPush:
+    def test_changed_state_is_published(self, mock_device):
+        coord = make_coordinator(mock_device)
+        coord.data = "old"
+        coord.async_set_updated_data = MagicMock()
+        coord.async_handle_push()
+        coord.async_set_updated_data.assert_called_once_with(mock_device.state)
+
+    def test_unchanged_state_is_not_published(self, mock_device):
+        coord = make_coordinator(mock_device)
+        coord.data = mock_device.state
+        coord.async_set_updated_data = MagicMock()
+        coord.async_handle_push()
+        coord.async_set_updated_data.assert_not_called()
+
+
+class TestNeedsPoll:
+    @pytest.mark.asyncio
+    async def test_skips_poll_while_not_advertising(self, mock_device):
+        mock_device.connected = False
+        mock_device.reachable = False
+        coord = make_coordinator(mock_device)
+        coord.data = "last state"
+        assert await coord._async_update_data() == "last state"
+        mock_device.update.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_polls_when_advertising(self, mock_device):
+        mock_device.connected = False
+        mock_device.reachable = True
+        coord = make_coordinator(mock_device)
+        await coord._async_update_data()
+        mock_device.update.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_polls_while_connected(self, mock_device):
+        mock_device.reachable = False
+        coord = make_coordinator(mock_device)
+        await coord._async_update_data()
+        mock_device.update.assert_called_once()
+
+
+class TestPushMode:
+    def test_push_stretches_interval_to_watchdog(self, mock_device):
+        mock_device.notifying = True
+        mock_device.notifications = 1
+        coord = make_coordinator(mock_device)
+        coord.async_set_updated_data = MagicMock()
+        coord.async_handle_push()
+        assert coord.update_interval == WATCHDOG_INTERVAL
+        coord.async_set_updated_data.assert_called_once_with(mock_device.state)
+
+    def test_no_subscription_keeps_polling(self, mock_device):
+        mock_device.notifying = False
+        coord = make_coordinator(mock_device)
+        coord.async_set_updated_data = MagicMock()
+        coord.async_handle_push()
+        assert coord.update_interval < WATCHDOG_INTERVAL
+
+    @pytest.mark.asyncio
+    async def test_missed_push_tightens_until_next_notification(self, mock_device):
+        mock_device.notifying = True
+        mock_device.notifications = 1
+        coord = make_coordinator(mock_device)
+        coord.async_set_updated_data = MagicMock()
+        coord.async_handle_push()
+        coord.data = "pushed state"
+        await coord._async_update_data()  # mock_device.state differs
+        assert coord.push_misses == 1
+        assert coord.update_interval < WATCHDOG_INTERVAL
+
+        mock_device.notifications = 2
+        coord.async_handle_push()
+        assert coord.update_interval == WATCHDOG_INTERVAL
+
+    def test_subscription_without_push_keeps_polling(self, mock_device):
+        mock_device.notifying = True
+        coord = make_coordinator(mock_device)
+        assert coord.push_mode is False
+
+    @pytest.mark.asyncio
+    async def test_matching_watchdog_poll_keeps_push_mode(self, mock_device):
+        mock_device.notifying = True
+        mock_device.notifications = 1
+        coord = make_coordinator(mock_device)
+        coord.async_set_updated_data = MagicMock()
+        coord.async_handle_push()
+        coord.data = mock_device.state
+        await coord._async_update_data()
+        assert coord.push_misses == 0
+        assert coord.update_interval == WATCHDOG_INTERVAL
+
+
+class TestAdaptiveInterval:
+    @pytest.mark.asyncio
+    async def test_backs_off_while_nothing_changes(self, mock_device):
+        coord = make_coordinator(mock_device, AdaptivePollInterval(fast=5, slow=30))
+        coord.data = mock_device.state
+        intervals = []
+        for _ in range(4):
+            await coord._async_update_data()
+            intervals.append(coord.update_interval.total_seconds())
+        assert intervals == [10, 20, 30, 30]
+        assert coord.polls == 4
+
+    @pytest.mark.asyncio
+    async def test_change_drops_to_fast(self, mock_device):
+        coord = make_coordinator(mock_device, AdaptivePollInterval(fast=5, slow=30))
+        coord.update_interval = timedelta(seconds=30)
+        coord.data = "older state"
+        await coord._async_update_data()
+        assert coord.update_interval == timedelta(seconds=5)
+
+    def test_command_drops_to_fast(self, mock_device):
+        interval = AdaptivePollInterval(fast=5, slow=30)
+        interval.idle()
+        coord = make_coordinator(mock_device, interval)
+        coord.async_set_updated_data = MagicMock()
+        coord.async_handle_push()  # optimistic state from a command
+        assert coord.update_interval == timedelta(seconds=5)
+
+    def test_quiet_window(self, mock_device):
+        interval = AdaptivePollInterval(
+            fast=5, quiet=1800, quiet_start=time(9), quiet_end=time(17), clock=lambda: datetime(2025, 1, 1, 12)
+        )
+        coord = make_coordinator(mock_device, interval)
+        coord.async_set_updated_data = MagicMock()
+        coord.async_handle_push()
+        assert coord.update_interval == timedelta(seconds=1800)
+
+
+class TestScheduler:
+    @pytest.mark.asyncio
+    async def test_poll_moves_onto_phase(self, mock_device):
+        scheduler = PollScheduler(clock=lambda: 1000.0)
+        first = make_coordinator(mock_device, AdaptivePollInterval(fast=60))
+        second = make_coordinator(mock_device, AdaptivePollInterval(fast=60))
+        first._scheduler = second._scheduler = scheduler
+        scheduler.add(first)
+        scheduler.add(second)
+        for coord in (first, second):
+            coord.async_set_updated_data = MagicMock()
+            coord.async_handle_push()
+        assert (1000.0 + first.update_interval.total_seconds()) % 60 == 0
+        assert (1000.0 + second.update_interval.total_seconds()) % 60 == 30
@@ -1,9 +1,22 @@
 """Tests for GlowdreamingDevice: state parsing, command generation, tracking."""
 from __future__ import annotations
 
+import asyncio
+import gc
+import tracemalloc
+import weakref
+from types import SimpleNamespace
+
+import bleak_retry_connector as retry_connector  # conftest stub
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
+from custom_components.glowdreaming.glowdreaming_api import device as device_module
+from custom_components.glowdreaming.glowdreaming_api.connection import (
+    CircuitBreaker,
+    ConnectionState,
+    IdleLeasePolicy,
+)
 from custom_components.glowdreaming.glowdreaming_api.device import GlowdreamingDevice
 from custom_components.glowdreaming.glowdreaming_api.const import (
     GDBrightness,
@@ -14,6 +27,14 @@ from custom_components.glowdreaming.glowdreaming_api.const import (
 )
 
 
+_sleep = asyncio.sleep
+
+
+async def _yield() -> None:
+    """Let other tasks run, even while asyncio.sleep is patched out."""
+    await _sleep(0)
+
+
 def make_device() -> GlowdreamingDevice:
     return GlowdreamingDevice(MagicMock())
 
@@ -192,6 +213,53 @@ class TestRefreshDataEdgeCases:
         assert d.effect == GDEffect.SLEEP  # unchanged
 
 
+# ---------------------------------------------------------------------------
+# _refresh_data – input types and lazily built strings
+# ---------------------------------------------------------------------------
+
+class TestRefreshDataDecoding:
+    @pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview])
+    def test_accepts_buffer_types(self, wrap):
+        d = make_device()
+        d._refresh_data(wrap(bytes.fromhex("640000030001000000040044")))
+        assert d.brightness == 100
+        assert d.effect == GDEffect.SLEEP
+        assert d.volume == 3
+        assert d.power is True
+
+    def test_blue_channel_counts_towards_brightness(self):
+        d = parse("00000a000000ffff0000")
+        assert d.brightness == 10
+        assert d.effect == GDEffect.NONE
+
+    def test_mode_unknown_before_first_packet(self):
+        d = make_device()
+        assert d.mode == "unknown"
+        assert d.mode_hex == ""
+
+    def test_mode_and_mode_hex(self):
+        d = parse("0a0000010000ffff0004")
+        assert d.mode_hex == "0a0000010000ffff0004"
+        assert d.mode == (
+            "Power: True, Volume: 1, Brightness: 10, Effect: Sleep, "
+            "Humidifier: None, Timer: 255"
+        )
+
+    def test_mode_rebuilt_after_new_packet(self):
+        d = parse("0a0000000000ffff0000")
+        first = d.mode
+        d._refresh_data(bytearray.fromhex("640000000000ffff0000"))
+        assert d.mode != first
+        assert "Brightness: 100" in d.mode
+
+    def test_short_packet_updates_mode_hex_only(self):
+        d = parse("0a0000000000ffff0000")
+        mode = d.mode
+        d._refresh_data(bytearray.fromhex("0a00"))
+        assert d.mode_hex == "0a00"
+        assert d.mode == mode
+
+
 # ---------------------------------------------------------------------------
 # last_effect / last_brightness tracking
 # ---------------------------------------------------------------------------
@@ -341,3 +409,688 @@ class TestGetCommandString:
         d = make_device()
         cmd = d.get_command_string(GDEffect.SLEEP, GDBrightness.HIGH, GDVolume.HIGH, GDHumidifier.TWO)
         assert len(cmd) == 20
+
+
+# ---------------------------------------------------------------------------
+# Persistent notification subscription
+# ---------------------------------------------------------------------------
+
+def connected_device() -> tuple[GlowdreamingDevice, MagicMock]:
+    """Device with a fake, already-connected client."""
+    d = make_device()
+    client = MagicMock()
+    client.start_notify = AsyncMock()
+    client.stop_notify = AsyncMock()
+    client.disconnect = AsyncMock()
+    client.read_gatt_char = AsyncMock(return_value=bytearray.fromhex("0a0000000000ffff0000"))
+    d._client = client
+    d._state = ConnectionState.CONNECTED
+    return d, client
+
+
+class TestNotifications:
+    @pytest.mark.asyncio
+    async def test_subscribes_once_across_polls(self):
+        d, client = connected_device()
+
+        async def push_on_subscribe(_uuid, handler):
+            handler(None, bytearray.fromhex("640000000000ffff0000"))
+
+        client.start_notify.side_effect = push_on_subscribe
+        await d.update()
+        # The first poll takes the state pushed on subscribe
+        client.read_gatt_char.assert_not_called()
+        assert d.brightness == 100
+        await d.update()
+        client.start_notify.assert_called_once()
+        client.stop_notify.assert_not_called()
+        assert d.notifying is True
+
+    @pytest.mark.asyncio
+    async def test_poll_on_running_subscription_reads(self, monkeypatch):
+        """A change the device never pushed is found by the next poll."""
+        d, client = connected_device()
+        monkeypatch.setattr(asyncio, "sleep", AsyncMock())
+
+        async def push_on_subscribe(_uuid, handler):
+            handler(None, bytearray.fromhex("640000000000ffff0000"))
+
+        client.start_notify.side_effect = push_on_subscribe
+        await d.update()
+        await d.update()
+        client.read_gatt_char.assert_called()
+        assert d.brightness == 10
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_read_when_no_push(self, monkeypatch):
+        d, client = connected_device()
+        monkeypatch.setattr(asyncio, "sleep", AsyncMock())
+        monkeypatch.setattr(device_module, "NOTIFY_TIMEOUT_SECONDS", 0.01)
+        await d.subscribe_and_refresh()
+        client.read_gatt_char.assert_called()
+        assert d.brightness == 10
+
+    @pytest.mark.asyncio
+    async def test_silent_subscription_is_not_waited_on_again(self, monkeypatch):
+        d, client = connected_device()
+        monkeypatch.setattr(device_module, "NOTIFY_TIMEOUT_SECONDS", 0.05)
+        await d.update()
+        reads = client.read_gatt_char.await_count
+        assert reads >= 1
+
+        wait_for = AsyncMock()
+        monkeypatch.setattr(asyncio, "wait_for", wait_for)
+        await d.update()
+        wait_for.assert_not_called()
+        assert client.read_gatt_char.await_count > reads
+        client.start_notify.assert_called_once()
+
+    def test_notification_fires_callbacks(self):
+        d = make_device()
+        callback = MagicMock()
+        unregister = d.register_callback(callback)
+        d._handle_notification(None, bytearray.fromhex("000a00000000ffff0000"))
+        callback.assert_called_once()
+        assert d.effect == GDEffect.AWAKE
+        unregister()
+        d._handle_notification(None, bytearray.fromhex("000a00000000ffff0000"))
+        callback.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_stop_unsubscribes_and_disconnects(self):
+        d, client = connected_device()
+        d._notifying = True
+        await d.stop()
+        client.stop_notify.assert_called_once()
+        client.disconnect.assert_called_once()
+        assert d.notifying is False
+
+
+# ---------------------------------------------------------------------------
+# set_mode writes
+# ---------------------------------------------------------------------------
+
+class TestSetMode:
+    @pytest.mark.asyncio
+    async def test_writes_binary_command(self, monkeypatch):
+        d, client = connected_device()
+        client.write_gatt_char = AsyncMock()
+        monkeypatch.setattr(asyncio, "sleep", AsyncMock())
+        monkeypatch.setattr(d, "update", AsyncMock())
+        await d.set_mode(GDEffect.SLEEP, GDBrightness.LOW, GDVolume.HIGH, GDHumidifier.NONE)
+        uuid, payload, response = client.write_gatt_char.call_args.args
+        assert uuid is d._char_uuid
+        assert payload == bytes.fromhex("0a0000030000ffff0000")
+        assert response is True
+
+    @pytest.mark.asyncio
+    async def test_concurrent_partial_changes_are_merged(self, monkeypatch):
+        d, client = connected_device()
+        d._refresh_data(bytearray.fromhex("0a0000010000ffff0000"))  # sleep low, volume low
+        release = asyncio.Event()
+        writes = []
+
+        async def slow_write(_uuid, payload, _response):
+            writes.append(payload.hex())
+            await release.wait()
+
+        client.write_gatt_char = slow_write
+        monkeypatch.setattr(asyncio, "sleep", AsyncMock())
+        monkeypatch.setattr(d, "update", AsyncMock())
+
+        first = asyncio.create_task(d.update_mode(humidifier=GDHumidifier.CONTINUOUS))
+        while not writes:
+            await _yield()
+        light = asyncio.create_task(d.update_mode(effect=GDEffect.AWAKE, brightness=GDBrightness.HIGH))
+        volume = asyncio.create_task(d.update_mode(volume=GDVolume.HIGH))
+        await _yield()
+        release.set()
+        await asyncio.gather(first, light, volume)
+
+        assert writes[0] == "0a0000011010ffff0000"
+        # Light and volume went out together in one write
+        assert len(writes) == 2
+        assert writes[1][:8] == "00640003"
+
+
+# ---------------------------------------------------------------------------
+# Optimistic state and reconciliation
+# ---------------------------------------------------------------------------
+
+def writing_device(monkeypatch, reconcile_timeout: float = 3.0):
+    """Connected device whose writes block until `release` is set."""
+    d, client = connected_device()
+    d._reconcile_timeout = reconcile_timeout
+    d._refresh_data(bytearray.fromhex("0a0000010000ffff0000"))  # sleep low, volume low
+    release = asyncio.Event()
+
+    async def write(_uuid, _payload, _response):
+        await release.wait()
+
+    client.write_gatt_char = AsyncMock(side_effect=write)
+    monkeypatch.setattr(asyncio, "sleep", AsyncMock())
+    monkeypatch.setattr(d, "update", AsyncMock())
+    return d, client, release
+
+
+class TestOptimisticState:
+    @pytest.mark.asyncio
+    async def test_state_applied_before_write_completes(self, monkeypatch):
+        d, client, release = writing_device(monkeypatch)
+        callback = MagicMock()
+        d.register_callback(callback)
+        task = asyncio.create_task(d.update_mode(volume=GDVolume.HIGH))
+        while not client.write_gatt_char.called:
+            await _yield()
+        assert d.volume == 3
+        assert d.reconciling is True
+        callback.assert_called()
+        release.set()
+        await task
+
+    @pytest.mark.asyncio
+    async def test_matching_packet_confirms(self, monkeypatch):
+        d, _client, release = writing_device(monkeypatch)
+        release.set()
+        await d.update_mode(effect=GDEffect.AWAKE, brightness=GDBrightness.HIGH)
+        assert d.effect == GDEffect.AWAKE
+        d._refresh_data(bytearray.fromhex("006400010000ffff0000"))
+        assert d.reconciling is False
+        assert d.brightness == 100
+
+    @pytest.mark.asyncio
+    async def test_stale_packet_held_until_deadline(self, monkeypatch):
+        d, _client, release = writing_device(monkeypatch)
+        release.set()
+        await d.update_mode(volume=GDVolume.HIGH)
+        d._refresh_data(bytearray.fromhex("0a0000010000ffff0000"))  # pre-write state
+        assert d.volume == 3  # optimistic value kept
+        assert d.mode_hex == "0a0000010000ffff0000"  # unchanged raw packet
+        d._reconcile_expired()
+        assert d.volume == 1  # the device's report wins after the deadline
+        assert d.reconciling is False
+
+    @pytest.mark.asyncio
+    async def test_deadline_without_packet_reads_device(self, monkeypatch):
+        d, client, release = writing_device(monkeypatch)
+        release.set()
+        monkeypatch.setattr(d, "read_fresh", AsyncMock())
+        await d.update_mode(volume=GDVolume.HIGH)
+        d.read_fresh.reset_mock()
+        d._reconcile_expired()
+        await d._reconcile_task
+        d.read_fresh.assert_called_once()
+        assert d.reconciling is False
+
+    @pytest.mark.asyncio
+    async def test_failed_write_rolls_back(self, monkeypatch):
+        d, client, _release = writing_device(monkeypatch)
+        client.write_gatt_char = AsyncMock(side_effect=IOError("write failed"))
+        with pytest.raises(IOError):
+            await d.update_mode(volume=GDVolume.HIGH)
+        assert d.volume == 1
+        assert d.reconciling is False
+
+    @pytest.mark.asyncio
+    async def test_humidifier_timer_starts_from_the_command(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(device_module.time, "monotonic", lambda: now[0])
+        d, _client, release = writing_device(monkeypatch)
+        # The off packet was read an hour ago
+        now[0] += 3600
+        release.set()
+        await d.update_mode(humidifier=GDHumidifier.TWO)
+        state = d.state
+        assert d.reconciling is True
+        assert state.humidifier_timer == 120
+        assert state.humidifier_remaining(now=now[0]) == 120
+        assert state.humidifier_ends_in(now=now[0]) == 120 * 60
+
+    @pytest.mark.asyncio
+    async def test_rollback_restores_timer_anchor(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(device_module.time, "monotonic", lambda: now[0])
+        d, client, _release = writing_device(monkeypatch)
+        d._refresh_data(bytearray.fromhex("0a000001010000780001"))  # 2 Hours, 120 minutes left
+        now[0] += 600
+        client.write_gatt_char = AsyncMock(side_effect=IOError("write failed"))
+        with pytest.raises(IOError):
+            await d.update_mode(humidifier=GDHumidifier.FOUR)
+        assert d.humidifier == GDHumidifier.TWO
+        assert d.state.humidifier_timer_anchor == 1000.0
+        assert d.state.humidifier_remaining(now=now[0]) == 110
+
+
+# ---------------------------------------------------------------------------
+# Write acknowledgement
+# ---------------------------------------------------------------------------
+
+class TestWriteAcknowledgement:
+    @pytest.mark.asyncio
+    async def test_notification_acknowledges_without_read(self):
+        d, client = connected_device()
+        d._notifying = True
+
+        async def write(_uuid, payload, _response):
+            # Device echoes the new state as a notification
+            asyncio.get_running_loop().call_soon(d._handle_notification, None, bytearray(payload))
+
+        client.write_gatt_char = AsyncMock(side_effect=write)
+        await d.send_command(bytes.fromhex("640000020000ffff0000"))
+        client.read_gatt_char.assert_not_called()
+        assert d.ack_latency is not None and d.ack_latency < 1.0
+        assert d.ack_latency_avg == d.ack_latency
+        assert d.ack_misses == 0
+
+    @pytest.mark.asyncio
+    async def test_timeout_falls_back_to_read(self, monkeypatch):
+        d, client = connected_device()
+        d._notifying = True
+        client.write_gatt_char = AsyncMock()
+        client.read_gatt_char = AsyncMock(return_value=bytearray.fromhex("640000020000ffff0000"))
+        monkeypatch.setattr(device_module, "ACK_TIMEOUT_SECONDS", 0.01)
+        monkeypatch.setattr(asyncio, "sleep", AsyncMock())
+        await d.send_command(bytes.fromhex("640000020000ffff0000"))
+        client.read_gatt_char.assert_called()
+        assert d.ack_latency is not None
+        assert d.ack_misses == 0
+
+    @pytest.mark.asyncio
+    async def test_unconfirmed_write_counts_as_miss(self, monkeypatch):
+        d, client = connected_device()
+        client.write_gatt_char = AsyncMock()
+        monkeypatch.setattr(asyncio, "sleep", AsyncMock())
+        await d.send_command(bytes.fromhex("640000020000ffff0000"))
+        assert d.ack_latency is None
+        assert d.ack_misses == 1
+
+
+# ---------------------------------------------------------------------------
+# read_fresh
+# ---------------------------------------------------------------------------
+
+class TestReadFresh:
+    @pytest.mark.asyncio
+    async def test_single_read_when_matching_last_packet(self, monkeypatch):
+        d, client = connected_device()
+        d._refresh_data(bytearray.fromhex("0a0000000000ffff0000"))
+        monkeypatch.setattr(asyncio, "sleep", AsyncMock())
+        await d.read_fresh()
+        assert client.read_gatt_char.call_count == 1
+        asyncio.sleep.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_rereads_until_two_reads_agree(self, monkeypatch):
+        d, client = connected_device()
+        client.read_gatt_char = AsyncMock(side_effect=[
+            bytearray.fromhex("0a0000000000ffff0000"),
+            bytearray.fromhex("640000000000ffff0000"),
+            bytearray.fromhex("640000000000ffff0000"),
+        ])
+        monkeypatch.setattr(asyncio, "sleep", AsyncMock())
+        await d.read_fresh()
+        assert client.read_gatt_char.call_count == 3
+        assert d.brightness == 100
+
+    @pytest.mark.asyncio
+    async def test_rereads_with_exponential_spacing_until_pending_command(self, monkeypatch):
+        d, client = connected_device()
+        stale = bytearray.fromhex("0a0000000000ffff0000")
+        client.read_gatt_char = AsyncMock(side_effect=[
+            stale, stale, bytearray.fromhex("0a0000030000ffff0000"),
+        ])
+        monkeypatch.setattr(asyncio, "sleep", AsyncMock())
+        d._ack_expected = (GDEffect.SLEEP, GDBrightness.LOW, GDVolume.HIGH, GDHumidifier.NONE)
+        await d.read_fresh()
+        assert client.read_gatt_char.call_count == 3
+        delays = [call.args[0] for call in asyncio.sleep.call_args_list]
+        assert delays == [device_module.FRESH_READ_BACKOFF_SECONDS, device_module.FRESH_READ_BACKOFF_SECONDS * 2]
+        assert d.volume == 3
+
+    @pytest.mark.asyncio
+    async def test_attempts_are_bounded(self, monkeypatch):
+        d, client = connected_device()
+        client.read_gatt_char = AsyncMock(return_value=bytearray.fromhex("0a0000000000ffff0000"))
+        monkeypatch.setattr(asyncio, "sleep", AsyncMock())
+        d._ack_expected = (GDEffect.SLEEP, GDBrightness.LOW, GDVolume.HIGH, GDHumidifier.NONE)
+        await d.read_fresh()
+        assert client.read_gatt_char.call_count == device_module.FRESH_READ_ATTEMPTS
+
+
+# ---------------------------------------------------------------------------
+# Connection policy
+# ---------------------------------------------------------------------------
+
+class TestConnectionPolicy:
+    @pytest.mark.asyncio
+    async def test_idle_lease_disconnects_and_stays_available(self):
+        d, client = connected_device()
+        d._policy = IdleLeasePolicy(0.01)
+        d._touch()
+        await _sleep(0.05)
+        await d._idle_task
+        client.disconnect.assert_called_once()
+        assert d.policy.idle_disconnects == 1
+        assert d.available is True
+
+    @pytest.mark.asyncio
+    async def test_always_connected_arms_no_timer(self):
+        d, _client = connected_device()
+        d._touch()
+        assert d._idle_handle is None
+
+    @pytest.mark.asyncio
+    async def test_busy_link_postpones_idle_disconnect(self):
+        d, client = connected_device()
+        d._policy = IdleLeasePolicy(10)
+        d._ack_expected = (GDEffect.NONE, GDBrightness.NONE, GDVolume.NONE, GDHumidifier.NONE)
+        d._idle_expired()
+        assert d._idle_task is None
+        assert d._idle_handle is not None
+        d._cancel_idle()
+
+
+# ---------------------------------------------------------------------------
+# Reconnect backoff
+# ---------------------------------------------------------------------------
+
+class TestReconnect:
+    @pytest.mark.asyncio
+    async def test_connects_through_establish_connection(self, monkeypatch):
+        client = MagicMock()
+        establish = AsyncMock(return_value=client)
+        monkeypatch.setattr(retry_connector, "establish_connection", establish)
+        d = make_device()
+        await d.get_client()
+        assert d._client is client
+        assert establish.call_args.kwargs["max_attempts"] == device_module.CONNECT_ATTEMPTS
+        assert d.policy.connects == 1
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_skips_connect(self, monkeypatch):
+        establish = AsyncMock(side_effect=IOError("out of range"))
+        monkeypatch.setattr(retry_connector, "establish_connection", establish)
+        d = GlowdreamingDevice(MagicMock(), breaker=CircuitBreaker(failure_threshold=2, base_delay=60))
+        for _ in range(2):
+            with pytest.raises(IOError, match="out of range"):
+                await d.get_client()
+        with pytest.raises(device_module.CircuitOpenError):
+            await d.get_client()
+        assert establish.call_count == 2
+        assert d.breaker.skipped == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_poll_connects_once(self, monkeypatch):
+        establish = AsyncMock(side_effect=IOError("out of range"))
+        monkeypatch.setattr(retry_connector, "establish_connection", establish)
+        d = GlowdreamingDevice(MagicMock(), breaker=CircuitBreaker(failure_threshold=2, base_delay=60))
+        with pytest.raises(IOError, match="out of range"):
+            await d.update()
+        assert establish.call_count == 1
+        assert d.breaker.failures == 1
+        assert not d.breaker.is_open
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_skips_poll_once(self, monkeypatch):
+        monkeypatch.setattr(retry_connector, "establish_connection", AsyncMock(side_effect=IOError))
+        d = GlowdreamingDevice(MagicMock(), breaker=CircuitBreaker(failure_threshold=1, base_delay=60))
+        with pytest.raises(IOError):
+            await d.update()
+        with pytest.raises(device_module.CircuitOpenError):
+            await d.update()
+        assert d.breaker.skipped == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_subscription_on_live_link_reads(self):
+        d, client = connected_device()
+        client.start_notify.side_effect = IOError("notify not supported")
+        await d.update()
+        client.read_gatt_char.assert_called()
+        assert d.brightness == 10
+
+    @pytest.mark.asyncio
+    async def test_cancelled_connect_counts_as_failure(self, monkeypatch):
+        monkeypatch.setattr(retry_connector, "establish_connection", AsyncMock(side_effect=asyncio.CancelledError))
+        d = make_device()
+        with pytest.raises(asyncio.CancelledError):
+            await d.get_client()
+        assert d.breaker.failures == 1
+
+    @pytest.mark.asyncio
+    async def test_success_closes_breaker(self, monkeypatch):
+        monkeypatch.setattr(retry_connector, "establish_connection", AsyncMock(return_value=MagicMock()))
+        d = make_device()
+        d.breaker.record_failure()
+        await d.get_client()
+        assert d.breaker.failures == 0
+
+
+# ---------------------------------------------------------------------------
+# Connection lifecycle
+# ---------------------------------------------------------------------------
+
+class FakeClient:
+    """Just enough of a BleakClient to connect and disconnect."""
+
+    def __init__(self, disconnected_callback) -> None:
+        self._disconnected_callback = disconnected_callback
+
+    async def disconnect(self) -> None:
+        self._disconnected_callback(self)
+
+
+def fake_establish(clients: list | None = None):
+    async def establish(_client_class, _device, _name, disconnected_callback, max_attempts, ble_device_callback):
+        client = FakeClient(disconnected_callback)
+        if clients is not None:
+            clients.append(weakref.ref(client))
+        return client
+
+    return establish
+
+
+class TestConnectionLifecycle:
+    @pytest.mark.asyncio
+    async def test_states_through_connect_and_disconnect(self, monkeypatch):
+        monkeypatch.setattr(retry_connector, "establish_connection", fake_establish())
+        d = make_device()
+        assert d.connection_state is ConnectionState.DISCONNECTED
+        await d.get_client()
+        assert d.connection_state is ConnectionState.CONNECTED
+        await d.disconnect()
+        assert d.connection_state is ConnectionState.DISCONNECTED
+        assert d._client is None
+        assert d.policy.disconnects == 1  # the late callback is not counted again
+
+    @pytest.mark.asyncio
+    async def test_failed_disconnect_still_releases_client(self):
+        d, client = connected_device()
+        client.disconnect = AsyncMock(side_effect=IOError("gone"))
+        with pytest.raises(IOError):
+            await d.disconnect()
+        assert d.connection_state is ConnectionState.DISCONNECTED
+        assert d._client is None
+
+    @pytest.mark.asyncio
+    async def test_stale_callback_ignored(self, monkeypatch):
+        monkeypatch.setattr(retry_connector, "establish_connection", fake_establish())
+        d = make_device()
+        await d.get_client()
+        old = d._client
+        d._on_disconnected(old)
+        await d.get_client()
+        d._on_disconnected(old)
+        assert d.connected is True
+
+    @pytest.mark.asyncio
+    async def test_memory_flat_across_reconnects(self, monkeypatch):
+        clients: list[weakref.ref] = []
+        monkeypatch.setattr(retry_connector, "establish_connection", fake_establish(clients))
+        # A MagicMock BLEDevice would record every attribute access itself
+        d = GlowdreamingDevice(SimpleNamespace(name="Glow Dreaming", address="AA:BB:CC:DD:EE:FF"))
+
+        async def reconnect(times: int) -> None:
+            for _ in range(times):
+                await d.get_client()
+                await d.disconnect()
+
+        await reconnect(1_000)  # warm up caches and allocator pools
+        monkeypatch.setattr(retry_connector, "establish_connection", fake_establish())
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            await reconnect(10_000)
+            gc.collect()
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+
+        growth = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        assert growth < 64 * 1024
+        assert sum(ref() is not None for ref in clients) == 0
+        assert d.policy.connects == d.policy.disconnects == 11_000
+
+
+# ---------------------------------------------------------------------------
+# Packet capture
+# ---------------------------------------------------------------------------
+
+class TestPacketCapture:
+    def test_notifications_are_captured(self):
+        d = make_device()
+        d._handle_notification(None, bytearray.fromhex("0a0000010000ffff0000"))
+        (entry,) = d.capture.dump()
+        assert entry["direction"] == "in"
+        assert entry["source"] == "notify"
+        assert entry["data"] == "0a0000010000ffff0000"
+
+    @pytest.mark.asyncio
+    async def test_commands_and_reads_are_captured(self, monkeypatch):
+        monkeypatch.setattr(device_module, "ACK_TIMEOUT_SECONDS", 0.01)
+        d, client = connected_device()
+        client.write_gatt_char = AsyncMock()
+        client.read_gatt_char = AsyncMock(return_value=bytearray.fromhex("0a0000010000ffff0000"))
+        await d.set_mode(GDEffect.SLEEP, GDBrightness.LOW, GDVolume.LOW, GDHumidifier.NONE)
+        sources = [(entry["direction"], entry["source"]) for entry in d.capture.dump()]
+        assert sources[0] == ("out", "write")
+        assert ("in", "read") in sources
+
+
+# ---------------------------------------------------------------------------
+# Advertisements
+# ---------------------------------------------------------------------------
+
+class TestAdvertisements:
+    def test_tracks_presence_without_connecting(self):
+        d = make_device()
+        assert d.seen_within(60) is False
+        ble_device = MagicMock()
+        d.update_from_advertisement(ble_device, SimpleNamespace(rssi=-72))
+        assert d.rssi == -72
+        assert d.advertisements == 1
+        assert d.seen_within(60) is True
+        assert d.connected is False
+
+    def test_newest_ble_device_is_used_to_connect(self):
+        d = make_device()
+        ble_device = MagicMock()
+        d.update_from_advertisement(ble_device, SimpleNamespace(rssi=-50))
+        assert d._get_ble_device() is ble_device
+
+    def test_stale_advertisement(self, monkeypatch):
+        d = make_device()
+        d.update_from_advertisement(MagicMock(), SimpleNamespace(rssi=-50))
+        monkeypatch.setattr(device_module.time, "monotonic", lambda: d.last_seen + 120)
+        assert d.seen_within(60) is False
+
+    @pytest.mark.asyncio
+    async def test_unreachable_idle_device_is_unavailable(self):
+        d, _client = connected_device()
+        d._policy = IdleLeasePolicy(10)
+        await d._idle_disconnect()
+        assert d.available is True
+        d.mark_unreachable()
+        assert d.reachable is False
+        assert d.available is False
+        d.update_from_advertisement(MagicMock(), SimpleNamespace(rssi=-50))
+        assert d.available is True
+
+
+# ---------------------------------------------------------------------------
+# Shared connection pool
+# ---------------------------------------------------------------------------
+
+class TestConnectionPool:
+    @pytest.mark.asyncio
+    async def test_connection_holds_slot_until_disconnect(self, monkeypatch):
+        monkeypatch.setattr(retry_connector, "establish_connection", fake_establish())
+        pool = device_module.ConnectionPool(2)
+        d = GlowdreamingDevice(MagicMock(), pool=pool)
+        await d.get_client()
+        assert pool.holds(d)
+        await d.disconnect()
+        assert not pool.holds(d)
+
+    @pytest.mark.asyncio
+    async def test_failed_connect_releases_slot(self, monkeypatch):
+        monkeypatch.setattr(retry_connector, "establish_connection", AsyncMock(side_effect=IOError("gone")))
+        pool = device_module.ConnectionPool(2)
+        d = GlowdreamingDevice(MagicMock(), pool=pool)
+        with pytest.raises(IOError):
+            await d.get_client()
+        assert pool.in_use == 0
+
+    @pytest.mark.asyncio
+    async def test_command_evicts_idle_neighbour(self, monkeypatch):
+        monkeypatch.setattr(retry_connector, "establish_connection", fake_establish())
+        pool = device_module.ConnectionPool(1)
+        idle = GlowdreamingDevice(MagicMock(), pool=pool)
+        active = GlowdreamingDevice(MagicMock(), pool=pool)
+        await idle.get_client()
+        await active.get_client(device_module.PRIORITY_COMMAND)
+        assert idle.connected is False
+        assert idle.available is True  # evicted on purpose
+        assert active.connected is True
+        assert pool.evictions == 1
+
+
+# ---------------------------------------------------------------------------
+# Restored state
+# ---------------------------------------------------------------------------
+
+class TestRestore:
+    def test_restored_state_is_stale_and_available(self):
+        d = make_device()
+        d.restore(bytes.fromhex("0a0000010000ffff0000"), GDEffect.AWAKE, GDBrightness.HIGH)
+        assert d.stale is True
+        assert d.state.stale is True
+        assert d.available is True
+        assert d.effect == GDEffect.SLEEP
+        assert d.last_effect == GDEffect.AWAKE
+        assert d.last_brightness == GDBrightness.HIGH
+
+    def test_restored_timer_is_not_counted_down(self):
+        d = make_device()
+        d.restore(bytes.fromhex("00000000010000780001"))
+        assert d.state.timer_running is False
+        assert d.state.humidifier_remaining() == 0x78
+
+    def test_device_packet_confirms_state(self):
+        d = make_device()
+        d.restore(bytes.fromhex("0a0000010000ffff0000"))
+        restored = d.state
+        d._handle_notification(None, bytearray.fromhex("0a0000010000ffff0000"))
+        assert d.stale is False
+        # Same packet, but the confirmation still wakes the entities
+        assert d.state != restored
+
+    @pytest.mark.asyncio
+    async def test_failed_connect_makes_restored_state_unavailable(self, monkeypatch):
+        monkeypatch.setattr(retry_connector, "establish_connection", AsyncMock(side_effect=IOError("unreachable")))
+        d = make_device()
+        d.restore(bytes.fromhex("0a0000010000ffff0000"))
+        with pytest.raises(IOError):
+            await d.get_client()
+        assert d.available is False
+        assert d.stale is True
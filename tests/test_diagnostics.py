@@ -0,0 +1,28 @@
+"""Tests for the diagnostics platform."""
+from __future__ import annotations
+
+import pytest
+from unittest.mock import MagicMock
+
+from custom_components.glowdreaming.const import DOMAIN
+from custom_components.glowdreaming.diagnostics import async_get_config_entry_diagnostics
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_include_packets_and_redact_address(mock_coordinator, mock_device):
+    entry = MagicMock()
+    entry.entry_id = "entry"
+    entry.data = {"address": "AA:BB:CC:DD:EE:FF"}
+    entry.options = {"connection_policy": "idle"}
+    hass = MagicMock()
+    hass.data = {DOMAIN: {"entry": mock_coordinator}}
+
+    result = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert result["entry"]["data"] == {"address": "**REDACTED**"}
+    assert result["entry"]["options"] == {"connection_policy": "idle"}
+    assert result["state"]["mode_hex"] == mock_device.mode_hex
+    assert result["connection"]["policy"] == "always"
+    assert result["connection"]["pool_slots"] == 3
+    assert result["coordinator"]["poll_interval"] is mock_coordinator.poll_interval
+    assert result["packets"] == mock_device.capture.dump.return_value
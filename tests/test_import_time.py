@@ -0,0 +1,68 @@
+"""Import cost of the protocol layer, measured with python -X importtime."""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+INTEGRATION_DIR = Path(__file__).parent.parent / "custom_components" / "glowdreaming"
+
+# Everything the protocol layer offers; none of it should need these
+PROTOCOL_MODULES = [
+    "glowdreaming_api.capture",
+    "glowdreaming_api.codec",
+    "glowdreaming_api.command_queue",
+    "glowdreaming_api.connection",
+    "glowdreaming_api.const",
+    "glowdreaming_api.device",
+    "glowdreaming_api.polling",
+    "glowdreaming_api.pool",
+    "glowdreaming_api.state",
+]
+LAZY_PACKAGES = ("bleak", "bleak_retry_connector", "homeassistant", "voluptuous")
+
+# Microseconds spent in the protocol layer's own modules, warm bytecode cache.
+# About 8ms at the time of writing; generous so slow CI machines don't flake
+IMPORT_BUDGET_US = 50_000
+
+
+def importtime(tmp_path: Path) -> dict[str, int]:
+    """Return {module: self time in us} for importing the protocol layer in a fresh interpreter."""
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(INTEGRATION_DIR),
+        "PYTHONPYCACHEPREFIX": str(tmp_path),
+    }
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    code = "import " + ", ".join(PROTOCOL_MODULES)
+    # The first run only fills the bytecode cache
+    subprocess.run([sys.executable, "-c", code], env=env, check=True, cwd=tmp_path)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env, check=True, cwd=tmp_path, capture_output=True, text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+@pytest.fixture(scope="module")
+def import_times(tmp_path_factory) -> dict[str, int]:
+    return importtime(tmp_path_factory.mktemp("pycache"))
+
+
+def test_protocol_layer_does_not_import_heavy_dependencies(import_times):
+    loaded = [name for name in import_times if name.split(".")[0] in LAZY_PACKAGES]
+    assert loaded == []
+
+
+def test_protocol_layer_import_budget(import_times):
+    own = sum(us for name, us in import_times.items() if name.split(".")[0] == "glowdreaming_api")
+    assert own < IMPORT_BUDGET_US, f"protocol layer import took {own}us, budget {IMPORT_BUDGET_US}us"
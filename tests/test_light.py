@@ -104,8 +104,8 @@ class TestTurnOn:
         mock_device.brightness_level = GDBrightness.LOW
         entity = make_light(mock_device, mock_coordinator)
         await entity.async_turn_on(**{ATTR_EFFECT: GDEffect.SLEEP})
-        mock_device.set_mode.assert_called_once_with(
-            GDEffect.SLEEP, GDBrightness.LOW, mock_device.volume_level, mock_device.humidifier
+        mock_device.update_mode.assert_called_once_with(
+            effect=GDEffect.SLEEP, brightness=GDBrightness.LOW
         )
 
     @pytest.mark.asyncio
@@ -113,8 +113,8 @@ class TestTurnOn:
         mock_device.brightness_level = GDBrightness.MEDIUM
         entity = make_light(mock_device, mock_coordinator)
         await entity.async_turn_on(**{ATTR_EFFECT: GDEffect.AWAKE})
-        mock_device.set_mode.assert_called_once_with(
-            GDEffect.AWAKE, GDBrightness.MEDIUM, mock_device.volume_level, mock_device.humidifier
+        mock_device.update_mode.assert_called_once_with(
+            effect=GDEffect.AWAKE, brightness=GDBrightness.MEDIUM
         )
 
     @pytest.mark.asyncio
@@ -123,8 +123,8 @@ class TestTurnOn:
         mock_device.brightness_level = GDBrightness.HIGH
         entity = make_light(mock_device, mock_coordinator)
         await entity.async_turn_on()
-        args = mock_device.set_mode.call_args[0]
-        assert args[0] == GDEffect.AWAKE
+        args = mock_device.update_mode.call_args.kwargs
+        assert args["effect"] == GDEffect.AWAKE
 
     @pytest.mark.asyncio
     async def test_restores_last_effect_when_off(self, mock_device, mock_coordinator):
@@ -134,8 +134,8 @@ class TestTurnOn:
         mock_device.brightness_level = GDBrightness.LOW
         entity = make_light(mock_device, mock_coordinator)
         await entity.async_turn_on()
-        args = mock_device.set_mode.call_args[0]
-        assert args[0] == GDEffect.AWAKE
+        args = mock_device.update_mode.call_args.kwargs
+        assert args["effect"] == GDEffect.AWAKE
 
     @pytest.mark.asyncio
     async def test_falls_back_to_sleep_when_no_last_effect(self, mock_device, mock_coordinator):
@@ -144,8 +144,8 @@ class TestTurnOn:
         mock_device.brightness_level = GDBrightness.LOW
         entity = make_light(mock_device, mock_coordinator)
         await entity.async_turn_on()
-        args = mock_device.set_mode.call_args[0]
-        assert args[0] == GDEffect.SLEEP
+        args = mock_device.update_mode.call_args.kwargs
+        assert args["effect"] == GDEffect.SLEEP
 
     @pytest.mark.asyncio
     async def test_invalid_effect_falls_back_to_last_effect(self, mock_device, mock_coordinator):
@@ -153,8 +153,8 @@ class TestTurnOn:
         mock_device.brightness_level = GDBrightness.LOW
         entity = make_light(mock_device, mock_coordinator)
         await entity.async_turn_on(**{ATTR_EFFECT: "NotARealEffect"})
-        args = mock_device.set_mode.call_args[0]
-        assert args[0] == GDEffect.AWAKE
+        args = mock_device.update_mode.call_args.kwargs
+        assert args["effect"] == GDEffect.AWAKE
 
     @pytest.mark.asyncio
     async def test_invalid_effect_falls_back_to_sleep_without_last(self, mock_device, mock_coordinator):
@@ -162,8 +162,8 @@ class TestTurnOn:
         mock_device.brightness_level = GDBrightness.LOW
         entity = make_light(mock_device, mock_coordinator)
         await entity.async_turn_on(**{ATTR_EFFECT: "NotARealEffect"})
-        args = mock_device.set_mode.call_args[0]
-        assert args[0] == GDEffect.SLEEP
+        args = mock_device.update_mode.call_args.kwargs
+        assert args["effect"] == GDEffect.SLEEP
 
     @pytest.mark.asyncio
     async def test_restores_last_brightness_when_off(self, mock_device, mock_coordinator):
@@ -172,8 +172,8 @@ class TestTurnOn:
         mock_device.effect = GDEffect.SLEEP
         entity = make_light(mock_device, mock_coordinator)
         await entity.async_turn_on()
-        args = mock_device.set_mode.call_args[0]
-        assert args[1] == GDBrightness.HIGH
+        args = mock_device.update_mode.call_args.kwargs
+        assert args["brightness"] == GDBrightness.HIGH
 
     @pytest.mark.asyncio
     async def test_defaults_to_low_brightness_when_no_last(self, mock_device, mock_coordinator):
@@ -182,8 +182,8 @@ class TestTurnOn:
         mock_device.effect = GDEffect.SLEEP
         entity = make_light(mock_device, mock_coordinator)
         await entity.async_turn_on()
-        args = mock_device.set_mode.call_args[0]
-        assert args[1] == GDBrightness.LOW
+        args = mock_device.update_mode.call_args.kwargs
+        assert args["brightness"] == GDBrightness.LOW
 
     @pytest.mark.asyncio
     async def test_uses_current_brightness_when_on(self, mock_device, mock_coordinator):
@@ -191,14 +191,15 @@ class TestTurnOn:
         mock_device.effect = GDEffect.SLEEP
         entity = make_light(mock_device, mock_coordinator)
         await entity.async_turn_on()
-        args = mock_device.set_mode.call_args[0]
-        assert args[1] == GDBrightness.MEDIUM
+        args = mock_device.update_mode.call_args.kwargs
+        assert args["brightness"] == GDBrightness.MEDIUM
 
     @pytest.mark.asyncio
-    async def test_requests_coordinator_refresh(self, mock_device, mock_coordinator):
+    async def test_does_not_request_coordinator_refresh(self, mock_device, mock_coordinator):
+        """The device pushes its optimistic state; no extra poll is needed."""
         entity = make_light(mock_device, mock_coordinator)
         await entity.async_turn_on()
-        mock_coordinator.async_request_refresh.assert_called_once()
+        mock_coordinator.async_request_refresh.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_writes_ha_state(self, mock_device, mock_coordinator):
@@ -217,27 +218,27 @@ class TestTurnOff:
         mock_device.effect = GDEffect.SLEEP
         entity = make_light(mock_device, mock_coordinator)
         await entity.async_turn_off()
-        args = mock_device.set_mode.call_args[0]
-        assert args[1] == GDBrightness.NONE
+        args = mock_device.update_mode.call_args.kwargs
+        assert args["brightness"] == GDBrightness.NONE
 
     @pytest.mark.asyncio
     async def test_preserves_current_effect_in_command(self, mock_device, mock_coordinator):
         mock_device.effect = GDEffect.AWAKE
         entity = make_light(mock_device, mock_coordinator)
         await entity.async_turn_off()
-        args = mock_device.set_mode.call_args[0]
-        assert args[0] == GDEffect.AWAKE
+        args = mock_device.update_mode.call_args.kwargs
+        assert args["effect"] == GDEffect.AWAKE
 
     @pytest.mark.asyncio
     async def test_uses_none_effect_when_device_effect_is_none(self, mock_device, mock_coordinator):
         mock_device.effect = None
         entity = make_light(mock_device, mock_coordinator)
         await entity.async_turn_off()
-        args = mock_device.set_mode.call_args[0]
-        assert args[0] == GDEffect.NONE
+        args = mock_device.update_mode.call_args.kwargs
+        assert args["effect"] == GDEffect.NONE
 
     @pytest.mark.asyncio
-    async def test_requests_coordinator_refresh(self, mock_device, mock_coordinator):
+    async def test_does_not_request_coordinator_refresh(self, mock_device, mock_coordinator):
         entity = make_light(mock_device, mock_coordinator)
         await entity.async_turn_off()
-        mock_coordinator.async_request_refresh.assert_called_once()
+        mock_coordinator.async_request_refresh.assert_not_called()
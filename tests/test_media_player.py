@@ -111,12 +111,12 @@ class TestSourceList:
 
 class TestSource:
     def test_none_when_sound_is_none(self, mock_device, mock_coordinator):
-        mock_device._sound = None
+        mock_device.sound = None
         entity = make_player(mock_device, mock_coordinator)
         assert entity.source is None
 
     def test_white_noise_when_sound_set(self, mock_device, mock_coordinator):
-        mock_device._sound = GDSound.WHITE_NOISE
+        mock_device.sound = GDSound.WHITE_NOISE
         entity = make_player(mock_device, mock_coordinator)
         assert entity.source == "White_noise"
 
@@ -127,16 +127,11 @@ class TestSource:
 
 class TestMediaPause:
     @pytest.mark.asyncio
-    async def test_calls_set_mode_with_volume_none(self, mock_device, mock_coordinator):
+    async def test_calls_update_mode_with_volume_none(self, mock_device, mock_coordinator):
         mock_device.volume_level = GDVolume.HIGH
         entity = make_player(mock_device, mock_coordinator)
         await entity.async_media_pause()
-        mock_device.set_mode.assert_called_once_with(
-            mock_device.effect,
-            mock_device.brightness_level,
-            GDVolume.NONE,
-            mock_device.humidifier,
-        )
+        mock_device.update_mode.assert_called_once_with(volume=GDVolume.NONE)
 
     @pytest.mark.asyncio
     async def test_saves_last_volume_before_muting(self, mock_device, mock_coordinator):
@@ -173,24 +168,14 @@ class TestMediaPlay:
         entity = make_player(mock_device, mock_coordinator)
         entity._last_volume = GDVolume.HIGH
         await entity.async_media_play()
-        mock_device.set_mode.assert_called_once_with(
-            mock_device.effect,
-            mock_device.brightness_level,
-            GDVolume.HIGH,
-            mock_device.humidifier,
-        )
+        mock_device.update_mode.assert_called_once_with(volume=GDVolume.HIGH)
 
     @pytest.mark.asyncio
     async def test_defaults_to_low_when_last_volume_is_none(self, mock_device, mock_coordinator):
         entity = make_player(mock_device, mock_coordinator)
         entity._last_volume = GDVolume.NONE
         await entity.async_media_play()
-        mock_device.set_mode.assert_called_once_with(
-            mock_device.effect,
-            mock_device.brightness_level,
-            GDVolume.LOW,
-            mock_device.humidifier,
-        )
+        mock_device.update_mode.assert_called_once_with(volume=GDVolume.LOW)
 
     @pytest.mark.asyncio
     async def test_writes_ha_state(self, mock_device, mock_coordinator):
@@ -218,12 +203,7 @@ class TestSetVolumeLevel:
     async def test_volume_mapping(self, ha_volume, expected_gd, mock_device, mock_coordinator):
         entity = make_player(mock_device, mock_coordinator)
         await entity.async_set_volume_level(ha_volume)
-        mock_device.set_mode.assert_called_once_with(
-            mock_device.effect,
-            mock_device.brightness_level,
-            expected_gd,
-            mock_device.humidifier,
-        )
+        mock_device.update_mode.assert_called_once_with(volume=expected_gd)
 
     @pytest.mark.asyncio
     async def test_saves_last_volume_when_non_zero(self, mock_device, mock_coordinator):
@@ -0,0 +1,79 @@
+"""Tests for the adaptive poll interval."""
+from __future__ import annotations
+
+from datetime import datetime, time
+
+import pytest
+
+from custom_components.glowdreaming.glowdreaming_api.polling import AdaptivePollInterval, PollScheduler
+
+
+class TestAdaptivePollInterval:
+    def test_starts_fast(self):
+        assert AdaptivePollInterval(fast=5).seconds == 5
+
+    def test_idle_backs_off_to_slow(self):
+        interval = AdaptivePollInterval(fast=5, slow=60, factor=3)
+        for _ in range(5):
+            interval.idle()
+        assert interval.seconds == 60
+
+    def test_activity_resets(self):
+        interval = AdaptivePollInterval(fast=5, slow=60)
+        interval.idle()
+        interval.activity()
+        assert interval.seconds == 5
+
+    @pytest.mark.parametrize("hour,seconds", [(12, 1800), (20, 5)])
+    def test_quiet_window(self, hour, seconds):
+        interval = AdaptivePollInterval(
+            fast=5, quiet=1800, quiet_start=time(8), quiet_end=time(18), clock=lambda: datetime(2025, 1, 1, hour)
+        )
+        assert interval.seconds == seconds
+
+    def test_equal_times_disable_quiet_window(self):
+        interval = AdaptivePollInterval(fast=5, quiet_start=time(0), quiet_end=time(0))
+        assert interval.in_quiet_window() is False
+
+
+class TestPollScheduler:
+    def test_phases_spread_evenly(self):
+        scheduler = PollScheduler()
+        for name in "abcd":
+            scheduler.add(name)
+        assert [scheduler.phase(name) for name in "abcd"] == [0, 0.25, 0.5, 0.75]
+
+    def test_delay_lands_on_slot(self):
+        scheduler = PollScheduler(clock=lambda: 1000.0)
+        scheduler.add("a")
+        scheduler.add("b")
+        # Slots every 30s: "a" at multiples of 30, "b" offset by 15
+        assert (1000.0 + scheduler.delay("a", 30)) % 30 == 0
+        assert (1000.0 + scheduler.delay("b", 30)) % 30 == 15
+
+    @pytest.mark.parametrize("now", [0.0, 7.0, 14.9, 15.0, 29.0])
+    def test_delay_at_least_half_an_interval(self, now):
+        scheduler = PollScheduler(clock=lambda: now)
+        scheduler.add("a")
+        assert 15 <= scheduler.delay("a", 30) < 45
+
+    def test_removal_rebalances(self):
+        scheduler = PollScheduler()
+        remove_a = scheduler.add("a")
+        scheduler.add("b")
+        scheduler.add("c")
+        remove_a()
+        assert scheduler.phase("b") == 0
+        assert scheduler.phase("c") == 0.5
+        remove_a()  # removing twice is harmless
+        assert len(scheduler) == 2
+
+    def test_unknown_member_keeps_interval(self):
+        assert PollScheduler().delay("x", 30) == 30
+
+    def test_lockstep_devices_are_staggered(self):
+        scheduler = PollScheduler(clock=lambda: 500.0)
+        for name in range(3):
+            scheduler.add(name)
+        fire_times = sorted((500.0 + scheduler.delay(name, 30)) % 30 for name in range(3))
+        assert fire_times == [0.0, 10.0, 20.0]
@@ -0,0 +1,215 @@
+"""Tests for the shared ConnectionPool."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.glowdreaming.glowdreaming_api.const import CHAR_CHARACTERISTIC
+from custom_components.glowdreaming.glowdreaming_api.device import GlowdreamingDevice
+from custom_components.glowdreaming.glowdreaming_api.pool import (
+    PRIORITY_COMMAND,
+    PRIORITY_POLL,
+    ConnectionPool,
+)
+from glowdreaming_tools.simulator import LinkProfile, SimulatedDevice
+
+
+class FakeDevice:
+    def __init__(self, pool: ConnectionPool, busy: bool = False) -> None:
+        self.pool = pool
+        self.busy = busy
+        self.evicted = False
+
+    async def evict(self) -> None:
+        self.evicted = True
+        self.pool.release(self)
+
+
+class TestConnectionPool:
+    @pytest.mark.asyncio
+    async def test_grants_free_slots(self):
+        pool = ConnectionPool(2)
+        a, b = FakeDevice(pool), FakeDevice(pool)
+        await pool.acquire(a)
+        await pool.acquire(b)
+        assert pool.in_use == 2
+        assert pool.waits == 0
+
+    @pytest.mark.asyncio
+    async def test_reacquire_is_a_no_op(self):
+        pool = ConnectionPool(1)
+        a = FakeDevice(pool)
+        await pool.acquire(a)
+        await pool.acquire(a)
+        assert pool.in_use == 1
+
+    @pytest.mark.asyncio
+    async def test_poll_waits_for_busy_holder(self):
+        pool = ConnectionPool(1)
+        a, b = FakeDevice(pool, busy=True), FakeDevice(pool)
+        await pool.acquire(a)
+        task = asyncio.create_task(pool.acquire(b, PRIORITY_POLL))
+        await asyncio.sleep(0)
+        assert pool.waiting == 1
+        assert a.evicted is False
+        pool.release(a)
+        await task
+        assert pool.holds(b)
+        assert pool.waits == 1
+
+    @pytest.mark.asyncio
+    async def test_poll_evicts_idle_device(self):
+        """Devices that never release their link on their own still take turns."""
+        pool = ConnectionPool(1)
+        a, b = FakeDevice(pool), FakeDevice(pool)
+        await pool.acquire(a)
+        await pool.acquire(b, PRIORITY_POLL)
+        assert a.evicted is True
+        assert pool.holds(b) and not pool.holds(a)
+        assert pool.waits == 0
+
+    @pytest.mark.asyncio
+    async def test_command_evicts_least_recently_used_idle_device(self):
+        pool = ConnectionPool(2)
+        a, b, c = FakeDevice(pool), FakeDevice(pool), FakeDevice(pool)
+        await pool.acquire(a)
+        await pool.acquire(b)
+        pool.touch(a)  # b is now least recently used
+        await pool.acquire(c, PRIORITY_COMMAND)
+        assert b.evicted is True
+        assert pool.holds(a) and pool.holds(c)
+        assert pool.evictions == 1
+
+    @pytest.mark.asyncio
+    async def test_command_does_not_evict_busy_device(self):
+        pool = ConnectionPool(1)
+        a, c = FakeDevice(pool, busy=True), FakeDevice(pool)
+        await pool.acquire(a)
+        task = asyncio.create_task(pool.acquire(c, PRIORITY_COMMAND))
+        await asyncio.sleep(0)
+        assert a.evicted is False
+        pool.release(a)
+        await task
+        assert pool.holds(c)
+
+    @pytest.mark.asyncio
+    async def test_commands_served_before_polls(self):
+        pool = ConnectionPool(1)
+        holder = FakeDevice(pool, busy=True)
+        poll, command = FakeDevice(pool), FakeDevice(pool)
+        await pool.acquire(holder)
+        poll_task = asyncio.create_task(pool.acquire(poll, PRIORITY_POLL))
+        await asyncio.sleep(0)
+        command_task = asyncio.create_task(pool.acquire(command, PRIORITY_COMMAND))
+        await asyncio.sleep(0)
+        pool.release(holder)
+        await command_task
+        assert pool.holds(command)
+        assert not poll_task.done()
+        pool.release(command)
+        await poll_task
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_is_skipped(self):
+        pool = ConnectionPool(1)
+        a, b, c = FakeDevice(pool, busy=True), FakeDevice(pool), FakeDevice(pool)
+        await pool.acquire(a)
+        cancelled = asyncio.create_task(pool.acquire(b))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(pool.acquire(c))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        pool.release(a)
+        await waiting
+        assert pool.holds(c)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_passes_on_its_wakeup(self):
+        pool = ConnectionPool(1)
+        a, b, c = FakeDevice(pool, busy=True), FakeDevice(pool), FakeDevice(pool)
+        await pool.acquire(a)
+        cancelled = asyncio.create_task(pool.acquire(b))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(pool.acquire(c))
+        await asyncio.sleep(0)
+        # The slot is handed to b, which is cancelled before it can take it
+        pool.release(a)
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        await asyncio.wait_for(waiting, 1)
+        assert pool.holds(c) and not pool.holds(b)
+
+    @pytest.mark.asyncio
+    async def test_waiter_for_a_device_that_got_a_slot_returns(self):
+        pool = ConnectionPool(1)
+        holder, device = FakeDevice(pool, busy=True), FakeDevice(pool)
+        await pool.acquire(holder)
+        poll = asyncio.create_task(pool.acquire(device, PRIORITY_POLL))
+        command = asyncio.create_task(pool.acquire(device, PRIORITY_COMMAND))
+        await asyncio.sleep(0)
+        pool.release(holder)
+        await asyncio.wait_for(asyncio.gather(poll, command), 1)
+        assert pool.holds(device)
+        assert pool.in_use == 1
+
+    @pytest.mark.asyncio
+    async def test_resize_wakes_waiters(self):
+        pool = ConnectionPool(1)
+        a, b = FakeDevice(pool, busy=True), FakeDevice(pool)
+        await pool.acquire(a)
+        task = asyncio.create_task(pool.acquire(b))
+        await asyncio.sleep(0)
+        pool.resize(2)
+        await asyncio.wait_for(task, 1)
+        assert pool.holds(a) and pool.holds(b)
+
+    @pytest.mark.asyncio
+    async def test_holder_going_idle_is_evicted_for_a_waiter(self):
+        pool = ConnectionPool(1)
+        a, b = FakeDevice(pool, busy=True), FakeDevice(pool)
+        await pool.acquire(a)
+        task = asyncio.create_task(pool.acquire(b))
+        await asyncio.sleep(0)
+        pool.notify_idle()
+        await asyncio.sleep(0)
+        assert not task.done()
+        a.busy = False
+        pool.notify_idle()
+        await asyncio.wait_for(task, 1)
+        assert a.evicted is True
+        assert pool.holds(b)
+
+    @pytest.mark.asyncio
+    async def test_device_is_not_evicted_during_a_service_read(self):
+        pool = ConnectionPool(1)
+        sim_a, sim_b = SimulatedDevice(LinkProfile(read_latency=0.1)), SimulatedDevice()
+        a = GlowdreamingDevice(sim_a.ble_device, connector=sim_a.connect, pool=pool)
+        b = GlowdreamingDevice(sim_b.ble_device, connector=sim_b.connect, pool=pool)
+        await a.get_client()
+        read = asyncio.create_task(a.read_gatt(CHAR_CHARACTERISTIC))
+        await asyncio.sleep(0.01)
+        assert a.busy
+
+        poll = asyncio.create_task(b.get_client())
+        await asyncio.sleep(0.03)
+        assert a.connected
+        assert not poll.done()
+
+        assert await read == sim_a.state
+        await asyncio.wait_for(poll, 1)
+        assert b.connected
+        assert not a.connected
+        assert pool.evictions == 1
+
+    def test_stats(self):
+        pool = ConnectionPool(3)
+        assert pool.stats == {
+            "pool_slots": 3,
+            "pool_in_use": 0,
+            "pool_waiting": 0,
+            "pool_waits": 0,
+            "pool_wait_avg": None,
+            "pool_evictions": 0,
+        }
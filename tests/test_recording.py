@@ -0,0 +1,172 @@
+"""Tests for recording sessions and replaying them into the device and coordinator."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.glowdreaming.coordinator import BTCoordinator
+from custom_components.glowdreaming.glowdreaming_api import device as device_module
+from custom_components.glowdreaming.glowdreaming_api.const import (
+    GDBrightness,
+    GDEffect,
+    GDHumidifier,
+    GDVolume,
+)
+from custom_components.glowdreaming.glowdreaming_api.device import GlowdreamingDevice
+from glowdreaming_tools.recording import (
+    EVENT_CONNECT,
+    EVENT_DISCONNECT,
+    EVENT_DISCONNECTED,
+    EVENT_NOTIFY,
+    EVENT_READ,
+    EVENT_SUBSCRIBE,
+    EVENT_WRITE,
+    SessionEvent,
+    SessionRecorder,
+    SessionRecording,
+    SessionReplay,
+    capture_packets,
+)
+from glowdreaming_tools.simulator import LinkProfile, SimulatedDevice
+
+OFF = bytes.fromhex("000000000000000000000044")
+SLEEP_LOW = bytes.fromhex("0a0000010000000000040044")
+
+
+async def record_session() -> tuple[SessionRecording, GlowdreamingDevice]:
+    sim = SimulatedDevice(LinkProfile(connect_latency=0.02, write_latency=0.01, notify_latency=0.01), seed=1)
+    recorder = SessionRecorder(sim.connect, name="nursery")
+    device = GlowdreamingDevice(sim.ble_device, connector=recorder.connect)
+    await device.update()
+    await device.set_mode(GDEffect.SLEEP, GDBrightness.LOW, GDVolume.LOW, GDHumidifier.NONE)
+    await device.disconnect()
+    return recorder.recording, device
+
+
+class TestRecorder:
+    @pytest.mark.asyncio
+    async def test_records_every_event(self):
+        recording, _device = await record_session()
+        kinds = [event.kind for event in recording.events]
+        assert kinds == [EVENT_CONNECT, EVENT_SUBSCRIBE, EVENT_NOTIFY, EVENT_WRITE, EVENT_NOTIFY, EVENT_DISCONNECT]
+        connect = recording.events[0]
+        assert connect.latency >= 0.02
+        assert recording.events[2].data == OFF
+        assert recording.events[4].data == SLEEP_LOW
+        assert all(later.t >= earlier.t for earlier, later in zip(recording.events, recording.events[1:]))
+
+    @pytest.mark.asyncio
+    async def test_link_lost_by_device_is_recorded(self):
+        sim = SimulatedDevice()
+        recorder = SessionRecorder(sim.connect)
+        device = GlowdreamingDevice(sim.ble_device, connector=recorder.connect)
+        await device.get_client()
+        sim.drop()
+        assert not device.connected
+        assert recorder.recording.events[-1].kind == EVENT_DISCONNECTED
+
+    @pytest.mark.asyncio
+    async def test_save_and_load(self, tmp_path):
+        recording, _device = await record_session()
+        path = tmp_path / "session.json"
+        recording.save(path)
+        loaded = SessionRecording.load(path)
+        assert loaded.name == "nursery"
+        assert [(event.kind, event.data) for event in loaded.events] == [
+            (event.kind, event.data) for event in recording.events
+        ]
+        # One short row per event
+        assert path.stat().st_size < 80 * len(recording)
+
+    def test_unknown_version(self):
+        with pytest.raises(ValueError):
+            SessionRecording.from_json({"version": 99, "events": []})
+
+    def test_from_capture(self):
+        packets = [
+            {"timestamp": 100.0, "direction": "in", "source": "notify", "data": OFF.hex()},
+            {"timestamp": 102.5, "direction": "out", "source": "write", "data": SLEEP_LOW[:10].hex()},
+            {"timestamp": 102.6, "direction": "in", "source": "read", "data": SLEEP_LOW.hex()},
+        ]
+        recording = SessionRecording.from_capture(packets)
+        assert [(event.t, event.kind) for event in recording.events] == [
+            (0.0, EVENT_CONNECT), (0.0, EVENT_SUBSCRIBE), (0.0, EVENT_NOTIFY), (2.5, EVENT_WRITE), (pytest.approx(2.6), EVENT_READ),
+        ]
+
+    def test_capture_packets_unwraps_saved_captures(self):
+        packets = [{"timestamp": 100.0, "direction": "in", "source": "notify", "data": OFF.hex()}]
+        assert capture_packets(packets) is packets
+        # dump_packets as Home Assistant returns it, keyed by entity_id
+        assert capture_packets({"sensor.nursery_mode": {"packets": packets}}) is packets
+        assert capture_packets({"packets": packets}) is packets
+        # A diagnostics download
+        assert capture_packets({"home_assistant": {}, "data": {"state": {}, "packets": packets}}) is packets
+        with pytest.raises(ValueError):
+            capture_packets({"sensor.a": {"packets": []}, "sensor.b": {"packets": []}})
+
+
+class TestReplay:
+    @pytest.mark.asyncio
+    async def test_replay_reproduces_the_recorded_state(self):
+        recording, recorded_device = await record_session()
+        replay = SessionReplay(recording, speed=10)
+        device = GlowdreamingDevice(replay.ble_device, connector=replay.connect)
+        await device.update()
+        await device.set_mode(GDEffect.SLEEP, GDBrightness.LOW, GDVolume.LOW, GDHumidifier.NONE)
+        assert device.state.raw == recorded_device.state.raw
+        assert device.state.effect == recorded_device.state.effect
+        assert replay.writes == [event.data for event in recording.events if event.kind == EVENT_WRITE]
+        assert device.ack_misses == 0
+
+    @pytest.mark.asyncio
+    async def test_late_first_notification_falls_back_to_read(self, monkeypatch):
+        """A device that pushes its state only after the notify timeout."""
+        monkeypatch.setattr(device_module, "NOTIFY_TIMEOUT_SECONDS", 0.1)
+        recording = SessionRecording([
+            SessionEvent(0.0, EVENT_CONNECT, latency=0.05),
+            SessionEvent(0.06, EVENT_SUBSCRIBE),
+            SessionEvent(0.17, EVENT_READ, OFF, latency=0.01),
+            SessionEvent(0.6, EVENT_NOTIFY, SLEEP_LOW),
+        ])
+        replay = SessionReplay(recording)
+        device = GlowdreamingDevice(replay.ble_device, connector=replay.connect)
+        await device.update()
+        # Gave up waiting and read instead
+        assert replay.reads >= 1
+        assert replay.notifications == 0
+        assert device.state.raw == OFF
+        # The late notification still lands afterwards
+        await device._notify_received.wait()
+        assert device.state.raw == SLEEP_LOW
+
+    @pytest.mark.asyncio
+    async def test_recorded_link_loss_is_replayed(self):
+        recording = SessionRecording([
+            SessionEvent(0.0, EVENT_CONNECT),
+            SessionEvent(0.0, EVENT_SUBSCRIBE),
+            SessionEvent(0.01, EVENT_NOTIFY, OFF),
+            SessionEvent(0.05, EVENT_DISCONNECTED),
+        ])
+        replay = SessionReplay(recording)
+        device = GlowdreamingDevice(replay.ble_device, connector=replay.connect)
+        await device.update()
+        assert device.connected
+        await asyncio.sleep(0.08)
+        assert not device.connected
+        # Nothing left to connect to
+        with pytest.raises(TimeoutError):
+            await device.get_client()
+
+    @pytest.mark.asyncio
+    async def test_replay_through_coordinator(self):
+        recording, _recorded_device = await record_session()
+        replay = SessionReplay(recording, speed=10)
+        device = GlowdreamingDevice(replay.ble_device, connector=replay.connect)
+        coordinator = BTCoordinator(MagicMock(), MagicMock(), device, MagicMock(), "Glow Dreaming", "replay")
+        coordinator.update_interval = timedelta(seconds=coordinator._interval.seconds)
+        state = await coordinator._async_update_data()
+        assert state.raw == OFF
+        assert coordinator.polls == 1
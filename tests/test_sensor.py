@@ -1,9 +1,15 @@
 """Tests for GlowdreamingSensor entity and its service methods."""
 from __future__ import annotations
 
+from datetime import timedelta
+
 import pytest
 from unittest.mock import MagicMock
 
+from custom_components.glowdreaming import sensor as sensor_module
+from custom_components.glowdreaming.coordinator import BTCoordinator
+from custom_components.glowdreaming.glowdreaming_api import device as device_module
+from custom_components.glowdreaming.glowdreaming_api.device import GlowdreamingDevice
 from custom_components.glowdreaming.sensor import GlowdreamingSensor
 from custom_components.glowdreaming.glowdreaming_api.const import (
     GDBrightness,
@@ -11,6 +17,7 @@ from custom_components.glowdreaming.glowdreaming_api.const import (
     GDHumidifier,
     GDVolume,
 )
+from glowdreaming_tools.simulator import LinkProfile, SimulatedDevice
 
 
 def make_sensor(mock_device, mock_coordinator) -> GlowdreamingSensor:
@@ -49,6 +56,13 @@ class TestExtraStateAttributes:
                     "humidifier_timer", "device_lock", "mode", "mode_hex"):
             assert key in attrs, f"missing key: {key}"
 
+    def test_counters_stay_out_of_attributes(self, mock_device, mock_coordinator):
+        """Counters change on almost every write; they belong in diagnostics."""
+        entity = make_sensor(mock_device, mock_coordinator)
+        attrs = entity.extra_state_attributes
+        for key in ("policy", "connects", "breaker_open", "pool_slots", "poll_interval", "polls"):
+            assert key not in attrs, f"unexpected key: {key}"
+
     def test_no_duplicate_mode_hex(self, mock_device, mock_coordinator):
         """mode_hex should appear exactly once (sourced from device, not _attributes)."""
         entity = make_sensor(mock_device, mock_coordinator)
@@ -113,13 +127,11 @@ class TestSetMode:
 
 class TestSetSleepBrightness:
     @pytest.mark.asyncio
-    async def test_uses_sleep_effect_and_preserves_volume_humidifier(self, mock_device, mock_coordinator):
-        mock_device.volume_level = GDVolume.HIGH
-        mock_device.humidifier = GDHumidifier.CONTINUOUS
+    async def test_uses_sleep_effect_and_leaves_volume_humidifier(self, mock_device, mock_coordinator):
         entity = make_sensor(mock_device, mock_coordinator)
         await entity.set_sleep_brightness("Medium")
-        mock_device.set_mode.assert_called_once_with(
-            GDEffect.SLEEP, GDBrightness.MEDIUM, GDVolume.HIGH, GDHumidifier.CONTINUOUS
+        mock_device.update_mode.assert_called_once_with(
+            effect=GDEffect.SLEEP, brightness=GDBrightness.MEDIUM
         )
 
 
@@ -129,13 +141,11 @@ class TestSetSleepBrightness:
 
 class TestSetAwakeBrightness:
     @pytest.mark.asyncio
-    async def test_uses_awake_effect_and_preserves_volume_humidifier(self, mock_device, mock_coordinator):
-        mock_device.volume_level = GDVolume.LOW
-        mock_device.humidifier = GDHumidifier.TWO
+    async def test_uses_awake_effect_and_leaves_volume_humidifier(self, mock_device, mock_coordinator):
         entity = make_sensor(mock_device, mock_coordinator)
         await entity.set_awake_brightness("High")
-        mock_device.set_mode.assert_called_once_with(
-            GDEffect.AWAKE, GDBrightness.HIGH, GDVolume.LOW, GDHumidifier.TWO
+        mock_device.update_mode.assert_called_once_with(
+            effect=GDEffect.AWAKE, brightness=GDBrightness.HIGH
         )
 
 
@@ -145,15 +155,10 @@ class TestSetAwakeBrightness:
 
 class TestSetVolume:
     @pytest.mark.asyncio
-    async def test_preserves_effect_and_brightness(self, mock_device, mock_coordinator):
-        mock_device.effect = GDEffect.SLEEP
-        mock_device.brightness_level = GDBrightness.HIGH
-        mock_device.humidifier = GDHumidifier.NONE
+    async def test_only_changes_volume(self, mock_device, mock_coordinator):
         entity = make_sensor(mock_device, mock_coordinator)
         await entity.set_volume("High")
-        mock_device.set_mode.assert_called_once_with(
-            GDEffect.SLEEP, GDBrightness.HIGH, GDVolume.HIGH, GDHumidifier.NONE
-        )
+        mock_device.update_mode.assert_called_once_with(volume=GDVolume.HIGH)
 
 
 # ---------------------------------------------------------------------------
@@ -162,15 +167,10 @@ class TestSetVolume:
 
 class TestSetHumidifier:
     @pytest.mark.asyncio
-    async def test_preserves_effect_and_brightness(self, mock_device, mock_coordinator):
-        mock_device.effect = GDEffect.AWAKE
-        mock_device.brightness_level = GDBrightness.MEDIUM
-        mock_device.volume_level = GDVolume.LOW
+    async def test_only_changes_humidifier(self, mock_device, mock_coordinator):
         entity = make_sensor(mock_device, mock_coordinator)
         await entity.set_humidifier("2 Hours")
-        mock_device.set_mode.assert_called_once_with(
-            GDEffect.AWAKE, GDBrightness.MEDIUM, GDVolume.LOW, GDHumidifier.TWO
-        )
+        mock_device.update_mode.assert_called_once_with(humidifier=GDHumidifier.TWO)
 
 
 # ---------------------------------------------------------------------------
@@ -190,6 +190,23 @@ class TestRefreshState:
         await entity.refresh_state()
         entity.async_write_ha_state.assert_called()
 
+    @pytest.mark.asyncio
+    async def test_publishes_state_read_from_device(self, monkeypatch):
+        """A change the device never pushed is shown as soon as refresh_state read it."""
+        monkeypatch.setattr(device_module, "NOTIFY_TIMEOUT_SECONDS", 0.05)
+        sim = SimulatedDevice(LinkProfile(notify_on_subscribe=False))
+        device = GlowdreamingDevice(sim.ble_device, connector=sim.connect)
+        coordinator = BTCoordinator(MagicMock(), MagicMock(), device, MagicMock(), "Glow Dreaming", "test-unique-id")
+        coordinator.update_interval = timedelta(seconds=coordinator._interval.seconds)
+        coordinator.async_set_updated_data = MagicMock()
+        await device.get_client()
+        sim.set_state(bytes.fromhex("640000030000000000040044"))
+
+        entity = make_sensor(device, coordinator)
+        await entity.refresh_state()
+        coordinator.async_set_updated_data.assert_called_once_with(device.state)
+        assert device.state.raw == bytes(sim.state)
+
 
 # ---------------------------------------------------------------------------
 # Service: write_gatt / read_gatt
@@ -213,3 +230,70 @@ class TestGattServices:
         entity = make_sensor(mock_device, mock_coordinator)
         await entity.read_gatt("some-uuid")
         entity.async_write_ha_state.assert_called()
+
+    @pytest.mark.asyncio
+    async def test_read_gatt_publishes_through_coordinator(self, mock_device, mock_coordinator):
+        entity = make_sensor(mock_device, mock_coordinator)
+        await entity.read_gatt("some-uuid")
+        mock_coordinator.async_handle_push.assert_called_once()
+
+
+# ---------------------------------------------------------------------------
+# Service: dump_packets
+# ---------------------------------------------------------------------------
+
+class TestDumpPackets:
+    @pytest.mark.asyncio
+    async def test_returns_capture(self, mock_device, mock_coordinator):
+        entity = make_sensor(mock_device, mock_coordinator)
+        assert await entity.dump_packets() == {"packets": mock_device.capture.dump.return_value}
+
+
+# ---------------------------------------------------------------------------
+# Humidifier timer countdown
+# ---------------------------------------------------------------------------
+
+class TestHumidifierCountdown:
+    def test_attributes_use_extrapolated_timer(self, mock_device, mock_coordinator):
+        mock_device.humidifier_remaining.return_value = 42
+        entity = make_sensor(mock_device, mock_coordinator)
+        attrs = entity.extra_state_attributes
+        assert attrs["humidifier_timer"] == 42
+        assert attrs["humidifier_ends_at"] is None
+
+    def test_schedules_one_write_at_next_boundary(self, mock_device, mock_coordinator, monkeypatch):
+        call_later = MagicMock()
+        monkeypatch.setattr(sensor_module, "async_call_later", call_later)
+        mock_device.next_timer_boundary.return_value = 12.5
+        entity = make_sensor(mock_device, mock_coordinator)
+        entity.hass = MagicMock()
+        entity._handle_coordinator_update()
+        call_later.assert_called_once_with(entity.hass, 12.5, entity._async_timer_tick)
+
+    def test_tick_writes_and_reschedules(self, mock_device, mock_coordinator, monkeypatch):
+        call_later = MagicMock()
+        monkeypatch.setattr(sensor_module, "async_call_later", call_later)
+        mock_device.next_timer_boundary.return_value = 60
+        entity = make_sensor(mock_device, mock_coordinator)
+        entity.hass = MagicMock()
+        entity._async_timer_tick(None)
+        entity.async_write_ha_state.assert_called_once()
+        call_later.assert_called_once()
+
+    def test_no_tick_without_running_timer(self, mock_device, mock_coordinator, monkeypatch):
+        call_later = MagicMock()
+        monkeypatch.setattr(sensor_module, "async_call_later", call_later)
+        entity = make_sensor(mock_device, mock_coordinator)
+        entity.hass = MagicMock()
+        entity._handle_coordinator_update()
+        call_later.assert_not_called()
+
+    def test_rescheduling_cancels_pending_tick(self, mock_device, mock_coordinator, monkeypatch):
+        unsub = MagicMock()
+        monkeypatch.setattr(sensor_module, "async_call_later", MagicMock(return_value=unsub))
+        mock_device.next_timer_boundary.return_value = 30
+        entity = make_sensor(mock_device, mock_coordinator)
+        entity.hass = MagicMock()
+        entity._async_schedule_timer_tick()
+        entity._async_schedule_timer_tick()
+        unsub.assert_called_once()
@@ -0,0 +1,166 @@
+"""Tests for async_setup_entry: setup must not wait for the device."""
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from custom_components.glowdreaming import PLATFORMS, async_setup_entry, async_unload_entry
+from custom_components.glowdreaming.const import DOMAIN
+from custom_components.glowdreaming.coordinator import BTCoordinator
+from custom_components.glowdreaming.glowdreaming_api.device import DeviceStoppedError
+from custom_components.glowdreaming.glowdreaming_api.state import GlowdreamingState
+
+ADDRESS = "AA:BB:CC:DD:EE:FF"
+
+
+def make_hass():
+    hass = MagicMock()
+    hass.data = {}
+    hass.config_entries.async_forward_entry_setups = AsyncMock()
+    return hass
+
+
+def make_entry(tasks: list[asyncio.Task]):
+    def create_task(hass, target, name):
+        tasks.append(asyncio.ensure_future(target))
+        return tasks[-1]
+
+    entry = MagicMock()
+    entry.entry_id = "entry-id"
+    entry.unique_id = ADDRESS
+    entry.title = "Glow Dreaming"
+    entry.data = {"address": ADDRESS}
+    entry.options = {}
+    entry.async_create_background_task = MagicMock(side_effect=create_task)
+    return entry
+
+
+@pytest.fixture(autouse=True)
+def wall_clock():
+    # homeassistant.util.dt is a MagicMock; the poll interval needs a real clock
+    with patch("custom_components.glowdreaming.dt_util.now", datetime.now):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def coordinator_listeners():
+    # Provided by the real DataUpdateCoordinator
+    with patch.object(BTCoordinator, "async_add_listener", MagicMock(), create=True) as add_listener:
+        yield add_listener
+
+
+class TestSetup:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("reachable", [True, False])
+    async def test_setup_time_does_not_depend_on_the_device(self, reachable):
+        landed = asyncio.Event()
+
+        async def first_refresh(coordinator):
+            if not reachable:
+                # Out of range: connecting would keep retrying for a long time
+                await asyncio.sleep(3600)
+            coordinator.data = "refreshed"
+            landed.set()
+
+        hass = make_hass()
+        tasks: list[asyncio.Task] = []
+        entry = make_entry(tasks)
+        with patch.object(BTCoordinator, "async_refresh", first_refresh, create=True):
+            started = time.monotonic()
+            assert await async_setup_entry(hass, entry)
+            elapsed = time.monotonic() - started
+
+            assert elapsed < 0.5
+            hass.config_entries.async_forward_entry_setups.assert_awaited_once_with(entry, PLATFORMS)
+            coordinator = hass.data[DOMAIN][entry.entry_id]
+            # Entities are added with the starting snapshot
+            assert coordinator.data == GlowdreamingState()
+            assert len(tasks) == 1
+
+            if reachable:
+                await asyncio.wait_for(landed.wait(), 1)
+                assert coordinator.data == "refreshed"
+            else:
+                await asyncio.sleep(0)
+                assert not tasks[0].done()
+                tasks[0].cancel()
+
+    @pytest.mark.asyncio
+    async def test_first_refresh_starts_after_entities_are_added(self):
+        order: list[str] = []
+
+        async def first_refresh(coordinator):
+            order.append("refresh")
+
+        hass = make_hass()
+        hass.config_entries.async_forward_entry_setups = AsyncMock(side_effect=lambda *args: order.append("platforms"))
+        tasks: list[asyncio.Task] = []
+        with patch.object(BTCoordinator, "async_refresh", first_refresh, create=True):
+            await async_setup_entry(hass, make_entry(tasks))
+            await asyncio.gather(*tasks)
+        assert order == ["platforms", "refresh"]
+
+    @pytest.mark.asyncio
+    async def test_entities_start_from_the_stored_state(self, coordinator_listeners):
+        stored = {"raw": "0a0000010000ffff0000", "last_effect": "Sleep", "last_brightness": "Low"}
+        hass = make_hass()
+        tasks: list[asyncio.Task] = []
+        with (
+            patch("custom_components.glowdreaming.store.Store") as store_cls,
+            patch.object(BTCoordinator, "async_refresh", AsyncMock(), create=True),
+        ):
+            store_cls.return_value.async_load = AsyncMock(return_value=stored)
+            entry = make_entry(tasks)
+            await async_setup_entry(hass, entry)
+            await asyncio.gather(*tasks)
+
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+        assert coordinator.data.stale is True
+        assert coordinator.data.mode_hex == "0a0000010000ffff0000"
+        assert coordinator.device.available is True
+        # Confirmed states are written back through a coordinator listener
+        coordinator_listeners.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_pool_slots_option(self):
+        hass = make_hass()
+        tasks: list[asyncio.Task] = []
+        with patch.object(BTCoordinator, "async_refresh", AsyncMock(), create=True):
+            first = make_entry(tasks)
+            await async_setup_entry(hass, first)
+            pool = hass.data[DOMAIN][first.entry_id].device.pool
+            assert pool.slots == 3
+
+            second = make_entry(tasks)
+            second.entry_id = "second-entry-id"
+            second.options = {"pool_slots": 5}
+            await async_setup_entry(hass, second)
+            await asyncio.gather(*tasks)
+        # Devices on the same adapter share the pool, sized by the last one set up
+        assert hass.data[DOMAIN][second.entry_id].device.pool is pool
+        assert pool.slots == 5
+
+    @pytest.mark.asyncio
+    async def test_unload_cancels_the_first_refresh(self):
+        async def first_refresh(coordinator):
+            # Still connecting to a slow device
+            await asyncio.sleep(3600)
+
+        hass = make_hass()
+        hass.config_entries.async_unload_platforms = AsyncMock(return_value=True)
+        tasks: list[asyncio.Task] = []
+        entry = make_entry(tasks)
+        with patch.object(BTCoordinator, "async_refresh", first_refresh, create=True):
+            await async_setup_entry(hass, entry)
+            device = hass.data[DOMAIN][entry.entry_id].device
+            await asyncio.sleep(0)
+            assert await async_unload_entry(hass, entry)
+        assert tasks[0].cancelled()
+        # Nothing may connect once the entry is unloaded
+        with pytest.raises(DeviceStoppedError):
+            await device.get_client()
+        assert device.pool.in_use == 0
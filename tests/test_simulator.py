@@ -0,0 +1,223 @@
+"""Tests for the simulated device, and GlowdreamingDevice driven through it."""
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.glowdreaming.coordinator import BTCoordinator
+from custom_components.glowdreaming.glowdreaming_api.codec import COMMANDS, decode_command, decode_summary
+from custom_components.glowdreaming.glowdreaming_api.const import (
+    CHAR_CHARACTERISTIC,
+    GDBrightness,
+    GDEffect,
+    GDHumidifier,
+    GDVolume,
+)
+from custom_components.glowdreaming.glowdreaming_api.device import DeviceStoppedError, GlowdreamingDevice
+from custom_components.glowdreaming.glowdreaming_api.pool import ConnectionPool
+from glowdreaming_tools.simulator import LinkProfile, SimulatedDevice
+
+
+def simulated(
+    profile: LinkProfile | None = None, pool: ConnectionPool | None = None, **kwargs
+) -> tuple[SimulatedDevice, GlowdreamingDevice]:
+    sim = SimulatedDevice(profile, seed=1, **kwargs)
+    return sim, GlowdreamingDevice(sim.ble_device, connector=sim.connect, pool=pool)
+
+
+class TestStateEmulation:
+    def test_state_reports_every_command(self):
+        sim = SimulatedDevice()
+        for command in COMMANDS.values():
+            sim.apply(command)
+            assert len(sim.state) == 12
+            assert decode_summary(sim.state) == decode_command(command), command.hex()
+
+    def test_power_flag(self):
+        sim = SimulatedDevice()
+        sim.apply(COMMANDS[GDEffect.SLEEP, GDBrightness.LOW, GDVolume.NONE, GDHumidifier.NONE])
+        assert sim.state[9] & 4
+        sim.apply(COMMANDS[GDEffect.NONE, GDBrightness.NONE, GDVolume.NONE, GDHumidifier.NONE])
+        assert sim.state[9] == 0
+
+    @pytest.mark.asyncio
+    async def test_unknown_characteristic(self):
+        sim = SimulatedDevice()
+        client = await sim.connect(sim.ble_device, lambda _client: None)
+        with pytest.raises(ValueError):
+            await client.read_gatt_char("00002a00-0000-1000-8000-00805f9b34fb")
+        assert await client.read_gatt_char(CHAR_CHARACTERISTIC) == sim.state
+
+
+class TestLink:
+    @pytest.mark.asyncio
+    async def test_connect_latency(self):
+        sim, device = simulated(LinkProfile(connect_latency=0.05))
+        started = time.monotonic()
+        await device.get_client()
+        assert time.monotonic() - started >= 0.05
+        assert device.connected
+        assert sim.connects == 1
+
+    def test_jitter_bounds(self):
+        sim = SimulatedDevice(LinkProfile(jitter=0.5), seed=3)
+        delays = [sim.latency(0.1) for _ in range(200)]
+        assert all(0.05 <= delay <= 0.15 for delay in delays)
+        assert len(set(delays)) > 1
+
+    @pytest.mark.asyncio
+    async def test_drop_disconnects_device(self):
+        sim, device = simulated()
+        await device.get_client()
+        sim.drop()
+        assert not device.connected
+        await device.get_client()
+        assert sim.connects == 2
+
+    @pytest.mark.asyncio
+    async def test_device_side_change_is_pushed(self):
+        sim, device = simulated()
+        await device.update()
+        sim.set_state(bytes.fromhex("640000030000000000040044"))
+        await asyncio.sleep(0.01)
+        assert device.brightness_level == GDBrightness.HIGH
+        # The state pushed on subscribe, then the change
+        assert device.notifications == 2
+
+
+class TestDeviceAgainstSimulator:
+    @pytest.mark.asyncio
+    async def test_command_is_acknowledged_by_notification(self):
+        sim, device = simulated(LinkProfile(write_latency=0.01, notify_latency=0.01))
+        await device.update()
+        await device.set_mode(GDEffect.AWAKE, GDBrightness.MEDIUM, GDVolume.HIGH, GDHumidifier.FOUR)
+        assert device.effect == GDEffect.AWAKE
+        assert device.brightness_level == GDBrightness.MEDIUM
+        assert device.volume_level == GDVolume.HIGH
+        assert device.humidifier == GDHumidifier.FOUR
+        assert device.ack_latency >= 0.01
+        assert device.ack_misses == 0
+        # The subscription pushed the initial state and the write was acknowledged by notification
+        assert sim.reads == 0
+
+    @pytest.mark.asyncio
+    async def test_lost_notification_falls_back_to_read(self, monkeypatch):
+        from custom_components.glowdreaming.glowdreaming_api import device as device_module
+
+        monkeypatch.setattr(device_module, "ACK_TIMEOUT_SECONDS", 0.05)
+        monkeypatch.setattr(device_module, "NOTIFY_TIMEOUT_SECONDS", 0.05)
+        sim, device = simulated(LinkProfile(packet_loss=1.0))
+        await device.update()
+        await device.set_mode(GDEffect.SLEEP, GDBrightness.LOW, GDVolume.LOW, GDHumidifier.NONE)
+        assert sim.notifications_lost >= 1
+        assert device.effect == GDEffect.SLEEP
+        assert device.ack_misses == 0
+
+    @pytest.mark.asyncio
+    async def test_lagging_reads_are_retried(self):
+        sim, device = simulated(LinkProfile(apply_delay=0.15))
+        # Without a subscription the write is confirmed by reading; the first
+        # reads still return the old state, so read_fresh keeps reading
+        await device.get_client()
+        await device.set_mode(GDEffect.SLEEP, GDBrightness.HIGH, GDVolume.NONE, GDHumidifier.NONE)
+        assert sim.reads > 1
+        assert device.ack_misses == 0
+        assert device.brightness_level == GDBrightness.HIGH
+
+    @pytest.mark.asyncio
+    async def test_stop_during_command_does_not_reconnect(self):
+        sim, device = simulated(LinkProfile(write_latency=0.05))
+        await device.update()
+        command = asyncio.create_task(
+            device.set_mode(GDEffect.SLEEP, GDBrightness.LOW, GDVolume.LOW, GDHumidifier.NONE)
+        )
+        await asyncio.sleep(0.01)
+        await device.stop()
+        with pytest.raises(asyncio.CancelledError):
+            await command
+        await asyncio.sleep(0.1)
+        assert not device.connected
+        assert not device.reconciling
+        assert sim.connects == 1
+
+    @pytest.mark.asyncio
+    async def test_stop_during_poll_does_not_reconnect(self):
+        sim, device = simulated(LinkProfile(connect_latency=0.05))
+        poll = asyncio.create_task(device.update())
+        await asyncio.sleep(0.01)
+        await device.stop()
+        assert poll.done()
+        await asyncio.sleep(0.1)
+        assert not device.connected
+        assert sim.connects <= 1
+        assert device.pool.in_use == 0
+
+        with pytest.raises(DeviceStoppedError):
+            await device.update()
+        assert sim.connects <= 1
+        assert device.pool.in_use == 0
+
+        device.start()
+        await device.update()
+        assert device.connected
+        await device.stop()
+
+    @pytest.mark.asyncio
+    async def test_watchdog_poll_finds_a_lost_push(self, monkeypatch):
+        from custom_components.glowdreaming.glowdreaming_api import device as device_module
+
+        monkeypatch.setattr(device_module, "FRESH_READ_BACKOFF_SECONDS", 0.001)
+        sim, device = simulated()
+        coordinator = BTCoordinator(MagicMock(), MagicMock(), device, MagicMock(), "Glow Dreaming", "simulator")
+        coordinator.update_interval = timedelta(seconds=coordinator._interval.seconds)
+        coordinator.async_set_updated_data = lambda data: setattr(coordinator, "data", data)
+        device.register_callback(coordinator.async_handle_push)
+        coordinator.data = await coordinator._async_update_data()
+        assert coordinator.push_mode
+
+        sim.profile.packet_loss = 1.0
+        sim.set_state(bytes.fromhex("640000030000000000040044"))
+        await asyncio.sleep(0.01)
+        assert device.brightness_level == GDBrightness.NONE
+
+        coordinator.data = await coordinator._async_update_data()
+        assert sim.reads >= 1
+        assert device.mode_hex == "640000030000000000040044"
+        assert coordinator.push_misses == 1
+        assert not coordinator.push_mode
+
+
+class TestSharedAdapter:
+    @pytest.mark.asyncio
+    async def test_command_is_not_stuck_behind_a_waiting_poll(self):
+        pool = ConnectionPool(slots=1)
+        _sim_a, a = simulated(LinkProfile(write_latency=0.2), pool=pool)
+        _sim_b, b = simulated(pool=pool)
+        await a.update()
+        busy = asyncio.create_task(a.set_mode(GDEffect.SLEEP, GDBrightness.LOW, GDVolume.NONE, GDHumidifier.NONE))
+        await asyncio.sleep(0.01)
+        poll = asyncio.create_task(b.update())
+        await asyncio.sleep(0.01)
+        # The poll waits for the slot without holding the device lock
+        assert not b._lock.locked()
+        await asyncio.wait_for(
+            b.set_mode(GDEffect.AWAKE, GDBrightness.HIGH, GDVolume.NONE, GDHumidifier.NONE), 2
+        )
+        await asyncio.wait_for(asyncio.gather(busy, poll), 2)
+        assert b.connected and b.effect == GDEffect.AWAKE
+        assert not a.connected and a.available
+
+    @pytest.mark.asyncio
+    async def test_always_connected_devices_take_turns(self):
+        pool = ConnectionPool(slots=3)
+        devices = [simulated(pool=pool)[1] for _ in range(4)]
+        for device in devices:
+            await asyncio.wait_for(device.update(), 2)
+            assert device.connected
+        assert pool.in_use == 3
+        assert pool.evictions == 1
+        assert all(device.available for device in devices)
@@ -0,0 +1,103 @@
+"""Tests for GlowdreamingState snapshots."""
+from __future__ import annotations
+
+import dataclasses
+
+import pytest
+from unittest.mock import MagicMock
+
+from custom_components.glowdreaming.glowdreaming_api.const import GDBrightness, GDEffect, GDHumidifier, GDVolume
+from custom_components.glowdreaming.glowdreaming_api.device import GlowdreamingDevice
+from custom_components.glowdreaming.glowdreaming_api.state import GlowdreamingState
+
+
+def snapshot(hex_str: str) -> GlowdreamingState:
+    d = GlowdreamingDevice(MagicMock())
+    d._refresh_data(bytes.fromhex(hex_str))
+    return d.state
+
+
+class TestGlowdreamingState:
+    def test_same_packet_gives_equal_snapshots(self):
+        assert snapshot("0a0000010000ffff0004") == snapshot("0a0000010000ffff0004")
+
+    def test_different_packet_differs(self):
+        assert snapshot("0a0000010000ffff0004") != snapshot("0a0000020000ffff0004")
+
+    def test_frozen(self):
+        state = snapshot("0a0000010000ffff0004")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            state.volume = 3
+
+    def test_slots(self):
+        assert not hasattr(GlowdreamingState(), "__dict__")
+
+    def test_not_affected_by_later_packets(self):
+        d = GlowdreamingDevice(MagicMock())
+        d._refresh_data(bytes.fromhex("0a0000010000ffff0004"))
+        state = d.state
+        d._refresh_data(bytes.fromhex("006400030000ffff0004"))
+        assert state.effect == GDEffect.SLEEP
+        assert state.volume == 1
+
+    def test_derived_values_match_device(self):
+        d = GlowdreamingDevice(MagicMock())
+        d._refresh_data(bytes.fromhex("006400030000ffff0004"))
+        state = d.state
+        assert state.brightness_level == GDBrightness.HIGH == d.brightness_level
+        assert state.volume_level == GDVolume.HIGH == d.volume_level
+        assert state.mode == d.mode
+        assert state.mode_hex == d.mode_hex
+
+    def test_empty_state(self):
+        state = GlowdreamingState()
+        assert state.mode == "unknown"
+        assert state.brightness_level == GDBrightness.NONE
+        assert state.volume_level == GDVolume.NONE
+
+
+def timer_state(timer: int = 120, humidifier: GDHumidifier = GDHumidifier.TWO, anchor: float = 1000.0) -> GlowdreamingState:
+    return GlowdreamingState(humidifier=humidifier, humidifier_timer=timer, humidifier_timer_anchor=anchor)
+
+
+class TestHumidifierTimer:
+    def test_counts_down_from_anchor(self):
+        state = timer_state()
+        assert state.humidifier_remaining(now=1000.0) == 120
+        assert state.humidifier_remaining(now=1059.9) == 120
+        assert state.humidifier_remaining(now=1060.0) == 119
+        assert state.humidifier_remaining(now=1000.0 + 200 * 60) == 0
+
+    def test_ends_in(self):
+        assert timer_state().humidifier_ends_in(now=1030.0) == 120 * 60 - 30
+
+    def test_next_boundary(self):
+        state = timer_state()
+        assert state.next_timer_boundary(now=1000.0) == 60
+        assert state.next_timer_boundary(now=1045.0) == 15
+        assert state.next_timer_boundary(now=1000.0 + 120 * 60) is None
+
+    def test_continuous_does_not_count_down(self):
+        state = timer_state(timer=255, humidifier=GDHumidifier.CONTINUOUS)
+        assert state.humidifier_remaining(now=5000.0) == 255
+        assert state.humidifier_ends_in() is None
+        assert state.next_timer_boundary() is None
+
+    def test_anchor_excluded_from_equality(self):
+        assert timer_state(anchor=1.0) == timer_state(anchor=2.0)
+        assert timer_state(timer=119) != timer_state(timer=120)
+
+    def test_device_keeps_anchor_for_unchanged_value(self, monkeypatch):
+        from custom_components.glowdreaming.glowdreaming_api import device as device_module
+        now = [100.0]
+        monkeypatch.setattr(device_module.time, "monotonic", lambda: now[0])
+        d = GlowdreamingDevice(MagicMock())
+        d._refresh_data(bytes.fromhex("00000000010000780001"))
+        assert d.state.humidifier == GDHumidifier.TWO
+        now[0] = 130.0
+        d._refresh_data(bytes.fromhex("00000000010000780001"))
+        assert d.state.humidifier_timer_anchor == 100.0
+        now[0] = 160.0
+        d._refresh_data(bytes.fromhex("00000000010000770001"))
+        assert d.state.humidifier_timer_anchor == 160.0
+        assert d.state.humidifier_remaining(now=160.0) == 119
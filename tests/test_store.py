@@ -0,0 +1,108 @@
+"""Tests for StateStore: restoring and coalescing saves of the last-known state."""
+from __future__ import annotations
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from custom_components.glowdreaming import store as store_module
+from custom_components.glowdreaming.const import STORAGE_SAVE_DELAY_SECONDS
+from custom_components.glowdreaming.glowdreaming_api.const import GDBrightness, GDEffect
+from custom_components.glowdreaming.glowdreaming_api.device import GlowdreamingDevice
+from custom_components.glowdreaming.glowdreaming_api.state import GlowdreamingState
+from custom_components.glowdreaming.store import StateStore
+
+
+class FakeStore:
+    """Keeps the scheduled write instead of touching the disk."""
+
+    def __init__(self, hass, version, key, data=None) -> None:
+        self.key = key
+        self.data = data
+        self.delayed = []
+        self.async_remove = AsyncMock()
+
+    async def async_load(self):
+        return self.data
+
+    def async_delay_save(self, data_func, delay) -> None:
+        self.delayed.append((data_func, delay))
+
+    def flush(self) -> None:
+        """Run the pending write like Store does once the delay has passed."""
+        data_func, _delay = self.delayed.pop(0)
+        self.data = data_func()
+
+
+def make_store(data=None) -> tuple[StateStore, FakeStore]:
+    with patch.object(store_module, "Store", lambda *args: FakeStore(*args, data=data)):
+        state_store = StateStore(MagicMock(), "entry-id")
+    return state_store, state_store._store
+
+
+def state(raw: str, **kwargs) -> GlowdreamingState:
+    return GlowdreamingState(raw=bytes.fromhex(raw), **kwargs)
+
+
+class TestRestore:
+    @pytest.mark.asyncio
+    async def test_restores_packet_and_memory(self):
+        state_store, fake = make_store(
+            {"raw": "0a0000010000ffff0000", "last_effect": "Awake", "last_brightness": "High"}
+        )
+        assert fake.key == "glowdreaming.entry-id"
+        device = GlowdreamingDevice(MagicMock())
+        assert await state_store.async_restore(device) is True
+        assert device.stale is True
+        assert device.mode_hex == "0a0000010000ffff0000"
+        assert device.last_effect == GDEffect.AWAKE
+        assert device.last_brightness == GDBrightness.HIGH
+
+    @pytest.mark.asyncio
+    async def test_nothing_stored(self):
+        state_store, _fake = make_store()
+        device = GlowdreamingDevice(MagicMock())
+        assert await state_store.async_restore(device) is False
+        assert device.stale is False
+
+    @pytest.mark.asyncio
+    async def test_unreadable_data_is_ignored(self):
+        state_store, _fake = make_store({"raw": "not hex"})
+        device = GlowdreamingDevice(MagicMock())
+        assert await state_store.async_restore(device) is False
+        assert device.stale is False
+
+
+class TestSave:
+    def test_saves_are_coalesced(self):
+        state_store, fake = make_store()
+        state_store.async_save(state("0a0000010000ffff0000", last_effect=GDEffect.SLEEP))
+        state_store.async_save(state("640000030000ffff0000", last_effect=GDEffect.SLEEP))
+        assert len(fake.delayed) == 1
+        assert fake.delayed[0][1] == STORAGE_SAVE_DELAY_SECONDS
+        fake.flush()
+        # The single write carries the newest state
+        assert fake.data["raw"] == "640000030000ffff0000"
+        assert state_store.saves == 1
+
+    def test_unchanged_state_is_not_written_again(self):
+        state_store, fake = make_store()
+        state_store.async_save(state("0a0000010000ffff0000"))
+        fake.flush()
+        state_store.async_save(state("0a0000010000ffff0000", connected=True))
+        assert fake.delayed == []
+
+    def test_stale_or_empty_state_is_not_written(self):
+        state_store, fake = make_store()
+        state_store.async_save(None)
+        state_store.async_save(GlowdreamingState())
+        state_store.async_save(state("0a0000010000ffff0000", stale=True))
+        assert fake.delayed == []
+
+    @pytest.mark.asyncio
+    async def test_restored_state_is_not_written_back(self):
+        state_store, fake = make_store({"raw": "0a0000010000ffff0000", "last_effect": "Sleep", "last_brightness": "Low"})
+        device = GlowdreamingDevice(MagicMock())
+        await state_store.async_restore(device)
+        device._handle_notification(None, bytearray.fromhex("0a0000010000ffff0000"))
+        state_store.async_save(device.state)
+        assert fake.delayed == []